@@ -1,5 +1,14 @@
+from typing import TYPE_CHECKING, Any
+
+from attributes_to_language.batch import CaptionBatch
+from attributes_to_language.codec import ChoicesCodec
 from attributes_to_language.composer import Composer
+from attributes_to_language.frozen import FrozenComposer
+from attributes_to_language.sampling import CounterSampler, Sampler
+from attributes_to_language.space import ChoiceSpace
+from attributes_to_language.stats import ComposerStats, StageStats
 from attributes_to_language.types import (
+    AttributeColumnsT,
     AttributeT,
     CallbackVariantT,
     Choices,
@@ -18,8 +27,21 @@ from attributes_to_language.writers import (
     Writer,
 )
 
+if TYPE_CHECKING:
+    from attributes_to_language.aio import AsyncComposer
+
 __all__ = [
+    "AsyncComposer",
+    "CaptionBatch",
+    "ChoicesCodec",
+    "ChoiceSpace",
     "Composer",
+    "ComposerStats",
+    "StageStats",
+    "FrozenComposer",
+    "CounterSampler",
+    "Sampler",
+    "AttributeColumnsT",
     "AttributeT",
     "CallbackVariantT",
     "Choices",
@@ -35,3 +57,18 @@ __all__ = [
     "Writer",
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # AsyncComposer is imported on first access, so that importing the package
+    # does not import asyncio
+    if name == "AsyncComposer":
+        from attributes_to_language.aio import AsyncComposer
+
+        globals()[name] = AsyncComposer
+        return AsyncComposer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
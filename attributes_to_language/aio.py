@@ -0,0 +1,196 @@
+import asyncio
+import contextlib
+from concurrent.futures import Executor
+from typing import Any, NamedTuple
+
+from attributes_to_language.composer import Composer
+from attributes_to_language.types import AttributeT, Choices
+
+
+class _Request(NamedTuple):
+    attributes: AttributeT
+    choices: Choices | None
+    sample_index: int | None
+    future: asyncio.Future[tuple[str, Choices]]
+
+
+class AsyncComposer:
+    """
+    Asyncio front end of a composer that composes concurrent requests in batches.
+
+    Requests are queued and collected into a batch until max_batch_size requests
+    are waiting or max_delay seconds passed since the first one. The batch is then
+    composed with Composer.compose_batch in an executor, off the event loop, and
+    the future of each request is resolved with its caption and choices. One batch
+    is composed at a time, so the composer is never used by two threads at once,
+    and the requests arriving in the meantime form the next batch.
+
+    The queue holds at most max_queue_size requests: when it is full, compose waits
+    for a free slot, which propagates the backpressure to the callers.
+    """
+
+    def __init__(
+        self,
+        composer: Composer,
+        max_batch_size: int = 256,
+        max_delay: float = 0.002,
+        max_queue_size: int = 4096,
+        executor: Executor | None = None,
+    ):
+        """
+        Args:
+            composer: the composer.
+            max_batch_size: maximal number of requests composed at once.
+            max_delay: maximal time in seconds to wait for other requests once a
+                request is received. 0 composes the requests already waiting.
+            max_queue_size: maximal number of waiting requests.
+            executor: executor composing the batches. Defaults to the default
+                executor of the event loop.
+        """
+        assert max_batch_size > 0
+        assert max_queue_size > 0
+        self.composer = composer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def qsize(self) -> int:
+        """
+        Number of waiting requests.
+        """
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def start(self):
+        """
+        Start composing the requests. Called by compose if needed.
+        """
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """
+        Compose the waiting requests, then stop.
+        """
+        if self._task is None:
+            return
+        assert self._queue is not None
+        await self._queue.join()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._queue = None
+
+    async def __aenter__(self) -> "AsyncComposer":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def compose(
+        self,
+        attributes: AttributeT,
+        choices: Choices | None = None,
+        index: int | None = None,
+    ) -> tuple[str, Choices]:
+        """
+        Compose one sentence, as Composer.__call__. Waits for a free slot if the
+        queue is full.
+        """
+        self.start()
+        assert self._queue is not None
+        future: asyncio.Future[tuple[str, Choices]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        await self._queue.put(_Request(attributes, choices, index, future))
+        return await future
+
+    async def _next_batch(self) -> list[_Request]:
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            requests = [r for r in batch if not r.future.cancelled()]
+            results: list[Any] = []
+            try:
+                if len(requests):
+                    results = await loop.run_in_executor(
+                        self.executor, self._compose, requests
+                    )
+            except Exception as error:
+                results = [error] * len(requests)
+            for request, result in zip(requests, results, strict=True):
+                if request.future.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _compose(
+        self, requests: list[_Request]
+    ) -> list[tuple[str, Choices] | BaseException]:
+        """
+        Compose a batch of requests. The requests with and without a sample index
+        are composed separately. If a batch fails, its requests are composed one by
+        one so that only the failing ones get the error.
+        """
+        results: list[Any] = [None] * len(requests)
+        with_index = [k for k, r in enumerate(requests) if r.sample_index is not None]
+        without_index = [k for k, r in enumerate(requests) if r.sample_index is None]
+        for samples in (with_index, without_index):
+            if not len(samples):
+                continue
+            indices: list[int] | None = None
+            if samples is with_index:
+                indices = [
+                    index
+                    for k in samples
+                    if (index := requests[k].sample_index) is not None
+                ]
+            try:
+                captions, choices = self.composer.compose_batch(
+                    [requests[k].attributes for k in samples],
+                    [requests[k].choices for k in samples],
+                    indices,
+                )
+                for k, caption, sample_choices in zip(
+                    samples, captions, choices, strict=True
+                ):
+                    results[k] = (caption, sample_choices)
+            except Exception:
+                for k in samples:
+                    request = requests[k]
+                    try:
+                        results[k] = self.composer(
+                            request.attributes, request.choices, request.sample_index
+                        )
+                    except Exception as error:
+                        results[k] = error
+        return results
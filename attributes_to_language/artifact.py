@@ -0,0 +1,331 @@
+"""
+Binary artifacts of compiled composers.
+
+An artifact holds the structures, variants and modifiers of a composer, and the
+state of its writers with their tables, palettes and lookup tables. The layout of a
+file is:
+    - a fixed size prefix: magic bytes, ARTIFACT_VERSION, and the size of the header,
+    - a JSON header describing the composer, where arrays are replaced by
+      references to the data section,
+    - the data section, where each array is stored contiguously at an offset
+      aligned to ALIGNMENT bytes, so that the arrays can be memory-mapped.
+
+Callable variants and modifiers cannot be stored. They are saved as the name of a
+registered function (see register), or as the name of a registered factory with
+its arguments (see register_factory). The modules registering them must be imported
+before loading the artifact.
+"""
+
+import importlib
+import json
+import struct
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+import numpy as np
+
+from attributes_to_language.types import VariantsT
+from attributes_to_language.writers import Writer
+
+if TYPE_CHECKING:
+    from attributes_to_language.composer import Composer
+
+# Bump when the layout of the artifacts changes
+ARTIFACT_VERSION = 1
+
+ALIGNMENT = 64
+
+_MAGIC = b"A2LCOMP\x00"
+# magic bytes, version, size of the header
+_PREFIX = struct.Struct("<8sIQ")
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_registry: dict[str, Callable[..., Any]] = dict()
+# attribute of the callables returned by registered factories
+_REFERENCE_ATTRIBUTE = "__artifact_reference__"
+
+
+class ComposerState(NamedTuple):
+    script_structures: list[str]
+    writers: dict[str, list[Writer]]
+    variants: VariantsT
+    modifiers: list[Callable[[str], str]]
+    seed: int | None
+
+
+def register(name: str) -> Callable[[_F], _F]:
+    """
+    Decorator registering a callable variant or modifier under a name, so that
+    composers using it can be saved.
+    """
+
+    def decorator(fn: _F) -> _F:
+        # the same function can be registered again when its module is reloaded
+        registered = _registry.get(name)
+        if registered is not None and _class_path(registered) != _class_path(fn):
+            raise ValueError(f"A function is already registered as {name}.")
+        _registry[name] = fn
+        return fn
+
+    return decorator
+
+
+def register_factory(name: str) -> Callable[[_F], _F]:
+    """
+    Decorator registering a function that returns callable variants or modifiers
+    (e.g. closures). The returned callables are saved as the name of the factory and
+    the arguments it was called with, which must be JSON values or arrays.
+    """
+
+    def decorator(factory: _F) -> _F:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            fn = factory(*args, **kwargs)
+            setattr(fn, _REFERENCE_ATTRIBUTE, (name, args, kwargs))
+            return fn
+
+        wrapper.__name__ = factory.__name__
+        wrapper.__qualname__ = factory.__qualname__
+        wrapper.__doc__ = factory.__doc__
+        register(name)(wrapper)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def get_registered(name: str) -> Callable[..., Any]:
+    if name not in _registry:
+        raise ValueError(
+            f"No function registered as {name}. Import the module registering it "
+            "before loading the artifact."
+        )
+    return _registry[name]
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _class_path(cls: type | Callable[..., Any]) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_class(path: str) -> type:
+    module_name, _, qualname = path.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    if not isinstance(obj, type) or not (
+        issubclass(obj, Writer) or module_name.startswith("attributes_to_language.")
+    ):
+        raise ValueError(f"{path} cannot be loaded from an artifact.")
+    return obj
+
+
+class _Encoder:
+    """
+    Converts objects to JSON values, and collects their arrays.
+    """
+
+    def __init__(self):
+        self.arrays: list[np.ndarray] = []
+        self.objects: list[dict[str, Any]] = []
+        self._array_ids: dict[int, int] = dict()
+        self._object_ids: dict[int, int] = dict()
+
+    def encode(self, value: Any) -> Any:
+        if value is None or isinstance(value, bool | int | float | str):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return {"__array__": self.encode_array(value)}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, tuple):
+            return {"__tuple__": [self.encode(item) for item in value]}
+        if isinstance(value, dict):
+            if all(isinstance(key, str) and not key.startswith("__") for key in value):
+                return {key: self.encode(item) for key, item in value.items()}
+            return {
+                "__dict__": [
+                    [self.encode(key), self.encode(item)] for key, item in value.items()
+                ]
+            }
+        if isinstance(value, Path):
+            return {"__path__": str(value)}
+        if type(value).__module__.startswith("attributes_to_language.") or isinstance(
+            value, Writer
+        ):
+            return {"__object__": self.encode_object(value)}
+        if callable(value) and not isinstance(value, type):
+            return {"__callable__": self.encode_callable(value)}
+        raise ValueError(f"Values of type {type(value)} cannot be saved.")
+
+    def encode_array(self, array: np.ndarray) -> int:
+        if id(array) not in self._array_ids:
+            if array.dtype.hasobject:
+                raise ValueError("Arrays of objects cannot be saved.")
+            self._array_ids[id(array)] = len(self.arrays)
+            self.arrays.append(array)
+        return self._array_ids[id(array)]
+
+    def encode_callable(self, fn: Callable[..., Any]) -> Any:
+        reference = getattr(fn, _REFERENCE_ATTRIBUTE, None)
+        if reference is not None:
+            name, args, kwargs = reference
+            return [name, self.encode(list(args)), self.encode(kwargs)]
+        for name, registered in _registry.items():
+            if registered is fn:
+                return [name, None, None]
+        raise ValueError(
+            f"{fn} is not registered. Decorate it with artifact.register, or its "
+            "factory with artifact.register_factory."
+        )
+
+    def encode_object(self, obj: Any) -> int:
+        if id(obj) not in self._object_ids:
+            self._object_ids[id(obj)] = len(self.objects)
+            self.objects.append(dict())
+            state = obj.__getstate__()
+            self.objects[self._object_ids[id(obj)]] = {
+                "class": _class_path(type(obj)),
+                "state": self.encode(state),
+            }
+        return self._object_ids[id(obj)]
+
+
+class _Decoder:
+    def __init__(self, objects: Sequence[dict[str, Any]], arrays: Sequence[np.ndarray]):
+        self.arrays = arrays
+        self.objects: list[Any] = []
+        for obj in objects:
+            cls = _load_class(obj["class"])
+            self.objects.append(object.__new__(cls))
+        # the objects are created first, so that they can reference each other
+        for instance, obj in zip(self.objects, objects, strict=True):
+            state = self.decode(obj["state"])
+            if hasattr(instance, "__setstate__"):
+                instance.__setstate__(state)
+            elif state is not None:
+                instance.__dict__.update(state)
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "__array__" in value:
+            return self.arrays[value["__array__"]]
+        if "__tuple__" in value:
+            return tuple(self.decode(item) for item in value["__tuple__"])
+        if "__dict__" in value:
+            return {
+                self.decode(key): self.decode(item) for key, item in value["__dict__"]
+            }
+        if "__path__" in value:
+            return Path(value["__path__"])
+        if "__callable__" in value:
+            name, args, kwargs = value["__callable__"]
+            fn = get_registered(name)
+            if args is None:
+                return fn
+            return fn(*self.decode(args), **self.decode(kwargs))
+        if "__object__" in value:
+            return self.objects[value["__object__"]]
+        return {key: self.decode(item) for key, item in value.items()}
+
+
+def save_composer(composer: "Composer", path: str | Path):
+    """
+    Save the compiled state of a composer to an artifact.
+    Raises ValueError if a callable variant or modifier is not registered.
+    """
+    encoder = _Encoder()
+    header: dict[str, Any] = {
+        "script_structures": list(composer.script_structures),
+        "writers": {
+            name: [encoder.encode(writer) for writer in writers]
+            for name, writers in composer.writers.items()
+        },
+        "variants": encoder.encode(
+            {name: list(variants) for name, variants in composer.variants.items()}
+        ),
+        "modifiers": [encoder.encode(modifier) for modifier in composer.modifiers],
+        "seed": composer.seed,
+        "objects": encoder.objects,
+    }
+    arrays = [np.ascontiguousarray(array) for array in encoder.arrays]
+    offset = 0
+    header["arrays"] = []
+    for array in arrays:
+        header["arrays"].append(
+            {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        )
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(_MAGIC, ARTIFACT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for array, info in zip(arrays, header["arrays"], strict=True):
+            f.seek(data_start + info["offset"])
+            f.write(array.data.cast("B") if array.ndim else array.tobytes())
+        f.truncate(data_start + offset)
+
+
+def load_composer_state(path: str | Path, mmap: bool = True) -> ComposerState:
+    """
+    Load the state of a composer saved with save_composer.
+    Args:
+        path: path of the artifact.
+        mmap: memory-map the arrays instead of reading them. The mapped arrays are
+            read-only and shared by the processes loading the same artifact.
+
+    Returns: The arguments to build the composer with.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is not a composer artifact.")
+        magic, version, header_size = _PREFIX.unpack(prefix)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a composer artifact.")
+        if version != ARTIFACT_VERSION:
+            raise ValueError(
+                f"{path} has version {version}, expected {ARTIFACT_VERSION}."
+            )
+        header = json.loads(f.read(header_size))
+    data_start = _align(_PREFIX.size + header_size)
+
+    arrays: list[np.ndarray] = []
+    data: np.ndarray | None = None
+    for info in header["arrays"]:
+        dtype = np.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        size = int(np.prod(shape)) * dtype.itemsize
+        if size == 0:
+            arrays.append(np.empty(shape, dtype=dtype))
+            continue
+        if data is None:
+            data = (
+                np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+                if mmap
+                else np.fromfile(path, dtype=np.uint8, offset=data_start)
+            )
+        buffer = data[info["offset"] : info["offset"] + size]
+        arrays.append(buffer.view(dtype).reshape(shape))
+
+    decoder = _Decoder(header["objects"], arrays)
+    return ComposerState(
+        script_structures=header["script_structures"],
+        writers={
+            name: [decoder.decode(writer) for writer in writers]
+            for name, writers in header["writers"].items()
+        },
+        variants=decoder.decode(header["variants"]),
+        modifiers=[decoder.decode(modifier) for modifier in header["modifiers"]],
+        seed=header["seed"],
+    )
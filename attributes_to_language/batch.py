@@ -0,0 +1,114 @@
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+
+def encode_captions(captions: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    UTF-8 bytes of the captions, concatenated, and the int64 offsets of shape
+    (N + 1,) of each caption in the bytes.
+    """
+    data = "".join(captions).encode()
+    offsets = np.zeros(len(captions) + 1, dtype=np.int64)
+    if data.isascii():
+        # one byte per character, the captions do not need to be encoded one by one
+        lengths = [len(caption) for caption in captions]
+    else:
+        lengths = [len(caption.encode()) for caption in captions]
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, np.frombuffer(data, dtype=np.uint8)
+
+
+def decode_captions(offsets: np.ndarray, data: np.ndarray) -> list[str]:
+    buffer = data.tobytes()
+    bounds = offsets.tolist()
+    return [
+        buffer[start:end].decode()
+        for start, end in zip(bounds, bounds[1:], strict=False)
+    ]
+
+
+class CaptionBatch:
+    """
+    Columnar captions of a batch, with the layout of Arrow string arrays:
+        - offsets: int64 array of shape (N + 1,), caption k is data[offsets[k] :
+          offsets[k + 1]],
+        - data: uint8 array of the UTF-8 bytes of the captions, concatenated,
+        - choices: (N, len(codec)) matrix of the choices encoded with the codec of
+          the composer (see ChoicesCodec).
+    A batch is made of three arrays whatever its size, so it can be pickled, sent
+    to another process or written to disk without handling each caption.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray, choices: np.ndarray):
+        assert offsets.ndim == 1 and len(offsets) == len(choices) + 1
+        self.offsets = offsets
+        self.data = data
+        self.choices = choices
+
+    @classmethod
+    def from_captions(
+        cls, captions: Sequence[str], choices: np.ndarray
+    ) -> "CaptionBatch":
+        """
+        Args:
+            captions: the captions of the batch.
+            choices: matrix of the encoded choices of the batch.
+        """
+        offsets, data = encode_captions(captions)
+        return cls(offsets, data, choices)
+
+    @classmethod
+    def concatenate(
+        cls, batches: Sequence["CaptionBatch"], num_keys: int, dtype: np.dtype
+    ) -> "CaptionBatch":
+        """
+        Concatenate batches in order.
+        Args:
+            batches: the batches.
+            num_keys: number of columns of the encoded choices, for an empty batch.
+            dtype: type of the encoded choices, for an empty batch.
+        """
+        if not len(batches):
+            return cls(
+                np.zeros(1, dtype=np.int64),
+                np.empty(0, dtype=np.uint8),
+                np.empty((0, num_keys), dtype=dtype),
+            )
+        # shift the offsets of each batch by the size of the previous ones
+        starts = np.cumsum([0] + [len(batch.data) for batch in batches[:-1]])
+        offsets = np.concatenate(
+            [np.zeros(1, dtype=np.int64)]
+            + [
+                batch.offsets[1:] + start
+                for batch, start in zip(batches, starts, strict=True)
+            ]
+        )
+        return cls(
+            offsets,
+            np.concatenate([batch.data for batch in batches]),
+            np.concatenate([batch.choices for batch in batches]),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + self.data.nbytes + self.choices.nbytes
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Index {index} out of range for {len(self)} captions.")
+        index %= len(self)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.captions())
+
+    def captions(self) -> list[str]:
+        """
+        The captions as a list of str.
+        """
+        return decode_captions(self.offsets, self.data)
@@ -0,0 +1,375 @@
+"""
+Benchmarks of the composer and of the writers.
+
+The reference workload is the simple_shapes example (examples/simple_shapes of the
+repository, it is not installed with the package): the writers of writers.py, and
+the structures and variants of config.py. Run with
+
+    python -m attributes_to_language.benchmark --config examples/simple_shapes \
+        --save baseline.json
+
+and compare a later run to the saved baseline with
+
+    python -m attributes_to_language.benchmark --config examples/simple_shapes \
+        --baseline baseline.json
+
+The command exits with status 1 if a benchmark is slower than the baseline by more
+than the threshold.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from types import ModuleType
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from attributes_to_language import utils
+from attributes_to_language.cli import import_config
+from attributes_to_language.composer import Composer, parse_groups, parse_tokens
+from attributes_to_language.types import AttributeT
+from attributes_to_language.writers import Writer
+
+BASELINE_VERSION = 1
+
+# minimal number of timed calls of the batch benchmarks, for stable percentiles
+MIN_BATCH_CALLS = 50
+
+# Palettes of attributes_to_language.utils benchmarked with get_closest_key
+PALETTES = ["COLORS_LARGE_SET", "COLORS_SPARSE", "COLORS_XKCD"]
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    calls: int
+    samples_per_sec: float
+    # latency of one call, in microseconds
+    p50_us: float
+    p90_us: float
+    p99_us: float
+    # mean over the calls of the peak of memory allocated by a call, in KiB
+    alloc_kib: float
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # function to benchmark, called with the index of the call
+    fn: Callable[[int], Any]
+    # number of samples processed by a call
+    samples: int = 1
+
+
+class Workload(NamedTuple):
+    composer: Composer
+    # writers to benchmark for each attribute
+    writers: dict[str, list[Writer]]
+    attributes: list[AttributeT]
+
+
+def load_config(directory: str | Path) -> tuple[ModuleType, ModuleType]:
+    """
+    Import the writers.py and config.py modules of an example directory.
+    writers.py defines the `writers` dict, and config.py defines
+    `script_structures`, `variants` and `random_attributes(rng)`, and optionally
+    `benchmark_writers`, the writers to benchmark (defaults to `writers`).
+    """
+    # imported as the CLI imports configurations, so that the functions registered
+    # by the example are the same
+    directory = Path(directory)
+    return import_config(directory / "writers.py"), import_config(directory)
+
+
+def load_workload(
+    directory: str | Path, num_samples: int = 1000, seed: int = 0
+) -> Workload:
+    """
+    Composer, writers and random attributes of the workload of an example directory.
+    """
+    writers_module, config = load_config(directory)
+    composer = Composer(
+        config.script_structures, writers_module.writers, config.variants
+    )
+    rng = np.random.default_rng(seed)
+    attributes = [config.random_attributes(rng) for _ in range(num_samples)]
+    benchmark_writers = getattr(config, "benchmark_writers", writers_module.writers)
+    return Workload(composer, benchmark_writers, attributes)
+
+
+def run_benchmark(
+    benchmark: Benchmark, calls: int, warmup: int = 10, alloc_calls: int = 100
+) -> BenchmarkResult:
+    """
+    Time each call of a benchmark, then trace the memory allocated by some calls.
+    The allocations are traced in a separate run as tracing slows the calls down.
+    Args:
+        benchmark: the benchmark.
+        calls: number of timed calls.
+        warmup: number of calls before the timed ones.
+        alloc_calls: number of calls with traced allocations.
+    """
+    for k in range(warmup):
+        benchmark.fn(k)
+    latencies = np.empty(calls, dtype=np.int64)
+    for k in range(calls):
+        start = time.perf_counter_ns()
+        benchmark.fn(k)
+        latencies[k] = time.perf_counter_ns() - start
+
+    alloc_calls = min(alloc_calls, calls)
+    peaks = np.zeros(alloc_calls, dtype=np.int64)
+    tracemalloc.start()
+    try:
+        for k in range(alloc_calls):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            benchmark.fn(k)
+            peaks[k] = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) / 1e3
+    return BenchmarkResult(
+        name=benchmark.name,
+        calls=calls,
+        samples_per_sec=benchmark.samples * calls * 1e9 / max(latencies.sum(), 1),
+        p50_us=float(p50),
+        p90_us=float(p90),
+        p99_us=float(p99),
+        alloc_kib=float(peaks.mean() / 1024) if alloc_calls else 0.0,
+    )
+
+
+def _as_args(value: Any) -> tuple:
+    if not isinstance(value, list | tuple):
+        return (value,)
+    return tuple(value)
+
+
+def writer_benchmarks(workload: Workload, batch_size: int) -> Iterator[Benchmark]:
+    """
+    One call and one batch benchmark for each writer.
+    """
+    num_samples = len(workload.attributes)
+    for name, writers in workload.writers.items():
+        values = [_as_args(sample[name]) for sample in workload.attributes]
+        batch = np.asarray(values[:batch_size])
+        if batch.shape[1] == 1:
+            batch = batch[:, 0]
+        for k, writer in enumerate(writers):
+            prefix = f"writer/{name}/{k}:{type(writer).__name__}"
+
+            def call(i: int, writer: Writer = writer, values=values):
+                return writer(*values[i % num_samples])
+
+            def call_batch(_: int, writer: Writer = writer, batch=batch):
+                return writer.batch(batch)
+
+            yield Benchmark(prefix, call)
+            yield Benchmark(f"{prefix}/batch", call_batch, len(batch))
+
+
+def palette_benchmarks(workload: Workload) -> Iterator[Benchmark]:
+    """
+    get_closest_key on each palette, with random colors.
+    """
+    rng = np.random.default_rng(0)
+    colors = rng.integers(256, size=(len(workload.attributes), 3)).tolist()
+    for palette in PALETTES:
+        values = getattr(utils, palette)["rgb"]
+
+        def call(i: int, values: np.ndarray = values):
+            return utils.get_closest_key(values, colors[i % len(colors)])
+
+        yield Benchmark(f"get_closest_key/{palette}", call)
+
+
+def parser_benchmarks(workload: Workload) -> Iterator[Benchmark]:
+    """
+    parse_tokens and parse_groups on each structure of the composer.
+    """
+    structures = workload.composer.script_structures
+    for parser in (parse_tokens, parse_groups):
+
+        def call(i: int, parser: Callable[[str], list[str]] = parser):
+            return parser(structures[i % len(structures)])
+
+        yield Benchmark(parser.__name__, call)
+
+
+def composer_benchmarks(workload: Workload, batch_size: int) -> Iterator[Benchmark]:
+    """
+    End-to-end Composer.__call__ with random choices, and with fixed complete
+    choices, and Composer.compose_batch with attribute dicts and with attribute
+    columns.
+    """
+    composer = workload.composer
+    attributes = workload.attributes
+    _, fixed_choices = composer(attributes[0])
+
+    def call_random(i: int):
+        return composer(attributes[i % len(attributes)])
+
+    def call_fixed(i: int):
+        return composer(attributes[i % len(attributes)], fixed_choices)
+
+    def call_batch(_: int):
+        return composer.compose_batch(attributes[:batch_size])
+
+    columns = {
+        name: np.asarray([sample[name] for sample in attributes[:batch_size]])
+        for name in attributes[0]
+    }
+
+    def call_batch_columns(_: int):
+        return composer.compose_batch(columns)
+
+    num_samples = min(batch_size, len(attributes))
+    yield Benchmark("composer/random", call_random)
+    yield Benchmark("composer/fixed", call_fixed)
+    yield Benchmark("composer/batch", call_batch, num_samples)
+    yield Benchmark("composer/batch_columns", call_batch_columns, num_samples)
+
+
+def all_benchmarks(workload: Workload, batch_size: int) -> Iterator[Benchmark]:
+    yield from writer_benchmarks(workload, batch_size)
+    yield from palette_benchmarks(workload)
+    yield from parser_benchmarks(workload)
+    yield from composer_benchmarks(workload, batch_size)
+
+
+def save_results(path: str | Path, results: Sequence[BenchmarkResult]):
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "version": BASELINE_VERSION,
+                "results": {result.name: result._asdict() for result in results},
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_baseline(path: str | Path) -> dict[str, BenchmarkResult]:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(
+            f"Baseline {path} has version {baseline.get('version')}, "
+            f"expected {BASELINE_VERSION}."
+        )
+    return {
+        name: BenchmarkResult(**result) for name, result in baseline["results"].items()
+    }
+
+
+def find_regressions(
+    results: Sequence[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult],
+    threshold: float,
+) -> list[tuple[BenchmarkResult, float]]:
+    """
+    Benchmarks whose throughput dropped by more than threshold (a fraction of the
+    baseline throughput), with their throughput relative to the baseline.
+    """
+    regressions: list[tuple[BenchmarkResult, float]] = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        ratio = result.samples_per_sec / baseline[result.name].samples_per_sec
+        if ratio < 1 - threshold:
+            regressions.append((result, ratio))
+    return regressions
+
+
+def format_results(
+    results: Sequence[BenchmarkResult],
+    baseline: dict[str, BenchmarkResult] | None = None,
+) -> str:
+    width = max((len(result.name) for result in results), default=4)
+    header = (
+        f"{'name':<{width}} {'samples/s':>12} {'p50 µs':>9} {'p90 µs':>9} "
+        f"{'p99 µs':>9} {'alloc KiB':>10}"
+    )
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    lines = [header]
+    for result in results:
+        line = (
+            f"{result.name:<{width}} {result.samples_per_sec:>12.1f} "
+            f"{result.p50_us:>9.2f} {result.p90_us:>9.2f} {result.p99_us:>9.2f} "
+            f"{result.alloc_kib:>10.2f}"
+        )
+        if baseline is not None:
+            if result.name in baseline:
+                ratio = result.samples_per_sec / baseline[result.name].samples_per_sec
+                line += f" {ratio:>7.2f}x"
+            else:
+                line += f" {'-':>8}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the composer and the writers."
+    )
+    parser.add_argument(
+        "--config",
+        required=True,
+        help="example directory with the writers.py and config.py of the workload.",
+    )
+    parser.add_argument("--calls", type=int, default=2000, help="timed calls.")
+    parser.add_argument(
+        "--batch-size", type=int, default=256, help="samples of the batch calls."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the attributes.")
+    parser.add_argument(
+        "--only",
+        nargs="*",
+        default=None,
+        help="only run the benchmarks whose name contains one of these.",
+    )
+    parser.add_argument("--save", help="save the results to this JSON file.")
+    parser.add_argument("--baseline", help="compare to this saved JSON baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fraction of the baseline throughput that can be lost before a "
+        "benchmark is a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    workload = load_workload(args.config, seed=args.seed)
+    results: list[BenchmarkResult] = []
+    for benchmark in all_benchmarks(workload, args.batch_size):
+        if args.only and not any(pattern in benchmark.name for pattern in args.only):
+            continue
+        calls = args.calls
+        if benchmark.samples > 1:
+            calls = max(MIN_BATCH_CALLS, calls // benchmark.samples)
+        results.append(run_benchmark(benchmark, calls))
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print(format_results(results, baseline))
+    if args.save:
+        save_results(args.save, results)
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.threshold)
+        for result, ratio in regressions:
+            print(
+                f"Regression: {result.name} runs at {ratio:.2f}x of the baseline "
+                "throughput."
+            )
+        if len(regressions):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
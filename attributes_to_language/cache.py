@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[_K, _V]):
+    """
+    Bounded mapping that evicts the least recently used entry when full.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Args:
+            maxsize: maximal number of entries.
+        """
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._data: OrderedDict[_K, _V] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: _K) -> _V | None:
+        """
+        Value of key, or None if it is not cached.
+        """
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: _K, value: _V):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._data)
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getstate__(self) -> dict[str, int]:
+        # the cached values are not copied, e.g. when a writer is pickled or saved
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state: dict[str, int]):
+        self.__init__(state["maxsize"])  # type: ignore[misc]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
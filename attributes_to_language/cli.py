@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib
+import importlib.abc
+import importlib.util
+import signal
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from types import ModuleType
+
+from attributes_to_language.composer import Composer, num_column_rows
+from attributes_to_language.dataset import (
+    BinaryWriter,
+    JsonlWriter,
+    generate_file,
+    read_columns,
+)
+from attributes_to_language.server import CaptionServer
+
+
+class _NeighbourFinder(importlib.abc.MetaPathFinder):
+    """
+    Resolve the top level imports of the modules of a configuration folder (e.g.
+    `from writers import writers`) to the modules of its namespace.
+    """
+
+    def __init__(self, namespace: str, directory: Path):
+        self.namespace = namespace
+        self.directory = directory
+
+    def is_neighbour(self, name: str) -> bool:
+        return "." not in name and (
+            (self.directory / f"{name}.py").is_file()
+            or (self.directory / name / "__init__.py").is_file()
+        )
+
+    def find_spec(self, fullname, path=None, target=None):
+        if path is not None or not self.is_neighbour(fullname):
+            return None
+        module = importlib.import_module(f"{self.namespace}.{fullname}")
+        return importlib.util.spec_from_loader(fullname, _ModuleLoader(module))
+
+
+class _ModuleLoader(importlib.abc.Loader):
+    def __init__(self, module: ModuleType):
+        self.module = module
+
+    def create_module(self, spec):
+        return self.module
+
+    def exec_module(self, module):
+        pass
+
+
+def import_config(config: str | Path) -> ModuleType:
+    """
+    Import a configuration module, given as a path to a Python file, or to a folder
+    with a config.py file, or as a module name.
+    The files of a folder are imported as the modules of a namespace of the folder,
+    attributes_to_language._config_<hash>, so that the configurations of other
+    folders do not share their neighbours. A configuration can import its
+    neighbours by name (e.g. `from writers import writers`).
+    """
+    path = Path(config)
+    if path.is_dir():
+        path = path / "config.py"
+    if path.suffix != ".py":
+        return importlib.import_module(str(config))
+    directory = path.resolve().parent
+    digest = hashlib.sha1(str(directory).encode()).hexdigest()[:16]
+    namespace = f"attributes_to_language._config_{digest}"
+    if namespace not in sys.modules:
+        spec = importlib.util.spec_from_loader(namespace, None, is_package=True)
+        assert spec is not None
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [str(directory)]
+        sys.modules[namespace] = package
+    # the neighbours are only reachable by name while the configuration is imported
+    finder = _NeighbourFinder(namespace, directory)
+    hidden = {
+        name: sys.modules.pop(name)
+        for name in list(sys.modules)
+        if finder.is_neighbour(name)
+    }
+    sys.meta_path.insert(0, finder)
+    try:
+        return importlib.import_module(f"{namespace}.{path.stem}")
+    finally:
+        sys.meta_path.remove(finder)
+        for name in list(sys.modules):
+            if finder.is_neighbour(name):
+                del sys.modules[name]
+        sys.modules.update(hidden)
+
+
+def load_composer(
+    config: str | Path, seed: int | None = None, imports: Sequence[str] = ()
+) -> Composer:
+    """
+    Build the composer of a configuration.
+    Args:
+        config: either an artifact saved with Composer.save, or a configuration
+            module (see import_config) defining `script_structures` and `writers`,
+            and optionally `variants` and `modifiers`.
+        seed: seed of the composer. Defaults to the seed of the artifact.
+        imports: modules imported first (see import_config), e.g. the modules
+            registering the callable variants of an artifact.
+    """
+    for module_name in imports:
+        import_config(module_name)
+    path = Path(config)
+    if path.is_file() and path.suffix != ".py":
+        return Composer.load(path, rng=seed)
+    module = import_config(config)
+    return Composer(
+        module.script_structures,
+        module.writers,
+        getattr(module, "variants", None),
+        getattr(module, "modifiers", None),
+        rng=seed,
+    )
+
+
+def add_composer_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "config",
+        help="configuration module (Python file, folder with a config.py, or module "
+        "name) or artifact saved with Composer.save.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="seed of the composer. Defaults to the seed of the artifact, and for "
+        "generate to 0 if the composer has no seed.",
+    )
+    parser.add_argument(
+        "--import",
+        dest="imports",
+        nargs="*",
+        default=[],
+        help="modules to import before loading the composer, e.g. the modules "
+        "registering the callable variants of an artifact.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes. Defaults to the number of CPUs.",
+    )
+
+
+def serve(args: argparse.Namespace) -> int:
+    server = CaptionServer(
+        functools.partial(load_composer, args.config, args.seed, args.imports),
+        num_workers=args.workers,
+        report_interval=args.report_interval or None,
+    )
+
+    def ready(address):
+        print(f"Serving on {address}", file=sys.stderr, flush=True)
+
+    async def run():
+        # stop serving on SIGINT and SIGTERM, so that the workers are shut down and
+        # the socket is removed
+        task = asyncio.current_task()
+        assert task is not None
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, task.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await server.serve(args.socket, args.host, args.port, ready)
+
+    asyncio.run(run())
+    return 0
+
+
+def resolve_seed(composer: Composer, seed: int | None) -> int:
+    """
+    Seed of a generation: the given seed, otherwise the seed of the composer (e.g.
+    saved in its artifact), otherwise 0.
+    """
+    if seed is not None:
+        return seed
+    return 0 if composer.seed is None else composer.seed
+
+
+def generate(args: argparse.Namespace) -> int:
+    columns = read_columns(args.inputs)
+    # the output only depends on the seed, not on the workers or the chunks
+    composer = load_composer(args.config, args.seed, args.imports)
+    seed = resolve_seed(composer, args.seed)
+    composer_factory = functools.partial(load_composer, args.config, seed, args.imports)
+    output_format = args.format
+    if output_format is None:
+        output_format = "jsonl" if Path(args.output).suffix == ".jsonl" else "binary"
+    writer_type = JsonlWriter if output_format == "jsonl" else BinaryWriter
+    metadata = {"seed": seed, "num_samples": num_column_rows(columns)}
+    # the codec does not depend on the seed
+    with writer_type(args.output, composer.codec, args.resume, metadata) as writer:
+        generate_file(
+            composer_factory,
+            columns,
+            writer,
+            num_workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress=not args.quiet,
+        )
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="attributes-to-language",
+        description="Parameterized language from attributes and grammar.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="serve batch compose requests over a Unix domain socket or localhost "
+        "TCP (see attributes_to_language.server).",
+    )
+    add_composer_arguments(serve_parser)
+    serve_parser.add_argument("--socket", help="path of the Unix domain socket.")
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="host of the TCP server, without --socket."
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=0, help="port of the TCP server, without --socket."
+    )
+    serve_parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=10.0,
+        help="seconds between the reports of the throughput and latencies. 0 "
+        "disables the reports.",
+    )
+    serve_parser.set_defaults(run=serve)
+
+    generate_parser = commands.add_parser(
+        "generate",
+        help="caption attribute columns of .npy, .npz or CSV files (see "
+        "attributes_to_language.dataset).",
+    )
+    add_composer_arguments(generate_parser)
+    generate_parser.add_argument(
+        "inputs", nargs="+", help=".npy, .npz or CSV files of attribute columns."
+    )
+    generate_parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="JSONL file, or folder of the binary output.",
+    )
+    generate_parser.add_argument(
+        "--format",
+        choices=["jsonl", "binary"],
+        default=None,
+        help="output format. Defaults to jsonl for a .jsonl output, binary otherwise.",
+    )
+    generate_parser.add_argument(
+        "--chunk-size", type=int, default=10_000, help="samples per chunk."
+    )
+    generate_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue after the last finished chunk of the output.",
+    )
+    generate_parser.add_argument(
+        "--quiet", action="store_true", help="do not display the progress."
+    )
+    generate_parser.set_defaults(run=generate)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from attributes_to_language.types import Choices
+
+if TYPE_CHECKING:
+    from attributes_to_language.composer import Composer
+
+# Value of a slot whose choice is not set
+UNSET_CHOICE = -1
+
+
+class ChoicesCodec:
+    """
+    Fixed-length integer encoding of the choices of a composer, so that the choices
+    of a batch can be stored in one contiguous (N, len(keys)) matrix instead of
+    nested dicts.
+
+    The slots are, in order: "structure", "groups/j" for each position of the
+    largest group permutation, then for each attribute "writers/{name}/_writer"
+    and the choice keys of its writers, and finally "variants/{name}" for each
+    variant of the composer. Choices that are not set are encoded as
+    UNSET_CHOICE. Writer choices that no writer of the attribute draws (e.g. given
+    by the user and ignored by the writer) are not encoded.
+    """
+
+    def __init__(self, composer: "Composer", dtype: np.dtype | type = np.int16):
+        """
+        Args:
+            composer: the composer whose choices are encoded.
+            dtype: signed integer type of the encoded choices.
+        """
+        self.dtype = np.dtype(dtype)
+        assert self.dtype.kind == "i", "Choices are encoded with signed integers"
+        self.num_groups = [len(groups) for groups in composer.groups]
+        self.max_groups = max(self.num_groups, default=0)
+        self.writer_keys: dict[str, list[str]] = dict()
+        for name, writers in composer.writers.items():
+            keys = ["_writer"]
+            for writer in writers:
+                keys.extend(key for key in writer.choice_keys if key not in keys)
+            self.writer_keys[name] = keys
+        self.variant_keys: list[str] = list(composer.variants)
+
+        self.keys: list[str] = ["structure"]
+        self.keys.extend(f"groups/{k}" for k in range(self.max_groups))
+        for name, keys in self.writer_keys.items():
+            self.keys.extend(f"writers/{name}/{key}" for key in keys)
+        self.keys.extend(f"variants/{name}" for name in self.variant_keys)
+        self.slots = {key: k for k, key in enumerate(self.keys)}
+        self._writer_slots = {
+            name: [(key, self.slots[f"writers/{name}/{key}"]) for key in keys]
+            for name, keys in self.writer_keys.items()
+        }
+        self._variant_slots = [
+            (name, self.slots[f"variants/{name}"]) for name in self.variant_keys
+        ]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _set(self, row: np.ndarray, key: str, value: int):
+        if key not in self.slots:
+            raise ValueError(f"Choice {key} is not part of the encoding.")
+        if not 0 <= value <= np.iinfo(self.dtype).max:
+            raise ValueError(f"Choice {key}={value} cannot be encoded as {self.dtype}.")
+        row[self.slots[key]] = value
+
+    def encode(self, choices: Choices, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Encode choices into an array of shape (len(keys),).
+        Args:
+            choices: the (possibly partial) choices.
+            out: optional array to write the encoded choices to.
+        """
+        row = out if out is not None else np.empty(len(self.keys), dtype=self.dtype)
+        row.fill(UNSET_CHOICE)
+        if "structure" in choices:
+            self._set(row, "structure", choices["structure"])
+        for k, group in enumerate(choices.get("groups", [])):
+            self._set(row, f"groups/{k}", group)
+        for name, writer_choices in choices.get("writers", {}).items():
+            if name not in self.writer_keys:
+                raise ValueError(f"Attribute {name} is not part of the encoding.")
+            for key, value in writer_choices.items():
+                if key in self.writer_keys[name]:
+                    self._set(row, f"writers/{name}/{key}", value)
+        for name, value in choices.get("variants", {}).items():
+            self._set(row, f"variants/{name}", value)
+        return row
+
+    def encode_batch(self, choices: Sequence[Choices]) -> np.ndarray:
+        """
+        Encode the choices of a batch into a matrix of shape (N, len(keys)).
+        """
+        matrix = np.empty((len(choices), len(self.keys)), dtype=self.dtype)
+        for k, sample_choices in enumerate(choices):
+            self.encode(sample_choices, out=matrix[k])
+        return matrix
+
+    def decode(self, row: np.ndarray | Sequence[int]) -> Choices:
+        """
+        Decode an array of shape (len(keys),) into choices. Unset slots are left out,
+        so the result can be completed by the composer.
+        """
+        values: list[int] = row.tolist() if isinstance(row, np.ndarray) else list(row)
+        assert len(values) == len(self.keys)
+        choices = Choices(writers=dict(), variants=dict())
+        structure = values[0]
+        groups = values[1 : 1 + self.max_groups]
+        if structure != UNSET_CHOICE:
+            choices["structure"] = structure
+            groups = groups[: self.num_groups[structure]]
+            if UNSET_CHOICE not in groups:
+                choices["groups"] = groups
+        else:
+            if UNSET_CHOICE in groups:
+                groups = groups[: groups.index(UNSET_CHOICE)]
+            if len(groups):
+                choices["groups"] = groups
+        for name, slots in self._writer_slots.items():
+            writer_choices = {
+                key: values[slot] for key, slot in slots if values[slot] != UNSET_CHOICE
+            }
+            if len(writer_choices):
+                choices["writers"][name] = writer_choices
+        for name, slot in self._variant_slots:
+            if values[slot] != UNSET_CHOICE:
+                choices["variants"][name] = values[slot]
+        return choices
+
+    def decode_batch(self, matrix: np.ndarray) -> list[Choices]:
+        """
+        Decode a matrix of shape (N, len(keys)) into the choices of each row.
+        """
+        return [self.decode(row) for row in np.asarray(matrix).tolist()]
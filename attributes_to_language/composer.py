@@ -1,24 +1,44 @@
 import random
-from collections.abc import Callable, Sequence
+import time
+from collections.abc import Callable, Mapping, Sequence
+from functools import cached_property
+from pathlib import Path
 from typing import Any, TypeVar
 
 import numpy as np
 
+from attributes_to_language.artifact import load_composer_state, save_composer
+from attributes_to_language.batch import CaptionBatch
+from attributes_to_language.codec import ChoicesCodec
+from attributes_to_language.frozen import FrozenComposer
+from attributes_to_language.sampling import CounterSampler, Sampler, get_sampler
+from attributes_to_language.space import ChoiceSpace
+from attributes_to_language.stats import ComposerStats
+from attributes_to_language.template import as_template, compile_template
 from attributes_to_language.types import (
+    AttributeColumnsT,
     AttributeT,
     Choices,
     ChoicesT,
     ComputedAttributeT,
     VariantsT,
 )
-from attributes_to_language.writers import Writer
+from attributes_to_language.writers import UNSET, Writer
 
 _T = TypeVar("_T")
 
 
-def choose_element(key: str, options: Sequence[_T], choices: ChoicesT | Choices) -> _T:
+def choose_element(
+    key: str,
+    options: Sequence[_T],
+    choices: ChoicesT | Choices,
+    rng: Sampler | None = None,
+) -> _T:
     if key not in choices:
-        choices[key] = random.randint(0, len(options) - 1)
+        if rng is None:
+            choices[key] = random.randint(0, len(options) - 1)
+        else:
+            choices[key] = rng.randint(key, len(options))
     choice = options[choices[key]]
     return choice
 
@@ -66,13 +86,61 @@ def remove_extra_spaces(text: str) -> str:
     return " ".join(text.split())
 
 
+def as_columns(attributes: AttributeColumnsT | np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Attribute columns of a dict of arrays or of a structured array.
+    """
+    if isinstance(attributes, np.ndarray):
+        if attributes.dtype.names is None:
+            raise ValueError("Arrays of attributes must be structured arrays.")
+        return {name: attributes[name] for name in attributes.dtype.names}
+    return {name: np.asarray(column) for name, column in attributes.items()}
+
+
+def rows_as_columns(rows: Sequence[AttributeT]) -> dict[str, np.ndarray] | None:
+    """
+    Attribute columns of a sequence of attribute dicts. None if the rows do not
+    have the same attributes, or if the values of an attribute cannot be stacked
+    in a regular array without changing their type (e.g. values of different
+    types or lengths).
+    """
+    if not len(rows):
+        return None
+    names = rows[0].keys()
+    columns: dict[str, np.ndarray] = dict()
+    for name in names:
+        values = [row.get(name) for row in rows]
+        if len({type(value) for value in values}) != 1:
+            return None
+        try:
+            column = np.asarray(values)
+        except ValueError:
+            return None
+        if column.dtype.hasobject or column.ndim > 2:
+            return None
+        columns[name] = column
+    if any(row.keys() != names for row in rows):
+        return None
+    return columns
+
+
+def num_column_rows(columns: AttributeColumnsT) -> int:
+    """
+    Number of rows of columns of attributes, 0 without columns.
+    """
+    sizes = {len(column) for column in columns.values()}
+    assert len(sizes) <= 1, "All the attribute columns must have the same length."
+    return sizes.pop() if len(sizes) else 0
+
+
 class Composer:
     def __init__(
         self,
         script_structures: Sequence[str],
-        available_writers: dict[str, Sequence[Writer]],
+        available_writers: Mapping[str, Sequence[Writer]],
         variants: VariantsT | None = None,
         modifiers: Sequence[Callable[[str], str]] | None = None,
+        rng: np.random.Generator | Sampler | int | None = None,
     ):
         """
         Args:
@@ -85,25 +153,128 @@ class Composer:
                 list of possible values to chose from.
             modifiers: list of transformation function to apply to the script structure
                 before variants and attributes are set.
+            rng: source of the random choices. Either a numpy Generator, or a seed.
+                With a seed, the sample index can also be given when composing to
+                draw the choices of sample k from (seed, k) only (see
+                CounterSampler). Defaults to the global random and np.random states.
         """
         self.script_structures = script_structures
         self.writers = available_writers
         self.variants = variants or {}
         self.modifiers = modifiers or {}
         self.groups: list[list[str]] = [parse_groups(s) for s in self.script_structures]
+        self.seed: int | None = None
+        if isinstance(rng, int):
+            self.seed = rng
+            rng = np.random.default_rng(rng)
+        self.sampler = get_sampler(rng)
+        # per-stage timings, collected once enabled with enable_stats
+        self.stats: ComposerStats | None = None
+        # Compile the structures and the variants once
+        if not self.modifiers:
+            for struct_id, groups in enumerate(self.groups):
+                compile_template(self.get_structure(struct_id, range(len(groups))))
+        for possible_variants in self.variants.values():
+            for variant in possible_variants:
+                if isinstance(variant, str):
+                    compile_template(variant)
+
+    def get_sampler(self, index: int | np.ndarray | None = None) -> Sampler:
+        """
+        Sampler of the composer, or counter-based sampler of the sample(s) of the
+        given index when index is not None.
+        """
+        if index is None:
+            return self.sampler
+        if self.seed is None:
+            raise ValueError("Sampling by index needs a composer created with a seed.")
+        return CounterSampler(self.seed, index)
+
+    def save(self, path: str | Path):
+        """
+        Save the compiled state of the composer (structures, variants, writers with
+        their tables and palettes) to a binary artifact. Callable variants and
+        modifiers must be registered (see artifact.register).
+        """
+        save_composer(self, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        rng: np.random.Generator | Sampler | int | None = None,
+        mmap: bool = True,
+    ) -> "Composer":
+        """
+        Load a composer saved with Composer.save.
+        Args:
+            path: path of the artifact.
+            rng: source of the random choices. Defaults to the seed of the saved
+                composer, if it had one.
+            mmap: memory-map the arrays of the writers instead of reading them.
+        """
+        state = load_composer_state(path, mmap)
+        return cls(
+            state.script_structures,
+            state.writers,
+            state.variants,
+            state.modifiers,
+            state.seed if rng is None else rng,
+        )
+
+    def enable_stats(self) -> ComposerStats:
+        """
+        Collect the time spent in each stage of the composer (see ComposerStats).
+        Returns: The stats object, which can be snapshotted and reset.
+        """
+        if self.stats is None:
+            self.stats = ComposerStats()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    @cached_property
+    def codec(self) -> ChoicesCodec:
+        """
+        Encoding of the choices of the composer into fixed-length integer arrays.
+        """
+        return ChoicesCodec(self)
+
+    def choice_space(self, attributes: AttributeT) -> ChoiceSpace:
+        """
+        Space of the complete choices of the composer for a set of attributes.
+        """
+        return ChoiceSpace(self, attributes)
+
+    def freeze(self, choices: Choices) -> FrozenComposer:
+        """
+        Specialize the composer to complete choices (see FrozenComposer). Raises
+        ValueError if the choices are incomplete.
+        """
+        return FrozenComposer(self, choices)
 
     def get_attribute(
-        self, name: str, value: Any, choices: ChoicesT
+        self, name: str, value: Any, choices: ChoicesT, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
-        writer = choose_element("_writer", self.writers[name], choices)
+        stats = self.stats
+        start = time.perf_counter_ns() if stats is not None else 0
+        writer = choose_element("_writer", self.writers[name], choices, rng)
         if not isinstance(value, list | tuple):
             value = (value,)
-        return writer(*value, choices=choices)
+        text, writer_choices = writer(*value, choices=choices, rng=rng)
+        if stats is not None:
+            stats.record(f"writers/{name}/{choices['_writer']}", start)
+        return text, writer_choices
 
     def chose_variant(
-        self, name: str, attributes: ComputedAttributeT | None, choices: ChoicesT
+        self,
+        name: str,
+        attributes: ComputedAttributeT | None,
+        choices: ChoicesT,
+        rng: Sampler | None = None,
     ) -> str:
-        variant = choose_element(name, self.variants[name], choices)
+        variant = choose_element(name, self.variants[name], choices, rng)
         if callable(variant):
             return variant(attributes)
         return variant
@@ -113,6 +284,7 @@ class Composer:
         attributes: ComputedAttributeT,
         name: str,
         choices: ChoicesT | None = None,
+        rng: Sampler | None = None,
     ) -> str:
         if choices is None:
             choices = dict()
@@ -120,73 +292,328 @@ class Composer:
         if name in self.writers and name in attributes:
             return attributes[name]
 
-        return self.chose_variant(name, attributes, choices)
+        return self.chose_variant(name, attributes, choices, rng)
 
     def get_variant(
         self,
         attributes: ComputedAttributeT,
         caption: str,
         choices: ChoicesT,
+        rng: Sampler | None = None,
     ) -> str:
-        tokens = parse_tokens(caption)
-        updates: dict[str, str] = {}
-        for k, token in enumerate(tokens):
-            if k >= 1 and tokens[k - 1] in attributes:
-                attributes["_prev"] = tokens[k - 1]
-            if k < len(tokens) - 1 and tokens[k + 1] in attributes:
-                attributes["_next"] = tokens[k + 1]
-            updates[token] = self.chose_element(attributes, token, choices)
-
-        if not len(updates):
-            return caption
+        segments = as_template(caption)
+        # Each pass substitutes the tokens of the current segments. The substituted
+        # values are compiled templates themselves, so their tokens are spliced in
+        # place and handled by the next pass without parsing the caption again.
+        while len(segments) > 1:
+            tokens = segments[1::2]
+            updates: dict[str, str] = {}
+            for k, token in enumerate(tokens):
+                if k >= 1 and tokens[k - 1] in attributes:
+                    attributes["_prev"] = tokens[k - 1]
+                if k < len(tokens) - 1 and tokens[k + 1] in attributes:
+                    attributes["_next"] = tokens[k + 1]
+                updates[token] = self.chose_element(attributes, token, choices, rng)
 
-        caption = caption.format(**updates)
-        return self.get_variant(attributes, caption, choices)
+            expanded = [segments[0]]
+            for k, token in enumerate(tokens):
+                value = as_template(updates[token])
+                expanded[-1] += value[0]
+                expanded.extend(value[1:])
+                expanded[-1] += segments[2 * k + 2]
+            segments = tuple(expanded)
+        return segments[0]
 
-    def __call__(self, attributes: AttributeT, choices: Choices | None = None):
+    def get_structure(self, struct_id: int, groups: Sequence[int]) -> str:
         """
-        Compose one sentence from a dict of attributes
+        Apply the modifiers and the group permutation to a script structure.
         Args:
-            attributes: Dictionary where a key is an attribute name and the value is the value of the attribute that
-                will be provided to the associated writer.
+            struct_id: index of the structure in script_structures.
+            groups: permutation of the groups of the structure.
 
-        Returns: The composed sentence.
+        Returns: The structure ready to be filled with variants and attributes.
         """
-        if choices is None:
-            choices = Choices()
-        # Select one of the templates
-        selected_structure = choose_element(
-            "structure", self.script_structures, choices
-        )
-        assert "structure" in choices
-        struct_id = choices["structure"]
+        stats = self.stats
+        start = time.perf_counter_ns() if stats is not None else 0
+        selected_structure = self.script_structures[struct_id]
         original_groups = self.groups[struct_id]
         # Execute script_transform
         if self.modifiers is not None:
             for modifier in self.modifiers:
                 selected_structure = modifier(selected_structure)
+        if stats is not None:
+            start = stats.record("modifiers", start)
         # Switch groups
-        if "groups" not in choices:
-            choices["groups"] = np.random.permutation(len(original_groups)).tolist()
-        groups = [original_groups[x] for x in choices["groups"]]
-        for original_group, group in zip(original_groups, groups, strict=False):
+        permuted_groups = [original_groups[x] for x in groups]
+        for original_group, group in zip(
+            original_groups, permuted_groups, strict=False
+        ):
             selected_structure = selected_structure.replace(original_group, group[1:-1])
-        # Get attributes
-        defined_attr = dict()
+        if stats is not None:
+            stats.record("groups", start)
+        return selected_structure
+
+    def get_attributes(
+        self, attributes: AttributeT, choices: Choices, rng: Sampler | None = None
+    ) -> ComputedAttributeT:
+        defined_attr: ComputedAttributeT = dict()
         if "writers" not in choices:
             choices["writers"] = dict()
         for name, attr in attributes.items():
             if name not in choices["writers"]:
                 choices["writers"][name] = dict()
             defined_attr[name], writer_choices = self.get_attribute(
-                name, attr, choices["writers"][name]
+                name,
+                attr,
+                choices["writers"][name],
+                None if rng is None else rng.child(f"writers/{name}/"),
             )
             choices["writers"][name].update(writer_choices)
+        return defined_attr
+
+    def get_caption(
+        self,
+        attributes: ComputedAttributeT,
+        structure: str,
+        choices: Choices,
+        rng: Sampler | None = None,
+    ) -> str:
+        stats = self.stats
+        start = time.perf_counter_ns() if stats is not None else 0
         # Fill variants and attributes
         if "variants" not in choices:
             choices["variants"] = dict()
         final_caption = self.get_variant(
-            defined_attr, selected_structure, choices["variants"]
+            attributes,
+            structure,
+            choices["variants"],
+            None if rng is None else rng.child("variants/"),
         ).strip()
+        if stats is not None:
+            start = stats.record("variants", start)
         # remove multiple spaces and spaces in front of "."
-        return remove_extra_spaces(final_caption).replace(" .", "."), choices
+        caption = remove_extra_spaces(final_caption).replace(" .", ".")
+        if stats is not None:
+            stats.record("cleanup", start)
+        return caption
+
+    def __call__(
+        self,
+        attributes: AttributeT,
+        choices: Choices | None = None,
+        index: int | None = None,
+    ):
+        """
+        Compose one sentence from a dict of attributes
+        Args:
+            attributes: Dictionary where a key is an attribute name and the value is the value of the attribute that
+                will be provided to the associated writer.
+            choices: (possibly partial) choices to use. Missing choices are drawn.
+            index: index of the sample. If given, the missing choices only depend on
+                the seed of the composer and on index.
+
+        Returns: The composed sentence.
+        """
+        stats = self.stats
+        start = time.perf_counter_ns() if stats is not None else 0
+        if choices is None:
+            choices = Choices()
+        rng = self.get_sampler(index)
+        # Select one of the templates
+        choose_element("structure", self.script_structures, choices, rng)
+        assert "structure" in choices
+        struct_id = choices["structure"]
+        if "groups" not in choices:
+            choices["groups"] = rng.permutation("groups", len(self.groups[struct_id]))
+        if stats is not None:
+            stats.record("structure", start)
+        selected_structure = self.get_structure(struct_id, choices["groups"])
+        # Get attributes
+        defined_attr = self.get_attributes(attributes, choices, rng)
+        caption = self.get_caption(defined_attr, selected_structure, choices, rng)
+        if stats is not None:
+            stats.record("total", start)
+        return caption, choices
+
+    def write_columns(
+        self,
+        columns: AttributeColumnsT,
+        batch_choices: Sequence[Choices],
+        rng: Sampler,
+    ) -> dict[str, list[str]]:
+        """
+        Write attribute columns with the batch method of the writers selected in
+        batch_choices, so that the values are not converted row by row. The writer
+        choices of batch_choices are completed in place.
+        Args:
+            columns: dict of attribute columns of the same length.
+            batch_choices: choices of each sample, with the selected writers.
+            rng: sampler of the batch.
+
+        Returns: The texts of each attribute.
+        """
+        stats = self.stats
+        written: dict[str, list[str]] = dict()
+        for name, column in columns.items():
+            rows_choices = [choices["writers"][name] for choices in batch_choices]
+            writer_ids = np.array(
+                [row_choices["_writer"] for row_choices in rows_choices], dtype=np.int64
+            )
+            texts: list[str] = [""] * len(rows_choices)
+            for writer_id in np.unique(writer_ids).tolist():
+                start = time.perf_counter_ns() if stats is not None else 0
+                writer = self.writers[name][writer_id]
+                rows = np.flatnonzero(writer_ids == writer_id)
+                row_list = rows.tolist()
+                given: dict[str, np.ndarray] = dict()
+                for key in writer.choice_keys:
+                    if any(key in rows_choices[k] for k in row_list):
+                        given[key] = np.array(
+                            [rows_choices[k].get(key, UNSET) for k in row_list],
+                            dtype=np.int64,
+                        )
+                result = writer.batch(
+                    column if len(rows) == len(column) else column[rows],
+                    given,
+                    rng.subset(rows).child(f"writers/{name}/"),
+                )
+                for k, text in zip(row_list, result.texts, strict=True):
+                    texts[k] = text
+                for key, values in result.choices.items():
+                    for k, value in zip(row_list, values.tolist(), strict=True):
+                        if value != UNSET:
+                            rows_choices[k][key] = value
+                if stats is not None:
+                    stats.record(f"writers/{name}/{writer_id}", start)
+            written[name] = texts
+        return written
+
+    def compose_batch(
+        self,
+        attributes: Sequence[AttributeT] | AttributeColumnsT | np.ndarray,
+        choices: Sequence[Choices | None] | np.ndarray | None = None,
+        indices: Sequence[int] | np.ndarray | None = None,
+    ) -> tuple[list[str], list[Choices]]:
+        """
+        Compose one sentence for each dict of attributes of a batch.
+        The structures and group permutations of the whole batch are sampled at once,
+        and the samples are then grouped by structure so that the modifiers and group
+        substitutions are only applied once per group. Given the same choices, the
+        result is the same as calling the composer on each sample.
+        Args:
+            attributes: sequence of attribute dicts, as given to `__call__`, or
+                columns of attributes: a dict of arrays of shape (N,) or (N, D) for
+                attributes of D values (e.g. colors), or a structured array with
+                one field per attribute. Columns are written with the batch method
+                of the writers (see write_columns). Attribute dicts are converted
+                to columns when they have the same attributes with values of the
+                same type (see rows_as_columns), otherwise each sample is written
+                on its own, which is about as slow as calling the composer.
+            choices: optional sequence of (possibly partial) choices, one per sample,
+                or matrix of choices encoded with the codec of the composer.
+            indices: optional index of each sample. If given, the missing choices of
+                a sample are the same as when calling the composer with its index.
+
+        Returns: The composed sentences and the choices of each sample.
+        """
+        stats = self.stats
+        start = time.perf_counter_ns() if stats is not None else 0
+        columns: dict[str, np.ndarray] | None = None
+        rows: Sequence[AttributeT] = []
+        if isinstance(attributes, np.ndarray | Mapping):
+            columns = as_columns(attributes)
+        else:
+            rows = attributes
+            columns = rows_as_columns(rows)
+        num_samples = len(rows) if columns is None else num_column_rows(columns)
+        if choices is None:
+            choices = [None] * num_samples
+        elif isinstance(choices, np.ndarray):
+            choices = self.codec.decode_batch(choices)
+        assert len(choices) == num_samples
+        batch_choices = [Choices() if c is None else c for c in choices]
+        rng = self.get_sampler(None if indices is None else np.asarray(indices))
+        # Select the templates of the whole batch
+        structures = rng.integers(
+            "structure", len(self.script_structures), len(batch_choices)
+        ).tolist()
+        by_structure: dict[int, list[int]] = {}
+        for k, sample_choices in enumerate(batch_choices):
+            if "structure" not in sample_choices:
+                sample_choices["structure"] = structures[k]
+            by_structure.setdefault(sample_choices["structure"], []).append(k)
+        # Switch groups and build each distinct structure once
+        by_template: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        for struct_id, samples in by_structure.items():
+            missing = [k for k in samples if "groups" not in batch_choices[k]]
+            if len(missing):
+                permutations = (
+                    rng.subset(missing)
+                    .permutations("groups", len(self.groups[struct_id]), len(missing))
+                    .tolist()
+                )
+                for k, permutation in zip(missing, permutations, strict=True):
+                    batch_choices[k]["groups"] = permutation
+            for k in samples:
+                key = (struct_id, tuple(batch_choices[k]["groups"]))
+                by_template.setdefault(key, []).append(k)
+        if stats is not None:
+            stats.record("structure", start)
+        # Select the writers of the whole batch
+        for k, sample_choices in enumerate(batch_choices):
+            if "writers" not in sample_choices:
+                sample_choices["writers"] = dict()
+            for name in rows[k] if columns is None else columns:
+                if name not in sample_choices["writers"]:
+                    sample_choices["writers"][name] = dict()
+        for name, writers in self.writers.items():
+            if columns is None:
+                samples = [k for k in range(num_samples) if name in rows[k]]
+            else:
+                samples = list(range(num_samples)) if name in columns else []
+            selected_writers = (
+                rng.subset(samples)
+                .child(f"writers/{name}/")
+                .integers("_writer", len(writers), len(samples))
+                .tolist()
+            )
+            for k, writer_id in zip(samples, selected_writers, strict=True):
+                batch_choices[k]["writers"][name].setdefault("_writer", writer_id)
+        # Get attributes and fill each structure
+        written = (
+            None if columns is None else self.write_columns(columns, batch_choices, rng)
+        )
+        captions: list[str] = [""] * num_samples
+        for (struct_id, groups), samples in by_template.items():
+            structure = self.get_structure(struct_id, groups)
+            for k in samples:
+                row_rng = rng.row(k)
+                if written is None:
+                    defined_attr = self.get_attributes(
+                        rows[k], batch_choices[k], row_rng
+                    )
+                else:
+                    defined_attr = {name: texts[k] for name, texts in written.items()}
+                captions[k] = self.get_caption(
+                    defined_attr, structure, batch_choices[k], row_rng
+                )
+        if stats is not None:
+            stats.record("total", start)
+        return captions, batch_choices
+
+    def compose_caption_batch(
+        self,
+        attributes: Sequence[AttributeT] | AttributeColumnsT | np.ndarray,
+        choices: Sequence[Choices | None] | np.ndarray | None = None,
+        indices: Sequence[int] | np.ndarray | None = None,
+    ) -> CaptionBatch:
+        """
+        Compose one sentence for each dict of attributes of a batch, as
+        compose_batch, and return them as columnar arrays: the UTF-8 bytes and
+        offsets of the captions, and the matrix of their choices encoded with the
+        codec of the composer. See compose_batch for the arguments.
+        """
+        captions, batch_choices = self.compose_batch(attributes, choices, indices)
+        return CaptionBatch.from_captions(
+            captions, self.codec.encode_batch(batch_choices)
+        )
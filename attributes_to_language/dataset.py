@@ -0,0 +1,397 @@
+"""
+Captioning of dataset files.
+
+Attribute columns are read from .npy files (one attribute per file, named after the
+file), .npz files (one attribute per array) or CSV files with a header. In CSV
+files, attributes made of several values are spread over the columns "{name}/0",
+"{name}/1", ...
+
+The captions are written either to a JSONL file, with one line per sample, or to a
+binary folder with:
+    - captions.bin: UTF-8 bytes of the captions, concatenated,
+    - offsets.bin: int64 end offset of each caption in captions.bin,
+    - choices.bin: choices encoded with the codec of the composer, one row per
+      sample,
+    - progress.json: number of written samples, size of the files at that point
+      and the slots of the encoded choices.
+The JSONL output has its progress in "{path}.progress.json". The progress is
+updated after each chunk, and a resumed generation truncates the files to the last
+finished chunk.
+"""
+
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+
+from attributes_to_language.batch import CaptionBatch
+from attributes_to_language.codec import ChoicesCodec
+from attributes_to_language.composer import Composer, num_column_rows
+from attributes_to_language.parallel import ColumnsT, generate_shards
+from attributes_to_language.stream import load_columns
+
+# Size of the buffers of the output files
+BUFFER_SIZE = 2**20
+
+
+def read_csv_columns(path: str | Path) -> dict[str, np.ndarray]:
+    """
+    Read the attribute columns of a CSV file with a header. Columns of integers
+    give int64 arrays, other columns float64 arrays.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        values: list[list[str]] = [[] for _ in header]
+        for row in reader:
+            for k, value in enumerate(row):
+                values[k].append(value)
+
+    parsed: dict[str, np.ndarray] = dict()
+    for name, strings in zip(header, values, strict=True):
+        try:
+            parsed[name] = np.array(strings, dtype=np.int64)
+        except ValueError:
+            parsed[name] = np.array(strings, dtype=np.float64)
+
+    columns: dict[str, np.ndarray] = dict()
+    multi: dict[str, list[tuple[int, np.ndarray]]] = dict()
+    for name, column in parsed.items():
+        attribute, _, position = name.rpartition("/")
+        if attribute and position.isdigit():
+            multi.setdefault(attribute, []).append((int(position), column))
+        else:
+            columns[name] = column
+    for attribute, parts in multi.items():
+        parts.sort(key=lambda part: part[0])
+        columns[attribute] = np.stack([column for _, column in parts], axis=1)
+    return columns
+
+
+def read_columns(paths: Iterable[str | Path]) -> ColumnsT:
+    """
+    Read the attribute columns of .npy, .npz and CSV files. The .npy files are
+    memory-mapped.
+    """
+    columns: dict[str, np.ndarray] = dict()
+    for path in map(Path, paths):
+        if path.suffix == ".npy":
+            columns.update(load_columns({path.stem: path}))
+        elif path.suffix == ".npz":
+            with np.load(path) as arrays:
+                columns.update({name: arrays[name] for name in arrays.files})
+        elif path.suffix == ".csv":
+            columns.update(read_csv_columns(path))
+        else:
+            raise ValueError(f"Unsupported attribute file {path}.")
+    return columns
+
+
+class CaptionsWriter:
+    """
+    Output of the generated captions, that can be resumed after the last finished
+    chunk.
+    """
+
+    def __init__(
+        self,
+        codec: ChoicesCodec,
+        resume: bool,
+        metadata: dict[str, Any] | None = None,
+    ):
+        """
+        Args:
+            codec: codec of the choices of the composer.
+            resume: continue the previous generation, otherwise start over.
+            metadata: JSON values saved with the progress (e.g. the seed). Resuming
+                an output with different metadata raises ValueError.
+        """
+        self.codec = codec
+        self.metadata = metadata or {}
+        self.num_samples = 0
+        self.files: dict[str, IO[bytes]] = dict()
+        progress = self.read_progress() if resume else None
+        if progress is not None:
+            if progress["keys"] != codec.keys:
+                raise ValueError(
+                    "The choices of the composer do not match the ones of the output "
+                    "to resume."
+                )
+            if progress["metadata"] != json.loads(json.dumps(self.metadata)):
+                raise ValueError(
+                    f"Cannot resume an output generated with {progress['metadata']}."
+                )
+            self.num_samples = progress["num_samples"]
+        sizes = {} if progress is None else progress["sizes"]
+        for name, path in self.paths.items():
+            if name in sizes and not path.exists():
+                raise ValueError(f"Cannot resume, {path} is missing.")
+            # the files are truncated to their size after the last finished chunk
+            mode = "r+b" if name in sizes else "wb"
+            self.files[name] = open(path, mode, buffering=BUFFER_SIZE)  # noqa: SIM115
+            self.files[name].truncate(sizes.get(name, 0))
+            self.files[name].seek(0, os.SEEK_END)
+        self.write_progress()
+
+    @property
+    def paths(self) -> dict[str, Path]:
+        raise NotImplementedError
+
+    @property
+    def progress_path(self) -> Path:
+        raise NotImplementedError
+
+    def read_progress(self) -> dict[str, Any] | None:
+        if not self.progress_path.exists():
+            return None
+        with open(self.progress_path) as f:
+            return json.load(f)
+
+    def write_progress(self):
+        sizes: dict[str, int] = dict()
+        for name, file in self.files.items():
+            file.flush()
+            os.fsync(file.fileno())
+            sizes[name] = file.tell()
+        progress = {
+            "num_samples": self.num_samples,
+            "sizes": sizes,
+            "keys": self.codec.keys,
+            "dtype": self.codec.dtype.str,
+            "metadata": self.metadata,
+        }
+        # replaced at once so that an interruption leaves a valid progress file
+        tmp_path = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def write_chunk(self, start: int, batch: CaptionBatch):
+        raise NotImplementedError
+
+    def add_chunk(self, start: int, batch: CaptionBatch):
+        """
+        Write the chunk of samples starting at start, then save the progress.
+        """
+        assert start == self.num_samples, "Chunks must be written in order."
+        self.write_chunk(start, batch)
+        self.num_samples += len(batch)
+        self.write_progress()
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+    def __enter__(self) -> "CaptionsWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JsonlWriter(CaptionsWriter):
+    """
+    One JSON object per line with the "index", "caption" and "choices" of a sample.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        codec: ChoicesCodec,
+        resume: bool,
+        metadata: dict[str, Any] | None = None,
+    ):
+        self.path = Path(path)
+        super().__init__(codec, resume, metadata)
+
+    @property
+    def paths(self) -> dict[str, Path]:
+        return {"captions": self.path}
+
+    @property
+    def progress_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".progress.json")
+
+    def write_chunk(self, start: int, batch: CaptionBatch):
+        lines = [
+            json.dumps(
+                {"index": start + k, "caption": caption, "choices": sample_choices}
+            )
+            + "\n"
+            for k, (caption, sample_choices) in enumerate(
+                zip(
+                    batch.captions(),
+                    self.codec.decode_batch(batch.choices),
+                    strict=True,
+                )
+            )
+        ]
+        self.files["captions"].write("".join(lines).encode())
+
+
+class BinaryWriter(CaptionsWriter):
+    """
+    Captions as concatenated UTF-8 bytes with their end offsets, and the encoded
+    choices (see read_binary).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        codec: ChoicesCodec,
+        resume: bool,
+        metadata: dict[str, Any] | None = None,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        super().__init__(codec, resume, metadata)
+
+    @property
+    def paths(self) -> dict[str, Path]:
+        return {
+            name: self.path / f"{name}.bin"
+            for name in ("captions", "offsets", "choices")
+        }
+
+    @property
+    def progress_path(self) -> Path:
+        return self.path / "progress.json"
+
+    def write_chunk(self, start: int, batch: CaptionBatch):
+        # the arrays of the batch are written as they are, with the offsets shifted
+        # to the end of captions.bin
+        offsets = batch.offsets[1:] - batch.offsets[0] + self.files["captions"].tell()
+        self.files["captions"].write(batch.data.data)
+        self.files["offsets"].write(offsets.data)
+        self.files["choices"].write(
+            np.ascontiguousarray(batch.choices, dtype=self.codec.dtype).data
+        )
+
+
+def read_binary(path: str | Path) -> tuple[CaptionBatch, list[str]]:
+    """
+    Read the finished samples of a binary output.
+
+    Returns: The CaptionBatch of the samples, and the keys of the columns of its
+        choices (see ChoicesCodec).
+    """
+    path = Path(path)
+    with open(path / "progress.json") as f:
+        progress = json.load(f)
+    num_samples = progress["num_samples"]
+    offsets = np.zeros(num_samples + 1, dtype=np.int64)
+    offsets[1:] = np.fromfile(path / "offsets.bin", dtype=np.int64, count=num_samples)
+    data = np.fromfile(path / "captions.bin", dtype=np.uint8, count=int(offsets[-1]))
+    keys = progress["keys"]
+    choices = np.fromfile(
+        path / "choices.bin",
+        dtype=np.dtype(progress["dtype"]),
+        count=num_samples * len(keys),
+    ).reshape(num_samples, len(keys))
+    return CaptionBatch(offsets, data, choices), keys
+
+
+def _write_chunks(
+    writer: CaptionsWriter, chunks: queue.Queue, errors: list[BaseException]
+):
+    try:
+        while (chunk := chunks.get()) is not None:
+            writer.add_chunk(*chunk)
+    except BaseException as error:
+        errors.append(error)
+        # consume the remaining chunks so that the producer is not blocked
+        while chunks.get() is not None:
+            pass
+
+
+class Progress:
+    """
+    Progress and throughput display on stderr.
+    """
+
+    def __init__(self, total: int, done: int = 0, enabled: bool = True):
+        self.total = total
+        self.done = done
+        self.enabled = enabled
+        self.start = time.monotonic()
+        self.start_done = done
+
+    def update(self, count: int):
+        self.done += count
+        if not self.enabled:
+            return
+        elapsed = time.monotonic() - self.start
+        rate = (self.done - self.start_done) / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else float("inf")
+        print(
+            f"\r{self.done}/{self.total} samples "
+            f"({100 * self.done / max(self.total, 1):.1f}%), "
+            f"{rate:.1f} samples/s, ETA {eta:.0f}s",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def close(self):
+        if self.enabled:
+            print(file=sys.stderr)
+
+
+def generate_file(
+    composer_factory: Callable[[], Composer],
+    columns: ColumnsT,
+    writer: CaptionsWriter,
+    num_workers: int | None = None,
+    chunk_size: int = 10_000,
+    max_pending: int = 2,
+    progress: bool = True,
+):
+    """
+    Compose the captions of attribute columns in worker processes and write them
+    with writer. The chunks are written by a background thread while the next ones
+    are composed. Generation starts after the samples already written by writer.
+    Args:
+        composer_factory: picklable function returning the Composer, created with
+            a seed (see parallel.generate_shards).
+        columns: dict of attribute columns of the same length.
+        writer: output of the captions.
+        num_workers: number of worker processes. Defaults to the number of CPUs.
+        chunk_size: number of samples composed and written at once.
+        max_pending: maximal number of composed chunks waiting to be written.
+        progress: show the progress on stderr.
+    """
+    total = num_column_rows(columns)
+    start = writer.num_samples
+    if start > total:
+        raise ValueError(f"The output has {start} samples but the input has {total}.")
+    remaining = {name: column[start:] for name, column in columns.items()}
+    display = Progress(total, start, progress)
+    chunks: queue.Queue = queue.Queue(maxsize=max_pending)
+    errors: list[BaseException] = []
+    thread = threading.Thread(
+        target=_write_chunks, args=(writer, chunks, errors), daemon=True
+    )
+    thread.start()
+    try:
+        if start < total:
+            for chunk in generate_shards(
+                composer_factory, remaining, num_workers, chunk_size, start
+            ):
+                if len(errors):
+                    break
+                chunks.put(chunk)
+                display.update(len(chunk[1]))
+    finally:
+        chunks.put(None)
+        thread.join()
+        display.close()
+    if len(errors):
+        raise errors[0]
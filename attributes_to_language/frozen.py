@@ -0,0 +1,199 @@
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import numpy as np
+
+from attributes_to_language.template import as_template
+from attributes_to_language.types import (
+    AttributeT,
+    CallbackVariantT,
+    Choices,
+    ComputedAttributeT,
+)
+from attributes_to_language.writers import Writer
+
+if TYPE_CHECKING:
+    from attributes_to_language.composer import Composer
+
+
+class _Attribute(NamedTuple):
+    name: str
+
+
+class _Callback(NamedTuple):
+    variant: CallbackVariantT
+    # values of attributes["_prev"] and attributes["_next"] when it is called
+    prev: str | None
+    next: str | None
+
+
+_PartT = str | _Attribute | _Callback
+
+
+def _as_segments(template: Sequence[str]) -> list[Any]:
+    return [[segment] if k % 2 == 0 else segment for k, segment in enumerate(template)]
+
+
+class FrozenComposer:
+    """
+    Renderer of a composer specialized to complete choices.
+
+    The structure and the variants are expanded once, when the composer is frozen,
+    into a list of literal texts, attribute slots and callable variants. Writing a
+    sample then only quantizes its attributes, looks their texts up in the tables of
+    the writers, and joins the parts. Given the same choices, the captions are the
+    same as the ones of the composer.
+    """
+
+    def __init__(self, composer: "Composer", choices: Choices):
+        """
+        Args:
+            composer: the composer. Its modifiers are applied once, when the
+                structure is frozen.
+            choices: complete choices, for instance returned by the composer. The
+                frozen composer writes samples with the attributes of
+                choices["writers"].
+
+        Raises:
+            ValueError: if the choices are incomplete.
+        """
+        self.composer = composer
+        self.writers: dict[str, Callable[..., str]] = dict()
+        # selected writer and its text of each label index, for the batches
+        self.writer_texts: dict[str, tuple[Writer, list[str | None] | None]] = dict()
+        try:
+            self.structure = composer.get_structure(
+                choices["structure"], choices["groups"]
+            )
+            for name, writer_choices in choices["writers"].items():
+                writer = composer.writers[name][writer_choices["_writer"]]
+                self.writers[name] = writer.freeze(writer_choices)
+                self.writer_texts[name] = (
+                    writer,
+                    writer.frozen_texts(writer_choices),
+                )
+            self.variant_choices = choices["variants"]
+        except KeyError as error:
+            raise ValueError(f"Incomplete choices, {error} is missing.") from error
+        self.parts = self._expand()
+
+    def _expand(self) -> list[_PartT]:
+        """
+        Same expansion as Composer.get_variant, where the attributes and the callable
+        variants are kept as slots.
+        """
+        names = set(self.writers)
+        prev_token: str | None = None
+        next_token: str | None = None
+        segments = _as_segments(as_template(self.structure))
+        while len(segments) > 1:
+            tokens = segments[1::2]
+            updates: dict[str, list[Any]] = {}
+            for k, token in enumerate(tokens):
+                if k >= 1 and tokens[k - 1] in names:
+                    prev_token = tokens[k - 1]
+                    names.add("_prev")
+                if k < len(tokens) - 1 and tokens[k + 1] in names:
+                    next_token = tokens[k + 1]
+                    names.add("_next")
+                if token in self.composer.writers and token in names:
+                    updates[token] = [[_Attribute(token)]]
+                    continue
+                if token not in self.variant_choices:
+                    raise ValueError(f"Incomplete choices, variant {token} is missing.")
+                variant = self.composer.variants[token][self.variant_choices[token]]
+                if callable(variant):
+                    updates[token] = [[_Callback(variant, prev_token, next_token)]]
+                else:
+                    updates[token] = _as_segments(as_template(variant))
+
+            expanded = [list(segments[0])]
+            for k, token in enumerate(tokens):
+                value = updates[token]
+                expanded[-1].extend(value[0])
+                expanded.extend(
+                    list(segment) if isinstance(segment, list) else segment
+                    for segment in value[1:]
+                )
+                expanded[-1].extend(segments[2 * k + 2])
+            segments = expanded
+
+        # merge the consecutive literal texts
+        parts: list[_PartT] = []
+        for part in segments[0]:
+            if isinstance(part, str) and len(parts) and isinstance(parts[-1], str):
+                parts[-1] += part
+            else:
+                parts.append(part)
+        return parts
+
+    def _fallback(self, texts: ComputedAttributeT) -> str:
+        # attribute texts or callable variants with tokens need the general path
+        return self.composer.get_caption(
+            {name: texts[name] for name in self.writers},
+            self.structure,
+            Choices(variants=dict(self.variant_choices)),
+        )
+
+    def _check_attributes(self, attributes: AttributeT):
+        if attributes.keys() != self.writers.keys():
+            raise ValueError(
+                f"The choices were frozen for the attributes {list(self.writers)}."
+            )
+
+    def __call__(self, attributes: AttributeT) -> str:
+        """
+        Write the caption of a dict of attributes with the frozen choices.
+        """
+        self._check_attributes(attributes)
+        texts: ComputedAttributeT = dict()
+        for name, value in attributes.items():
+            if not isinstance(value, list | tuple):
+                value = (value,)
+            texts[name] = self.writers[name](*value)
+        return self._join(texts)
+
+    def _join(self, texts: ComputedAttributeT) -> str:
+        if any("{" in text for text in texts.values()):
+            return self._fallback(texts)
+
+        caption: list[str] = []
+        for part in self.parts:
+            if isinstance(part, str):
+                caption.append(part)
+            elif isinstance(part, _Attribute):
+                caption.append(texts[part.name])
+            else:
+                for key, token in (("_prev", part.prev), ("_next", part.next)):
+                    if token is None:
+                        texts.pop(key, None)
+                    else:
+                        texts[key] = token
+                text = part.variant(texts)
+                if "{" in text:
+                    return self._fallback(texts)
+                caption.append(text)
+        # remove multiple spaces and spaces in front of "."
+        return " ".join("".join(caption).split()).replace(" .", ".")
+
+    def batch(self, attributes: Sequence[AttributeT]) -> list[str]:
+        """
+        Write the caption of each dict of attributes of a batch. The attributes of
+        writers with a table are quantized for the whole batch at once.
+        """
+        for sample in attributes:
+            self._check_attributes(sample)
+        rows_texts: list[ComputedAttributeT] = [dict() for _ in attributes]
+        for name, (writer, texts) in self.writer_texts.items():
+            values = [sample[name] for sample in attributes]
+            column: list[str | None] = [None] * len(values)
+            if texts is not None and len(values):
+                indices = writer.quantize(np.asarray(values)).tolist()
+                column = [texts[index] for index in indices]
+            for row, (value, text) in enumerate(zip(values, column, strict=True)):
+                if text is None:
+                    if not isinstance(value, list | tuple):
+                        value = (value,)
+                    text = self.writers[name](*value)
+                rows_texts[row][name] = text
+        return [self._join(texts) for texts in rows_texts]
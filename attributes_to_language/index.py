@@ -0,0 +1,184 @@
+import math
+from collections.abc import Sequence
+from itertools import pairwise
+from typing import Any, Literal
+
+import numpy as np
+
+from attributes_to_language.utils import get_closest_key, get_closest_keys
+
+
+class VoxelGridIndex:
+    """
+    Uniform voxel grid over quantized values to find the closest value of a point
+    without computing the distance to every quantized value.
+
+    Each cell of the grid stores the quantized values that can be the closest to a
+    point of the cell: the values whose distance to the cell is not larger than the
+    largest distance from the cell to the nearest one. A query only computes the
+    distances to the candidates of its cell, in increasing index order, so ties are
+    broken like np.argmin over all the values. Points outside of the grid fall back
+    to the brute force search.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        norm: Literal["1", "2"] = "2",
+        resolution: int | None = None,
+        bounds: tuple[Sequence[float], Sequence[float]] | None = None,
+    ):
+        """
+        Args:
+            values: quantized values of shape (D, K), or (K,) for scalar values.
+            norm: "1" or "2" norm to use for the distance.
+            resolution: number of cells along each dimension. Defaults to about
+                twice the number of values per dimension.
+            bounds: lower and upper corners of the grid. Defaults to the bounding box
+                of the values. Queries outside of the grid are brute forced, so the
+                grid should cover the expected inputs (e.g. (0, 0, 0) and
+                (255, 255, 255) for RGB colors).
+        """
+        self.values = np.asarray(values)
+        self.norm: Literal["1", "2"] = norm
+        points = self.values.reshape(-1, self.values.shape[-1]).astype(np.float64)
+        dims, num_values = points.shape
+        if resolution is None:
+            resolution = min(64, 2 * math.ceil(num_values ** (1 / dims)))
+        if bounds is None:
+            self.lower = points.min(axis=1)
+            self.upper = points.max(axis=1)
+        else:
+            self.lower = np.asarray(bounds[0], dtype=np.float64).reshape(dims)
+            self.upper = np.asarray(bounds[1], dtype=np.float64).reshape(dims)
+        self.shape = tuple(
+            resolution if upper > lower else 1
+            for lower, upper in zip(
+                self.lower.tolist(), self.upper.tolist(), strict=True
+            )
+        )
+        self.cell_size = (self.upper - self.lower) / np.array(self.shape)
+        self._grid = list(
+            zip(
+                self.lower.tolist(),
+                self.upper.tolist(),
+                self.cell_size.tolist(),
+                self.shape,
+                strict=True,
+            )
+        )
+        self.offsets, self.candidates = self._build(points)
+        # values of the candidates of each cell, contiguous per cell
+        self.candidate_values = self.values[..., self.candidates]
+        self._set_lists()
+
+    def _set_lists(self):
+        # python lists of the arrays, faster to index when querying a single point
+        self._cells = list(pairwise(self.offsets.tolist()))
+        self._candidates: list[int] = self.candidates.tolist()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_cells"], state["_candidates"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._set_lists()
+
+    def _build(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        fn = np.square if self.norm == "2" else np.abs
+        cells = np.indices(self.shape).reshape(len(self.shape), -1).T
+        # slightly enlarge the cells so that rounding errors when locating a point
+        # can only add candidates
+        margin = 1e-9 * np.maximum(
+            1.0, np.maximum(np.abs(self.lower), np.abs(self.upper))
+        )
+        candidates: list[np.ndarray] = []
+        counts = np.zeros(len(cells), dtype=np.int64)
+        chunk_size = max(1, 2**22 // (8 * points.shape[1]))
+        for start in range(0, len(cells), chunk_size):
+            chunk = cells[start : start + chunk_size]
+            lower = self.lower + chunk * self.cell_size - margin
+            upper = self.lower + (chunk + 1) * self.cell_size + margin
+            min_dist = np.zeros((len(chunk), points.shape[1]))
+            max_dist = np.zeros((len(chunk), points.shape[1]))
+            for dim in range(points.shape[0]):
+                below = lower[:, dim, None] - points[dim][None, :]
+                above = points[dim][None, :] - upper[:, dim, None]
+                min_dist += fn(np.maximum(np.maximum(below, above), 0))
+                max_dist += fn(np.maximum(np.abs(below), np.abs(above)))
+            bound = max_dist.min(axis=1, keepdims=True)
+            is_candidate = min_dist <= bound * (1 + 1e-9) + 1e-12
+            counts[start : start + chunk_size] = is_candidate.sum(axis=1)
+            candidates.append(np.nonzero(is_candidate)[1])
+        offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets, np.concatenate(candidates).astype(np.intp)
+
+    def cell_of(self, comp: Sequence[float]) -> int | None:
+        """
+        Flat index of the cell containing comp, or None if it is outside of the grid.
+        """
+        cell = 0
+        for value, (lower, upper, size, resolution) in zip(
+            comp, self._grid, strict=True
+        ):
+            if not lower <= value <= upper:
+                return None
+            position = int((value - lower) / size) if size > 0 else 0
+            cell = cell * resolution + min(position, resolution - 1)
+        return cell
+
+    def query(self, comp: Sequence[float]) -> int:
+        """
+        Index of the closest quantized value, same as get_closest_key.
+        """
+        cell = self.cell_of(comp)
+        if cell is None:
+            return get_closest_key(self.values, comp, self.norm).item()
+        start, end = self._cells[cell]
+        closest = get_closest_key(
+            self.candidate_values[..., start:end], comp, self.norm
+        ).item()
+        return self._candidates[start + closest]
+
+    def query_batch(self, comp: np.ndarray) -> np.ndarray:
+        """
+        Index of the closest quantized value for each row of comp, same as
+        get_closest_keys.
+        """
+        comp = np.asarray(comp)
+        points = comp.reshape(len(comp), len(self.shape)).astype(np.float64)
+        inside = np.all((points >= self.lower) & (points <= self.upper), axis=1)
+        indices = np.empty(len(comp), dtype=np.intp)
+        outside = np.nonzero(~inside)[0]
+        if len(outside):
+            indices[outside] = get_closest_keys(self.values, comp[outside], self.norm)
+
+        rows = np.nonzero(inside)[0]
+        if not len(rows):
+            # empty batch, or every point is outside of the grid
+            return indices
+        positions = np.zeros((len(rows), len(self.shape)), dtype=np.int64)
+        has_size = self.cell_size > 0
+        positions[:, has_size] = (
+            (points[rows][:, has_size] - self.lower[has_size])
+            / self.cell_size[has_size]
+        ).astype(np.int64)
+        positions = np.minimum(positions, np.array(self.shape) - 1)
+        cells = np.ravel_multi_index(positions.T, self.shape)
+        order = np.argsort(cells, kind="stable")
+        rows, cells = rows[order], cells[order]
+        unique_cells, starts = np.unique(cells, return_index=True)
+        ends = np.append(starts[1:], len(rows))
+        for cell, row_start, row_end in zip(
+            unique_cells.tolist(), starts.tolist(), ends.tolist(), strict=True
+        ):
+            cell_rows = rows[row_start:row_end]
+            start, end = self.offsets[cell], self.offsets[cell + 1]
+            closest = get_closest_keys(
+                self.candidate_values[..., start:end], comp[cell_rows], self.norm
+            )
+            indices[cell_rows] = self.candidates[start + closest]
+        return indices
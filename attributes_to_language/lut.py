@@ -0,0 +1,103 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from attributes_to_language.index import VoxelGridIndex
+
+# Bump when the content of the tables changes to invalidate the cached files
+LUT_VERSION = 1
+
+
+def get_cache_dir() -> Path:
+    """
+    Folder of the cached lookup tables. Set with the ATTRIBUTES_TO_LANGUAGE_CACHE
+    environment variable, defaults to ~/.cache/attributes_to_language.
+    """
+    if "ATTRIBUTES_TO_LANGUAGE_CACHE" in os.environ:
+        return Path(os.environ["ATTRIBUTES_TO_LANGUAGE_CACHE"])
+    return Path.home() / ".cache" / "attributes_to_language"
+
+
+def get_lut_key(values: np.ndarray, norm: Literal["1", "2"], bits: int) -> str:
+    """
+    Hash identifying the lookup table of a palette.
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.sha256()
+    digest.update(f"{LUT_VERSION}-{values.dtype.str}-{values.shape}".encode())
+    digest.update(values.tobytes())
+    digest.update(f"-{norm}-{bits}".encode())
+    return digest.hexdigest()[:32]
+
+
+def build_rgb_lut(
+    values: np.ndarray, norm: Literal["1", "2"] = "2", bits: int = 8
+) -> np.ndarray:
+    """
+    Build a dense lookup table from RGB colors to the index of the closest color of
+    the palette.
+    Args:
+        values: palette of shape (3, K).
+        norm: "1" or "2" norm to use for the distance.
+        bits: bits per channel of the table. With 8 bits, the table gives the same
+            index as get_closest_key for every uint8 color. With fewer bits, each
+            entry covers 2 ** (8 - bits) levels per channel and holds the closest
+            color of the center of the covered levels.
+
+    Returns: uint16 array of shape (2 ** bits, 2 ** bits, 2 ** bits).
+    """
+    assert values.shape[0] == 3, "RGB lookup tables need a palette of shape (3, K)"
+    assert 1 <= bits <= 8
+    assert values.shape[1] <= np.iinfo(np.uint16).max
+    levels = np.arange(2**bits)
+    if bits < 8:
+        step = 2 ** (8 - bits)
+        levels = levels * step + (step - 1) / 2
+    index = VoxelGridIndex(values, norm, bounds=((0, 0, 0), (255, 255, 255)))
+    size = 2**bits
+    lut = np.empty((size, size, size), dtype=np.uint16)
+    green, blue = np.meshgrid(levels, levels, indexing="ij")
+    planes = max(1, 2**22 // size**2)
+    for red in range(0, size, planes):
+        red_levels = levels[red : red + planes]
+        colors = np.stack(
+            [
+                np.repeat(red_levels, size**2),
+                np.tile(green.ravel(), len(red_levels)),
+                np.tile(blue.ravel(), len(red_levels)),
+            ],
+            axis=1,
+        )
+        lut[red : red + planes] = index.query_batch(colors).reshape(
+            len(red_levels), size, size
+        )
+    return lut
+
+
+def load_rgb_lut(
+    values: np.ndarray,
+    norm: Literal["1", "2"] = "2",
+    bits: int = 8,
+    cache_dir: str | Path | None = None,
+) -> np.ndarray:
+    """
+    Memory-map the lookup table of a palette from the cache, building and saving it
+    first if needed. The processes using the same palette share the cached file.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else get_cache_dir()
+    path = cache_dir / f"rgb_lut_{get_lut_key(values, norm, bits)}.npy"
+    if not path.exists():
+        lut = build_rgb_lut(values, norm, bits)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so that concurrent processes never load a
+        # partially written table
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, suffix=".npy", delete=False
+        ) as file:
+            np.save(file, lut)
+        os.replace(file.name, path)
+    return np.load(path, mmap_mode="r")
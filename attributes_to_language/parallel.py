@@ -0,0 +1,199 @@
+import collections
+import os
+import random
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from attributes_to_language.batch import CaptionBatch
+from attributes_to_language.composer import Composer, num_column_rows
+from attributes_to_language.sampling import GeneratorSampler
+from attributes_to_language.types import AttributeColumnsT
+
+ColumnsT = AttributeColumnsT
+ShardT = tuple[int, ColumnsT]
+
+# Composer of the worker process, built once by the pool initializer
+_worker_composer: Composer | None = None
+
+
+def iter_shards(
+    columns: ColumnsT, shard_size: int, start_index: int = 0
+) -> Iterator[ShardT]:
+    """
+    Split columns of attributes into shards of shard_size rows.
+    Yields: The index of the first sample of the shard and its columns.
+    """
+    size = num_column_rows(columns)
+    for start in range(0, size, shard_size):
+        yield (
+            start_index + start,
+            {
+                name: column[start : start + shard_size]
+                for name, column in columns.items()
+            },
+        )
+
+
+def compose_shard(composer: Composer, shard: ShardT) -> CaptionBatch:
+    """
+    Compose the captions of a shard. The choices of a sample only depend on the seed
+    of the composer and on the index of the sample.
+
+    Returns: The captions and the choices encoded with the codec of the composer,
+        as a CaptionBatch, so that they are sent back from the workers as a few
+        arrays.
+    """
+    start, columns = shard
+    return composer.compose_caption_batch(
+        columns, indices=np.arange(start, start + num_column_rows(columns))
+    )
+
+
+def _init_worker(
+    composer_factory: Callable[[], Composer],
+    entropy: int | None = None,
+    counter: Any = None,
+):
+    """
+    Build the composer of a worker process.
+    With an entropy, the worker gets its own random stream: the forked workers
+    would otherwise share the np.random state of the parent, and composers built
+    from the same seed or Generator state would draw the same unseeded choices.
+    The global random states are reseeded, and the Generator of the composer is
+    replaced.
+    Args:
+        composer_factory: function returning the Composer.
+        entropy: entropy of the SeedSequence of the parent. The random states are
+            left as they are if None.
+        counter: shared multiprocessing.Value numbering the workers, required
+            with an entropy. Worker k draws from the child k of the SeedSequence,
+            as SeedSequence.spawn.
+    """
+    global _worker_composer
+    if entropy is None:
+        _worker_composer = composer_factory()
+        return
+    with counter.get_lock():
+        worker_id = counter.value
+        counter.value += 1
+    seed_sequence = np.random.SeedSequence(entropy, spawn_key=(worker_id,))
+    global_seed, generator_seed = seed_sequence.spawn(2)
+    state = global_seed.generate_state(4)
+    random.seed(int.from_bytes(state.tobytes(), "little"))
+    np.random.seed(state)
+    _worker_composer = composer_factory()
+    if isinstance(_worker_composer.sampler, GeneratorSampler):
+        _worker_composer.sampler = GeneratorSampler(
+            np.random.default_rng(generator_seed)
+        )
+
+
+def _compose_worker_shard(shard: ShardT) -> CaptionBatch:
+    assert _worker_composer is not None
+    return compose_shard(_worker_composer, shard)
+
+
+def generate_shards(
+    composer_factory: Callable[[], Composer],
+    columns: ColumnsT,
+    num_workers: int | None = None,
+    shard_size: int = 10_000,
+    start_index: int = 0,
+    max_pending: int | None = None,
+) -> Generator[tuple[int, CaptionBatch], None, None]:
+    """
+    Compose the captions of columns of attributes in worker processes.
+    The output only depends on the seed of the composer and on the sample indices,
+    not on the number of workers or the shard size.
+    Args:
+        composer_factory: picklable function returning the Composer (e.g. a module
+            level function or a functools.partial). It is called once per worker
+            process. The composer must be created with a seed.
+        columns: dict of attribute columns of the same length. Columns of shape
+            (N, D) hold attributes made of D values (e.g. colors).
+        num_workers: number of worker processes. Defaults to the number of CPUs.
+            With 0, the shards are composed in the current process.
+        shard_size: number of samples per task.
+        start_index: index of the first sample.
+        max_pending: maximal number of shards submitted to the workers and not yet
+            yielded, so that the composed shards do not pile up in memory when the
+            consumer is slower than the workers. Defaults to twice the number of
+            workers.
+
+    Yields: The index of the first sample of each shard, with the CaptionBatch of
+        its captions and choices encoded with composer.codec, in input order.
+    """
+    shards = iter_shards(columns, shard_size, start_index)
+    if num_workers == 0:
+        composer = composer_factory()
+        _check_seed(composer)
+        for shard in shards:
+            yield shard[0], compose_shard(composer, shard)
+        return
+
+    _check_seed(composer_factory())
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * num_workers
+    assert max_pending > 0
+    pending: collections.deque[tuple[int, Future[CaptionBatch]]] = collections.deque()
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(composer_factory,),
+    ) as executor:
+        try:
+            for shard in shards:
+                if len(pending) >= max_pending:
+                    start, future = pending.popleft()
+                    yield start, future.result()
+                pending.append(
+                    (shard[0], executor.submit(_compose_worker_shard, shard))
+                )
+            while len(pending):
+                start, future = pending.popleft()
+                yield start, future.result()
+        finally:
+            # the consumer stopped early: do not compose the remaining shards
+            for _, future in pending:
+                future.cancel()
+
+
+def generate(
+    composer_factory: Callable[[], Composer],
+    columns: ColumnsT,
+    num_workers: int | None = None,
+    shard_size: int = 10_000,
+    start_index: int = 0,
+) -> tuple[list[str], np.ndarray]:
+    """
+    Compose the captions of columns of attributes in worker processes. See
+    generate_shards for the arguments.
+
+    Returns: The captions of every sample, in input order, and the matrix of their
+        choices encoded with the codec of the composer (see
+        ChoicesCodec.decode_batch).
+    """
+    captions: list[str] = []
+    choices: list[np.ndarray] = []
+    for _, batch in generate_shards(
+        composer_factory, columns, num_workers, shard_size, start_index
+    ):
+        captions.extend(batch.captions())
+        choices.append(batch.choices)
+    if not len(choices):
+        codec = composer_factory().codec
+        return captions, np.empty((0, len(codec)), dtype=codec.dtype)
+    return captions, np.concatenate(choices)
+
+
+def _check_seed(composer: Composer):
+    if composer.seed is None:
+        raise ValueError(
+            "Parallel generation needs a composer created with a seed, so that the "
+            "output does not depend on the number of workers."
+        )
@@ -0,0 +1,196 @@
+import hashlib
+import random
+from functools import lru_cache
+
+import numpy as np
+
+_MASK = 2**64 - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+class Sampler:
+    """
+    Source of the random choices of the composer and the writers.
+    Every draw is named by a key (e.g. "structure" or "writers/color/val"). Keys are
+    only used by counter-based samplers, where they select an independent stream.
+    """
+
+    def randint(self, key: str, high: int) -> int:
+        """
+        Random integer in [0, high).
+        """
+        raise NotImplementedError
+
+    def integers(self, key: str, high: int | np.ndarray, size: int) -> np.ndarray:
+        """
+        Random integers in [0, high) for each of the size rows of a batch. high can
+        be an array with the upper bound of each row.
+        """
+        raise NotImplementedError
+
+    def permutation(self, key: str, n: int) -> list[int]:
+        """
+        Random permutation of range(n).
+        """
+        raise NotImplementedError
+
+    def permutations(self, key: str, n: int, size: int) -> np.ndarray:
+        """
+        Random permutations of range(n) for each of the size rows of a batch.
+        """
+        return np.argsort(self.random(key, (size, n)), axis=1, kind="stable")
+
+    def random(self, key: str, shape: tuple[int, int]) -> np.ndarray:
+        """
+        Uniform floats in [0, 1) of shape (size, n) for the size rows of a batch.
+        """
+        raise NotImplementedError
+
+    def child(self, prefix: str) -> "Sampler":
+        """
+        Sampler whose keys are prefixed with prefix.
+        """
+        return self
+
+    def subset(self, rows: np.ndarray | list[int]) -> "Sampler":
+        """
+        Sampler for the given rows of the batch.
+        """
+        return self
+
+    def row(self, row: int) -> "Sampler":
+        """
+        Sampler for a single row of the batch.
+        """
+        return self
+
+
+class GlobalSampler(Sampler):
+    """
+    Draws from the global random and np.random states.
+    """
+
+    def randint(self, key: str, high: int) -> int:
+        return random.randint(0, high - 1)
+
+    def integers(self, key: str, high: int | np.ndarray, size: int) -> np.ndarray:
+        return np.random.randint(0, high, size=size)
+
+    def permutation(self, key: str, n: int) -> list[int]:
+        return np.random.permutation(n).tolist()
+
+    def random(self, key: str, shape: tuple[int, int]) -> np.ndarray:
+        return np.random.random(shape)
+
+
+class GeneratorSampler(Sampler):
+    """
+    Draws from a numpy Generator.
+    """
+
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+
+    def randint(self, key: str, high: int) -> int:
+        return int(self.rng.integers(high))
+
+    def integers(self, key: str, high: int | np.ndarray, size: int) -> np.ndarray:
+        return self.rng.integers(high, size=size)
+
+    def permutation(self, key: str, n: int) -> list[int]:
+        return self.rng.permutation(n).tolist()
+
+    def random(self, key: str, shape: tuple[int, int]) -> np.ndarray:
+        return self.rng.random(shape)
+
+
+@lru_cache(maxsize=4096)
+def hash_key(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+
+def _mix(z: int) -> int:
+    # SplitMix64 finalizer
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _mix_array(z: np.ndarray) -> np.ndarray:
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class CounterSampler(Sampler):
+    """
+    Stateless counter-based sampler: the draw of a key for the sample of index k is
+    the k-th output of a SplitMix64 stream seeded by (seed, key). Any sample can be
+    regenerated from its index alone, in any order and on any worker.
+    """
+
+    def __init__(self, seed: int, index: int | np.ndarray, prefix: str = ""):
+        """
+        Args:
+            seed: seed shared by all the samples.
+            index: index of the sample, or array with the index of each row of a
+                batch.
+            prefix: prefix of the keys of the draws.
+        """
+        if isinstance(index, np.integer):
+            index = int(index)
+        self.seed = seed
+        self.index = index
+        self.prefix = prefix
+        self._seed_hash = _mix(seed & _MASK)
+
+    def _state(self, key: str) -> int:
+        return self._seed_hash ^ hash_key(self.prefix + key)
+
+    def _uniform(self, key: str) -> float:
+        assert isinstance(self.index, int), "Use a batch method for a batch sampler"
+        z = _mix((self._state(key) + self.index * _GOLDEN_GAMMA) & _MASK)
+        return (z >> 11) * 2.0**-53
+
+    def _uniform_array(self, key: str) -> np.ndarray:
+        index = np.asarray(self.index, dtype=np.int64).astype(np.uint64)
+        z = _mix_array(np.uint64(self._state(key)) + index * np.uint64(_GOLDEN_GAMMA))
+        return (z >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+    def randint(self, key: str, high: int) -> int:
+        return min(int(self._uniform(key) * high), high - 1)
+
+    def integers(self, key: str, high: int | np.ndarray, size: int) -> np.ndarray:
+        uniform = self._uniform_array(key)
+        assert len(uniform) == size
+        high = np.asarray(high, dtype=np.int64)
+        return np.minimum((uniform * high).astype(np.int64), high - 1)
+
+    def permutation(self, key: str, n: int) -> list[int]:
+        uniform = [self._uniform(f"{key}/{k}") for k in range(n)]
+        return sorted(range(n), key=uniform.__getitem__)
+
+    def random(self, key: str, shape: tuple[int, int]) -> np.ndarray:
+        assert not isinstance(self.index, int), "Use randint for a single sample"
+        assert shape[0] == len(self.index)
+        uniform = np.empty(shape)
+        for k in range(shape[1]):
+            uniform[:, k] = self._uniform_array(f"{key}/{k}")
+        return uniform
+
+    def child(self, prefix: str) -> "CounterSampler":
+        return CounterSampler(self.seed, self.index, self.prefix + prefix)
+
+    def subset(self, rows: np.ndarray | list[int]) -> "CounterSampler":
+        return CounterSampler(self.seed, np.asarray(self.index)[rows], self.prefix)
+
+    def row(self, row: int) -> "CounterSampler":
+        return CounterSampler(self.seed, int(np.asarray(self.index)[row]), self.prefix)
+
+
+def get_sampler(rng: "np.random.Generator | Sampler | None") -> Sampler:
+    if rng is None:
+        return GlobalSampler()
+    if isinstance(rng, np.random.Generator):
+        return GeneratorSampler(rng)
+    return rng
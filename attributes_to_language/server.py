@@ -0,0 +1,396 @@
+"""
+Local caption server.
+
+Clients send batches of columnar attributes over a Unix domain socket or a
+localhost TCP connection, and receive the captions and encoded choices of the
+batch. The batches are composed by a pool of worker processes.
+
+Every message is a frame: its size as a little-endian uint64, then the payload. A
+payload is the size of a JSON header as a little-endian uint32, the JSON header, and
+the raw bytes of the arrays described in header["arrays"] (dtype, shape and offset
+in the bytes following the header).
+
+Requests have the header {"type": "compose"} with:
+    - the attribute columns as arrays "columns/{name}", of shape (N,) or (N, D),
+    - optionally, "seed" and "start_index": the choices of sample k then only depend
+      on the seed and on start_index + k,
+    - optionally, the array "choices": (possibly partial) choices encoded with the
+      codec of the composer (see ChoicesCodec).
+The response has the arrays "offsets", "captions" and "choices" of the CaptionBatch
+of the request, or {"error": message}.
+
+The request {"type": "stats"} returns the counters of the server in the header.
+"""
+
+import asyncio
+import collections
+import copy
+import json
+import multiprocessing
+import socket
+import struct
+import sys
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from attributes_to_language import parallel
+from attributes_to_language.batch import CaptionBatch
+from attributes_to_language.composer import Composer, num_column_rows
+
+_FRAME = struct.Struct("<Q")
+_HEADER = struct.Struct("<I")
+
+
+def encode_message(
+    header: dict[str, Any], arrays: Mapping[str, np.ndarray] | None = None
+) -> bytes:
+    """
+    Payload of a message with a JSON header and arrays.
+    """
+    header = dict(header)
+    header["arrays"] = dict()
+    chunks: list[bytes | memoryview] = []
+    offset = 0
+    for name, array in (arrays or {}).items():
+        array = np.ascontiguousarray(array)
+        header["arrays"][name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        chunks.append(array.tobytes())
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode()
+    return b"".join([_HEADER.pack(len(header_bytes)), header_bytes, *chunks])
+
+
+def decode_message(payload: bytes) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """
+    Header and arrays of a payload. The arrays are read-only views of the payload.
+    """
+    (header_size,) = _HEADER.unpack_from(payload)
+    start = _HEADER.size + header_size
+    header = json.loads(payload[_HEADER.size : start])
+    arrays: dict[str, np.ndarray] = dict()
+    for name, info in header.pop("arrays", {}).items():
+        dtype = np.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(
+            payload, dtype=dtype, count=count, offset=start + info["offset"]
+        ).reshape(shape)
+    return header, arrays
+
+
+def compose_request(composer: Composer, payload: bytes) -> bytes:
+    """
+    Compose the batch of a compose request.
+    Returns: The payload of the response.
+    """
+    try:
+        header, arrays = decode_message(payload)
+        columns = {
+            name.removeprefix("columns/"): array
+            for name, array in arrays.items()
+            if name.startswith("columns/")
+        }
+        indices = None
+        if header.get("seed") is not None:
+            # same composer with the seed of the request
+            composer = copy.copy(composer)
+            composer.seed = int(header["seed"])
+            start = int(header.get("start_index", 0))
+            indices = np.arange(start, start + num_column_rows(columns))
+        batch = composer.compose_caption_batch(columns, arrays.get("choices"), indices)
+        return encode_message(
+            {"num_samples": len(batch)},
+            {
+                "offsets": batch.offsets,
+                "captions": batch.data,
+                "choices": batch.choices,
+            },
+        )
+    except Exception as error:
+        return encode_message({"error": f"{type(error).__name__}: {error}"})
+
+
+def _compose_worker_request(payload: bytes) -> bytes:
+    # the composer is built by parallel._init_worker, the initializer of the pool
+    assert parallel._worker_composer is not None
+    return compose_request(parallel._worker_composer, payload)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes | None:
+    """
+    Payload of the next frame, or None at the end of the stream.
+    """
+    try:
+        prefix = await reader.readexactly(_FRAME.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (size,) = _FRAME.unpack(prefix)
+    return await reader.readexactly(size)
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    writer.write(_FRAME.pack(len(payload)))
+    writer.write(payload)
+
+
+class ServerStats:
+    """
+    Throughput and latency counters of a server. The latencies are kept for the
+    last window requests.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.start = time.monotonic()
+        self.requests = 0
+        self.samples = 0
+        self.errors = 0
+        self.latencies: collections.deque[float] = collections.deque(maxlen=window)
+
+    def add(self, num_samples: int, latency: float, error: bool):
+        self.requests += 1
+        self.samples += num_samples
+        self.errors += error
+        self.latencies.append(latency)
+
+    def summary(self) -> dict[str, float]:
+        elapsed = time.monotonic() - self.start
+        p50, p99 = 0.0, 0.0
+        if len(self.latencies):
+            p50, p99 = np.percentile(np.array(self.latencies), [50, 99]).tolist()
+        return {
+            "requests": self.requests,
+            "samples": self.samples,
+            "errors": self.errors,
+            "uptime_s": elapsed,
+            "samples_per_sec": self.samples / elapsed if elapsed > 0 else 0.0,
+            "requests_per_sec": self.requests / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": p50 * 1e3,
+            "p99_ms": p99 * 1e3,
+        }
+
+
+class CaptionServer:
+    """
+    Asyncio server composing the requests of its clients in a pool of workers.
+    The requests of a connection are answered in order, and the connections are
+    served concurrently.
+    """
+
+    def __init__(
+        self,
+        composer_factory: Callable[[], Composer],
+        num_workers: int | None = None,
+        report_interval: float | None = None,
+    ):
+        """
+        Args:
+            composer_factory: picklable function returning the Composer (e.g. a
+                functools.partial), called once per worker process.
+            num_workers: number of worker processes. Defaults to the number of
+                CPUs. With 0, the requests are composed in a thread of the server
+                process.
+            report_interval: print the stats to stderr every report_interval
+                seconds. No report if None.
+        """
+        self.composer_factory = composer_factory
+        self.num_workers = num_workers
+        self.report_interval = report_interval
+        self.stats = ServerStats()
+        self._executor: Executor | None = None
+        self._compose: Callable[[bytes], bytes] = _compose_worker_request
+
+    def _start_executor(self) -> Executor:
+        if self.num_workers == 0:
+            composer = self.composer_factory()
+            self._compose = lambda payload: compose_request(composer, payload)
+            return ThreadPoolExecutor(max_workers=1)
+        entropy = np.random.SeedSequence().entropy
+        assert isinstance(entropy, int)
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=parallel._init_worker,
+            initargs=(self.composer_factory, entropy, multiprocessing.Value("q", 0)),
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        assert self._executor is not None
+        try:
+            while (payload := await read_frame(reader)) is not None:
+                start = time.perf_counter()
+                header, _ = decode_message(payload)
+                if header.get("type") == "stats":
+                    write_frame(writer, encode_message(self.stats.summary()))
+                else:
+                    response = await loop.run_in_executor(
+                        self._executor, self._compose, payload
+                    )
+                    write_frame(writer, response)
+                    response_header, _ = decode_message(response)
+                    self.stats.add(
+                        response_header.get("num_samples", 0),
+                        time.perf_counter() - start,
+                        "error" in response_header,
+                    )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _report(self):
+        assert self.report_interval is not None
+        while True:
+            await asyncio.sleep(self.report_interval)
+            summary = self.stats.summary()
+            print(
+                f"{summary['requests']} requests, {summary['samples']} samples, "
+                f"{summary['errors']} errors, "
+                f"{summary['samples_per_sec']:.1f} samples/s, "
+                f"p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms",
+                file=sys.stderr,
+            )
+
+    async def serve(
+        self,
+        path: str | Path | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ready: Callable[[Any], None] | None = None,
+    ):
+        """
+        Serve until cancelled, on the Unix domain socket path if given, otherwise on
+        host:port.
+        Args:
+            path: path of the Unix domain socket.
+            host: host of the TCP server.
+            port: port of the TCP server. 0 picks a free port.
+            ready: called with the address of the server once it listens.
+        """
+        self._executor = self._start_executor()
+        report = None
+        try:
+            if path is not None:
+                server = await asyncio.start_unix_server(self.handle, path=str(path))
+            else:
+                server = await asyncio.start_server(self.handle, host=host, port=port)
+            if self.report_interval is not None:
+                report = asyncio.get_running_loop().create_task(self._report())
+            if ready is not None:
+                ready(server.sockets[0].getsockname())
+            async with server:
+                await server.serve_forever()
+        finally:
+            if report is not None:
+                report.cancel()
+            self._executor.shutdown(cancel_futures=True)
+            if path is not None:
+                Path(path).unlink(missing_ok=True)
+
+
+class CaptionClient:
+    """
+    Blocking client of a CaptionServer.
+    """
+
+    def __init__(
+        self, path: str | Path | None = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        """
+        Args:
+            path: path of the Unix domain socket of the server.
+            host: host of the TCP server, if no path is given.
+            port: port of the TCP server, if no path is given.
+        """
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(str(path))
+        else:
+            self.socket = socket.create_connection((host, port))
+
+    def close(self):
+        self.socket.close()
+
+    def __enter__(self) -> "CaptionClient":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _receive(self, size: int) -> bytes:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self.socket.recv_into(view[received:])
+            if count == 0:
+                raise ConnectionError("The server closed the connection.")
+            received += count
+        return bytes(buffer)
+
+    def request(
+        self, header: dict[str, Any], arrays: Mapping[str, np.ndarray] | None = None
+    ) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+        payload = encode_message(header, arrays)
+        self.socket.sendall(_FRAME.pack(len(payload)) + payload)
+        (size,) = _FRAME.unpack(self._receive(_FRAME.size))
+        return decode_message(self._receive(size))
+
+    def compose_caption_batch(
+        self,
+        columns: Mapping[str, np.ndarray],
+        seed: int | None = None,
+        start_index: int = 0,
+        choices: np.ndarray | None = None,
+    ) -> CaptionBatch:
+        """
+        Compose the captions of a batch of attribute columns.
+        Args:
+            columns: dict of attribute columns of the same length.
+            seed: seed of the choices. With a seed, the choices of sample k only
+                depend on the seed and on start_index + k.
+            start_index: index of the first sample.
+            choices: (possibly partial) choices encoded with the codec of the
+                composer.
+
+        Returns: The CaptionBatch of the captions and encoded choices, whose arrays
+            are read-only views of the response.
+        """
+        arrays = {f"columns/{name}": np.asarray(col) for name, col in columns.items()}
+        if choices is not None:
+            arrays["choices"] = choices
+        header, arrays = self.request(
+            {"type": "compose", "seed": seed, "start_index": start_index}, arrays
+        )
+        if "error" in header:
+            raise RuntimeError(header["error"])
+        return CaptionBatch(arrays["offsets"], arrays["captions"], arrays["choices"])
+
+    def compose(
+        self,
+        columns: Mapping[str, np.ndarray],
+        seed: int | None = None,
+        start_index: int = 0,
+        choices: np.ndarray | None = None,
+    ) -> tuple[list[str], np.ndarray]:
+        """
+        Compose the captions of a batch of attribute columns, see
+        compose_caption_batch.
+
+        Returns: The captions and the encoded choices of the batch.
+        """
+        batch = self.compose_caption_batch(columns, seed, start_index, choices)
+        return batch.captions(), batch.choices
+
+    def stats(self) -> dict[str, float]:
+        header, _ = self.request({"type": "stats"})
+        return header
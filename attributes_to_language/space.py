@@ -0,0 +1,385 @@
+import hashlib
+import itertools
+import math
+import random
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from attributes_to_language.template import compile_template
+from attributes_to_language.types import AttributeT, Choices, ChoicesT
+
+if TYPE_CHECKING:
+    from attributes_to_language.composer import Composer
+
+
+def permutation_to_index(permutation: Sequence[int]) -> int:
+    """
+    Lehmer code of a permutation of range(n): its rank among the n! permutations in
+    lexicographic order.
+    """
+    index = 0
+    remaining = sorted(permutation)
+    for k, value in enumerate(permutation):
+        position = remaining.index(value)
+        index += position * math.factorial(len(permutation) - 1 - k)
+        remaining.pop(position)
+    return index
+
+
+def index_to_permutation(index: int, n: int) -> list[int]:
+    """
+    Permutation of range(n) of the given rank, inverse of permutation_to_index.
+    """
+    remaining = list(range(n))
+    permutation: list[int] = []
+    for k in range(n):
+        position, index = divmod(index, math.factorial(n - 1 - k))
+        permutation.append(remaining.pop(position))
+    return permutation
+
+
+def randbelow(rng: np.random.Generator, n: int) -> int:
+    """
+    Uniform integer in [0, n) drawn from a numpy Generator, for n of any size (the
+    choice space can be larger than the int64 range of Generator.integers).
+    """
+    if n <= 2**63:
+        return int(rng.integers(n))
+    num_bits = n.bit_length()
+    while True:
+        # rejection sampling on num_bits random bits: accepted with probability > 1/2
+        value = int.from_bytes(rng.bytes((num_bits + 7) // 8), "little")
+        value >>= 8 * ((num_bits + 7) // 8) - num_bits
+        if value < n:
+            return value
+
+
+def _check_choice(key: str, value: int, cardinality: int):
+    if not 0 <= value < cardinality:
+        raise ValueError(f"Choice {key}={value} is not in [0, {cardinality}).")
+
+
+class ChoiceSpace:
+    """
+    Space of the complete choices of a composer for a set of attributes.
+
+    Each complete choices is numbered by an integer in [0, size) in mixed radix:
+    the structure is the most significant digit, then the group permutation (as a
+    Lehmer code), the writer choices of each attribute, and the composer variants.
+    The variants used by a caption depend on the selected variants (a variant can
+    contain other variants), so the variant digits are ranked in the tree of the
+    variants of the structure, with the number of leaves of each branch as weight.
+    Callable variants are leaves: the variants they could produce are not counted.
+    """
+
+    def __init__(self, composer: "Composer", attributes: AttributeT):
+        """
+        Args:
+            composer: the composer.
+            attributes: attributes of the sample, as given to the composer.
+        """
+        self.composer = composer
+        self.attributes = attributes
+        # writer choices: for each attribute, the cardinalities of each writer
+        self.writer_cardinalities: dict[str, list[dict[str, int]]] = dict()
+        for name, value in attributes.items():
+            if not isinstance(value, list | tuple):
+                value = (value,)
+            self.writer_cardinalities[name] = [
+                writer.choice_cardinalities(*value) for writer in composer.writers[name]
+            ]
+        self.writer_sizes = {
+            name: [math.prod(cardinalities.values()) for cardinalities in writers]
+            for name, writers in self.writer_cardinalities.items()
+        }
+        self.writers_size = math.prod(
+            sum(sizes) for sizes in self.writer_sizes.values()
+        )
+        # variant tokens of each option of each variant
+        self.variant_tokens: dict[str, list[frozenset[str]]] = {
+            name: [self._get_tokens(variant) for variant in possible_variants]
+            for name, possible_variants in composer.variants.items()
+        }
+        self._variant_sizes: dict[tuple[frozenset[str], frozenset[str]], int] = dict()
+        self.structure_tokens: list[frozenset[str]] = []
+        self.structure_sizes: list[int] = []
+        for struct_id, groups in enumerate(composer.groups):
+            structure = composer.get_structure(struct_id, range(len(groups)))
+            tokens = self._get_tokens(structure)
+            self.structure_tokens.append(tokens)
+            self.structure_sizes.append(
+                math.factorial(len(groups))
+                * self.writers_size
+                * self._count_variants(tokens, frozenset())
+            )
+        self.size = sum(self.structure_sizes)
+
+    def _get_tokens(self, variant: Any) -> frozenset[str]:
+        if not isinstance(variant, str):
+            return frozenset()
+        tokens = frozenset(compile_template(variant)[1::2])
+        return frozenset(
+            token
+            for token in tokens
+            if not (token in self.composer.writers and token in self.attributes)
+        )
+
+    def _next_variant(
+        self, pending: frozenset[str], resolved: frozenset[str]
+    ) -> tuple[str, frozenset[str], list[frozenset[str]]]:
+        name = min(pending)
+        resolved = resolved | {name}
+        rest = pending - {name}
+        branches = [(rest | tokens) - resolved for tokens in self.variant_tokens[name]]
+        return name, resolved, branches
+
+    def _count_variants(self, pending: frozenset[str], resolved: frozenset[str]) -> int:
+        """
+        Number of complete variant choices once the pending variants are resolved.
+        """
+        if not pending:
+            return 1
+        key = (pending, resolved)
+        if key not in self._variant_sizes:
+            _, resolved, branches = self._next_variant(pending, resolved)
+            sizes: dict[frozenset[str], int] = dict()
+            for branch in branches:
+                if branch not in sizes:
+                    sizes[branch] = self._count_variants(branch, resolved)
+            self._variant_sizes[key] = sum(sizes[branch] for branch in branches)
+        return self._variant_sizes[key]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def choices(self, index: int) -> Choices:
+        """
+        Complete choices of the given index.
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"Index {index} out of the choice space of {self.size}.")
+        struct_id = 0
+        while index >= self.structure_sizes[struct_id]:
+            index -= self.structure_sizes[struct_id]
+            struct_id += 1
+        num_groups = len(self.composer.groups[struct_id])
+        variants_size = self._count_variants(
+            self.structure_tokens[struct_id], frozenset()
+        )
+        index, variants_index = divmod(index, variants_size)
+        groups_index, writers_index = divmod(index, self.writers_size)
+
+        writers: dict[str, dict[str, int]] = dict()
+        for name in reversed(self.writer_cardinalities):
+            writers_index, writer_index = divmod(
+                writers_index, sum(self.writer_sizes[name])
+            )
+            writer_id = 0
+            while writer_index >= self.writer_sizes[name][writer_id]:
+                writer_index -= self.writer_sizes[name][writer_id]
+                writer_id += 1
+            writer_choices = {"_writer": writer_id}
+            cardinalities = self.writer_cardinalities[name][writer_id]
+            for key in reversed(cardinalities):
+                writer_index, writer_choices[key] = divmod(
+                    writer_index, cardinalities[key]
+                )
+            writers[name] = writer_choices
+        writers = dict(reversed(writers.items()))
+
+        variants: dict[str, int] = dict()
+        pending = self.structure_tokens[struct_id]
+        resolved: frozenset[str] = frozenset()
+        while pending:
+            name, resolved, branches = self._next_variant(pending, resolved)
+            for k, branch in enumerate(branches):
+                size = self._count_variants(branch, resolved)
+                if variants_index < size:
+                    variants[name] = k
+                    pending = branch
+                    break
+                variants_index -= size
+        return Choices(
+            structure=struct_id,
+            groups=index_to_permutation(groups_index, num_groups),
+            writers=writers,
+            variants=variants,
+        )
+
+    def index(self, choices: Choices) -> int:
+        """
+        Index of complete choices. Raises ValueError if a choice is missing.
+        """
+        try:
+            struct_id = choices["structure"]
+            _check_choice("structure", struct_id, len(self.structure_sizes))
+            index = sum(self.structure_sizes[:struct_id])
+            groups_index = permutation_to_index(choices["groups"])
+            writers_index = 0
+            for name, cardinalities in self.writer_cardinalities.items():
+                writer_choices = choices["writers"][name]
+                writer_id = writer_choices["_writer"]
+                _check_choice(f"writers/{name}/_writer", writer_id, len(cardinalities))
+                writer_index = 0
+                for key, cardinality in cardinalities[writer_id].items():
+                    _check_choice(
+                        f"writers/{name}/{key}", writer_choices[key], cardinality
+                    )
+                    writer_index = writer_index * cardinality + writer_choices[key]
+                writer_index += sum(self.writer_sizes[name][:writer_id])
+                writers_index = (
+                    writers_index * sum(self.writer_sizes[name]) + writer_index
+                )
+
+            variants_index = 0
+            pending = self.structure_tokens[struct_id]
+            resolved: frozenset[str] = frozenset()
+            while pending:
+                name, resolved, branches = self._next_variant(pending, resolved)
+                selected = choices["variants"][name]
+                _check_choice(f"variants/{name}", selected, len(branches))
+                variants_index += sum(
+                    self._count_variants(branch, resolved)
+                    for branch in branches[:selected]
+                )
+                pending = branches[selected]
+        except KeyError as error:
+            raise ValueError(f"Incomplete choices, {error} is missing.") from error
+        variants_size = self._count_variants(
+            self.structure_tokens[struct_id], frozenset()
+        )
+        return (
+            index
+            + (groups_index * self.writers_size + writers_index) * variants_size
+            + variants_index
+        )
+
+    def sample(self, rng: np.random.Generator | int | None = None) -> Choices:
+        """
+        Uniformly sample complete choices.
+        Args:
+            rng: source of the random index, as for the composer: either a numpy
+                Generator, or a seed. Defaults to the global random state.
+        """
+        if rng is None:
+            return self.choices(random.randrange(self.size))
+        if isinstance(rng, int):
+            rng = np.random.default_rng(rng)
+        return self.choices(randbelow(rng, self.size))
+
+    def iter_writer_texts(self, name: str) -> Iterator[tuple[str, ChoicesT]]:
+        """
+        Distinct texts of an attribute, each with the first writer choices (in index
+        order) that write it. Choices that do not change the text (e.g. variants
+        that are not used by the caption of the writer) are pruned.
+        """
+        value = self.attributes[name]
+        if not isinstance(value, list | tuple):
+            value = (value,)
+        texts: set[str] = set()
+        for writer_id, writer in enumerate(self.composer.writers[name]):
+            cardinalities = self.writer_cardinalities[name][writer_id]
+            for selected in itertools.product(
+                *(range(cardinality) for cardinality in cardinalities.values())
+            ):
+                writer_choices = dict(zip(cardinalities, selected, strict=True))
+                text, _ = writer(*value, choices=dict(writer_choices))
+                if text not in texts:
+                    texts.add(text)
+                    yield text, {"_writer": writer_id, **writer_choices}
+
+    def iter_variants(
+        self, pending: frozenset[str], resolved: frozenset[str] = frozenset()
+    ) -> Iterator[dict[str, int]]:
+        """
+        Complete variant choices of the pending variants. Options of a variant that
+        are the same template (e.g. duplicated strings) lead to the same captions,
+        so only the first one is walked.
+        """
+        if not pending:
+            yield dict()
+            return
+        name, resolved, branches = self._next_variant(pending, resolved)
+        walked: set[Any] = set()
+        for k, (variant, branch) in enumerate(
+            zip(self.composer.variants[name], branches, strict=True)
+        ):
+            key = compile_template(variant) if isinstance(variant, str) else variant
+            if key in walked:
+                continue
+            walked.add(key)
+            for variants in self.iter_variants(branch, resolved):
+                yield {name: k, **variants}
+
+    def _iter_structures(self) -> Iterator[tuple[int, list[int], str]]:
+        """
+        Distinct structures with their first group permutation.
+        """
+        structures: set[str] = set()
+        for struct_id, groups in enumerate(self.composer.groups):
+            for permutation in itertools.permutations(range(len(groups))):
+                structure = self.composer.get_structure(struct_id, permutation)
+                if structure not in structures:
+                    structures.add(structure)
+                    yield struct_id, list(permutation), structure
+
+    def iter_captions(
+        self, unique: bool = True, max_unique: int | None = None
+    ) -> Iterator[tuple[str, Choices]]:
+        """
+        Lazily enumerate the captions of the choice space, with choices producing
+        each of them.
+        Branches that produce the same text are pruned: writer choices are reduced
+        to the distinct texts of each attribute, group permutations to distinct
+        structures, and identical variant options are walked once. The remaining
+        duplicates are removed with the 16 bytes digests of the yielded captions:
+        the memory does not depend on the length of the captions, but grows with
+        the number of captions yielded (about 100 bytes each). Use unique=False to
+        enumerate large spaces in constant memory, or max_unique to bound the
+        digests kept.
+        Args:
+            unique: yield each caption only once.
+            max_unique: maximum number of digests kept when unique is True. Once
+                reached, the oldest digests are dropped, so a caption that was
+                yielded long before may be yielded again. Defaults to no bound.
+
+        Yields: Each caption with choices that produce it.
+        """
+        names = list(self.attributes)
+        writer_texts = [list(self.iter_writer_texts(name)) for name in names]
+        assert max_unique is None or max_unique > 0
+        # digests of the yielded captions, in insertion order to drop the oldest
+        captions: dict[bytes, None] = dict()
+        for struct_id, groups, structure in self._iter_structures():
+            for texts in itertools.product(*writer_texts):
+                writers = {
+                    name: writer_choices
+                    for name, (_, writer_choices) in zip(names, texts, strict=True)
+                }
+                for variants in self.iter_variants(self.structure_tokens[struct_id]):
+                    defined_attr = {
+                        name: text for name, (text, _) in zip(names, texts, strict=True)
+                    }
+                    caption = self.composer.get_caption(
+                        defined_attr, structure, Choices(variants=dict(variants))
+                    )
+                    if unique:
+                        digest = hashlib.blake2b(
+                            caption.encode(), digest_size=16
+                        ).digest()
+                        if digest in captions:
+                            continue
+                        captions[digest] = None
+                        if max_unique is not None and len(captions) > max_unique:
+                            del captions[next(iter(captions))]
+                    yield (
+                        caption,
+                        Choices(
+                            structure=struct_id,
+                            groups=list(groups),
+                            writers={name: dict(c) for name, c in writers.items()},
+                            variants=variants,
+                        ),
+                    )
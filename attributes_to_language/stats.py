@@ -0,0 +1,74 @@
+import time
+from typing import NamedTuple
+
+
+class StageStats(NamedTuple):
+    calls: int
+    # cumulative time, in seconds
+    total: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class ComposerStats:
+    """
+    Cumulative time and number of calls of each stage of the composer:
+        - "structure": choice of the structure and of the group permutation,
+        - "modifiers": application of the modifiers to the structure,
+        - "groups": substitution of the permuted groups in the structure,
+        - "writers/{name}/{writer_id}": writing of an attribute by one of its
+          writers,
+        - "variants": expansion of the variants and attributes in get_variant,
+        - "cleanup": removal of the extra spaces of the caption,
+        - "total": whole call of the composer.
+
+    Stats are only collected when the composer has a stats object (see
+    Composer.enable_stats), otherwise each stage only costs a None check.
+    """
+
+    def __init__(self):
+        # stage -> [calls, cumulative time in nanoseconds]
+        self._stages: dict[str, list[int]] = dict()
+
+    def record(self, stage: str, start: int) -> int:
+        """
+        Add the time since start to a stage.
+        Args:
+            stage: name of the stage.
+            start: time.perf_counter_ns() at the start of the stage.
+
+        Returns: The current time.perf_counter_ns(), to start the next stage.
+        """
+        now = time.perf_counter_ns()
+        stats = self._stages.get(stage)
+        if stats is None:
+            self._stages[stage] = [1, now - start]
+        else:
+            stats[0] += 1
+            stats[1] += now - start
+        return now
+
+    def snapshot(self) -> dict[str, StageStats]:
+        """
+        Copy of the current stats of each stage.
+        """
+        return {
+            stage: StageStats(calls, elapsed / 1e9)
+            for stage, (calls, elapsed) in self._stages.items()
+        }
+
+    def reset(self):
+        self._stages.clear()
+
+    def __str__(self) -> str:
+        snapshot = self.snapshot()
+        width = max((len(stage) for stage in snapshot), default=5)
+        lines = [f"{'stage':<{width}} {'calls':>10} {'total s':>10} {'mean µs':>10}"]
+        for stage, stats in snapshot.items():
+            lines.append(
+                f"{stage:<{width}} {stats.calls:>10} {stats.total:>10.4f} "
+                f"{stats.mean * 1e6:>10.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,133 @@
+import queue
+import threading
+from collections.abc import Generator, Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from attributes_to_language.composer import Composer, num_column_rows
+from attributes_to_language.parallel import ColumnsT, ShardT, iter_shards
+from attributes_to_language.types import Choices
+
+ColumnsSourceT = ColumnsT | Iterable[ColumnsT]
+
+# Marks the end of the chunks in the prefetch queue
+_DONE = object()
+
+
+def load_columns(paths: Mapping[str, str | Path], mmap: bool = True) -> ColumnsT:
+    """
+    Open .npy files of attribute columns. With mmap, the columns are memory-mapped
+    and only the chunks being composed are read from disk.
+    Args:
+        paths: path of the .npy file of each attribute.
+        mmap: whether to memory-map the files.
+
+    Returns: dict of attribute columns.
+    """
+    mmap_mode: Literal["r", "r+", "c"] | None = "r" if mmap else None
+    return {name: np.load(path, mmap_mode=mmap_mode) for name, path in paths.items()}
+
+
+def iter_chunks(
+    source: ColumnsSourceT, chunk_size: int, start_index: int = 0
+) -> Iterator[ShardT]:
+    """
+    Split a source of attribute columns into chunks of at most chunk_size rows.
+    Args:
+        source: dict of attribute columns, or iterable of dicts of attribute columns
+            (e.g. read from several files).
+        chunk_size: maximal number of rows of a chunk.
+        start_index: index of the first sample.
+
+    Yields: The index of the first sample of the chunk and its columns.
+    """
+    if isinstance(source, Mapping):
+        yield from iter_shards(source, chunk_size, start_index)
+        return
+    for columns in source:
+        yield from iter_shards(columns, chunk_size, start_index)
+        start_index += num_column_rows(columns)
+
+
+def compose_chunk(composer: Composer, chunk: ShardT) -> tuple[list[str], list[Choices]]:
+    """
+    Compose the captions of a chunk. With a seeded composer, the choices of a sample
+    only depend on its index, otherwise they are drawn from the composer's rng.
+    """
+    start, columns = chunk
+    indices = None
+    if composer.seed is not None:
+        indices = np.arange(start, start + num_column_rows(columns))
+    return composer.compose_batch(columns, indices=indices)
+
+
+def _prefetch(
+    composer: Composer,
+    chunks: Iterator[ShardT],
+    results: queue.Queue,
+    stop: threading.Event,
+):
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for chunk in chunks:
+            if not put(compose_chunk(composer, chunk)):
+                return
+    except BaseException as error:
+        put(error)
+        return
+    put(_DONE)
+
+
+def stream(
+    composer: Composer,
+    source: ColumnsSourceT,
+    chunk_size: int = 1024,
+    start_index: int = 0,
+    prefetch: int = 2,
+) -> Generator[tuple[str, Choices], None, None]:
+    """
+    Lazily compose the captions of a source of attribute columns. Chunks are composed
+    in a background thread while the previous ones are consumed, and at most
+    prefetch chunks are kept in memory.
+    Args:
+        composer: the composer.
+        source: dict of attribute columns (e.g. from load_columns), or iterable of
+            dicts of attribute columns.
+        chunk_size: number of samples composed at once.
+        start_index: index of the first sample.
+        prefetch: number of composed chunks waiting to be consumed. With 0, chunks
+            are composed in the consuming thread.
+
+    Yields: The caption and choices of each sample, in order. Closing the generator
+        stops the background thread.
+    """
+    chunks = iter_chunks(source, chunk_size, start_index)
+    if prefetch == 0:
+        for chunk in chunks:
+            yield from zip(*compose_chunk(composer, chunk), strict=True)
+        return
+
+    results: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_prefetch, args=(composer, chunks, results, stop), daemon=True
+    )
+    thread.start()
+    try:
+        while (item := results.get()) is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            yield from zip(*item, strict=True)
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,44 @@
+import re
+from functools import lru_cache
+from typing import TypeAlias
+
+# A compiled template alternates literal segments and token names:
+# "{start} big {shape}." -> ("", "start", " big ", "shape", ".")
+CompiledTemplateT: TypeAlias = tuple[str, ...]
+
+_token_pattern = re.compile(r"\{([^{}]*)\}")
+_spaces_pattern = re.compile(r"\s+")
+
+
+def clean_literal(text: str) -> str:
+    """
+    Collapse the whitespaces of a literal segment and remove the spaces in front of
+    ".". This is the part of the final caption cleanup that does not depend on the
+    neighbouring segments, so it can be done once when the template is compiled.
+    """
+    return _spaces_pattern.sub(" ", text).replace(" .", ".")
+
+
+@lru_cache(maxsize=65536)
+def compile_template(text: str) -> CompiledTemplateT:
+    """
+    Split a template into its literal segments and its "{token}" slots.
+    Args:
+        text: template where tokens are delimited by "{" and "}".
+
+    Returns: A tuple where even indices are (cleaned) literal segments and odd indices
+        are token names.
+    """
+    segments = _token_pattern.split(text)
+    segments[::2] = [clean_literal(literal) for literal in segments[::2]]
+    return tuple(segments)
+
+
+def as_template(text: str) -> CompiledTemplateT:
+    """
+    Compiled template of a value substituted in a caption. Values without any token
+    (like the texts from the writers) are kept as a single literal.
+    """
+    if "{" in text:
+        return compile_template(text)
+    return (text,)
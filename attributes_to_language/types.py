@@ -1,8 +1,12 @@
 from collections.abc import Callable, Mapping, MutableMapping, Sequence
 from typing import Any, TypeAlias, TypedDict
 
+import numpy as np
+
 ComputedAttributeT: TypeAlias = MutableMapping[str, str]
 AttributeT: TypeAlias = Mapping[str, Any]
+# attribute columns of a batch, of shape (N,) or (N, D) for attributes of D values
+AttributeColumnsT: TypeAlias = Mapping[str, np.ndarray]
 CallbackVariantT: TypeAlias = Callable[[ComputedAttributeT | None], str]
 VariantT: TypeAlias = str | CallbackVariantT
 VariantsT: TypeAlias = Mapping[str, Sequence[VariantT]]
@@ -1,23 +1,102 @@
+import itertools
+import math
 import random
-from collections.abc import Mapping, Sequence
-from typing import Any, Literal
+from collections.abc import Callable, Hashable, Mapping, MutableMapping, Sequence
+from pathlib import Path
+from typing import Any, Literal, NamedTuple
 
 import numpy as np
 
+from attributes_to_language.cache import CacheInfo, LRUCache
+from attributes_to_language.index import VoxelGridIndex
+from attributes_to_language.lut import load_rgb_lut
+from attributes_to_language.sampling import Sampler, get_sampler
 from attributes_to_language.types import ChoicesT, VariantsT
-from attributes_to_language.utils import get_closest_key
+from attributes_to_language.utils import digitize, get_closest_key, get_closest_keys
 
+# Value of a batched choice that has not been selected yet
+UNSET = -1
+# Default maximal number of rendered texts in the table of a writer
+MAX_TABLE_SIZE = 2**16
 
-def choose_text(text: Sequence[str] | str, choices: ChoicesT) -> str:
+BatchChoicesT = MutableMapping[str, np.ndarray]
+
+
+class WriterBatch(NamedTuple):
+    """
+    Output of a writer over a batch of values.
+    Attributes:
+        texts: the rendered text of each value.
+        indices: the quantized label index of each value.
+        choices: dict of arrays with the choices of each value.
+    """
+
+    texts: list[str]
+    indices: np.ndarray
+    choices: BatchChoicesT
+
+
+def get_choice_array(
+    choices: Mapping[str, np.ndarray] | None, key: str, size: int
+) -> np.ndarray:
+    if choices is None or key not in choices:
+        return np.full(size, UNSET, dtype=np.int64)
+    return np.array(choices[key], dtype=np.int64)
+
+
+def is_uint8_color(val: Sequence[Any]) -> bool:
+    return len(val) == 3 and all(
+        isinstance(x, int | np.integer) and 0 <= x <= 255 for x in val
+    )
+
+
+def num_texts(text: Sequence[str] | str) -> int:
+    """
+    Number of possible texts of a label: 1 for a single text.
+    """
+    return 1 if isinstance(text, str) else len(text)
+
+
+def choose_text(
+    text: Sequence[str] | str, choices: ChoicesT, rng: Sampler | None = None
+) -> str:
     if isinstance(text, str):
         choices["val"] = 0
         return text
     if "val" not in choices:
-        choices["val"] = random.randint(0, len(text) - 1)
+        if rng is None:
+            choices["val"] = random.randint(0, len(text) - 1)
+        else:
+            choices["val"] = rng.randint("val", len(text))
     text = text[choices["val"]]
     return text
 
 
+def choose_text_batch(
+    texts: Sequence[Sequence[str] | str],
+    indices: np.ndarray,
+    choices: BatchChoicesT,
+    rng: Sampler | None = None,
+) -> list[str]:
+    """
+    Batched version of choose_text for the labels texts[indices].
+    """
+    selected = [texts[index] for index in indices.tolist()]
+    is_text = np.array([isinstance(text, str) for text in selected], dtype=bool)
+    sizes = np.array([num_texts(text) for text in selected], dtype=np.int64)
+    val = get_choice_array(choices, "val", len(selected))
+    # a single text is always selected with val=0
+    val[is_text] = 0
+    unset = val == UNSET
+    if unset.any():
+        val[unset] = get_sampler(rng).integers("val", sizes, len(val))[unset]
+    choices["val"] = val
+    return [
+        text if isinstance(text, str) else text[k]
+        for text, k in zip(selected, val.tolist(), strict=True)
+    ]
+
+
 class Writer:
     """
     Writer instances generate the text associated to a specific value of an attribute.
@@ -25,59 +104,437 @@ class Writer:
     "label_type" property.
     """
 
-    def __init__(self, caption: str | None = None, variants: VariantsT | None = None):
+    # choice selecting one of the possible texts of a label
+    label_choice_key: str | None = None
+
+    def __init__(
+        self,
+        caption: str | None = None,
+        variants: VariantsT | None = None,
+        cache_size: int | None = None,
+    ):
+        """
+        Args:
+            caption: caption of the writer, where "{val}" is replaced by the value.
+            variants: variants of the caption.
+            cache_size: number of rendered texts kept in an LRU cache, keyed on the
+                label, the label choice and the variant choices. No cache if None
+                or 0. The table of a finite writer (see build_table) takes
+                precedence, so the cache only serves the texts that are not in the
+                table, e.g. with max_table_size=None. The batched calls (see
+                batch) do not use the cache.
+        """
         self.caption = caption or "{val}"
         self.variants = variants or {}
+        self.cache: LRUCache[Hashable, str] | None = None
+        if cache_size:
+            self.cache = LRUCache(cache_size)
+        # table of the rendered texts of the finite writers, see build_table
+        self.table: list[str] | None = None
+        self.table_offsets = np.zeros(1, dtype=np.int64)
+        self.table_label_sizes = np.zeros(0, dtype=np.int64)
+        self.table_single_text = np.zeros(0, dtype=bool)
+        self.table_variant_sizes = np.array(
+            [len(possible_variants) for possible_variants in self.variants.values()],
+            dtype=np.int64,
+        )
+
+    @property
+    def choice_keys(self) -> list[str]:
+        """
+        Keys of the choices the writer can draw. Subclasses drawing other choices
+        than the variants must add their keys.
+        """
+        return list(self.variants)
+
+    def choice_cardinalities(self, *val: Any) -> dict[str, int]:
+        """
+        Number of possible values of each choice of the writer for the value val.
+        """
+        return {
+            k: len(possible_variants) for k, possible_variants in self.variants.items()
+        }
+
+    def cache_info(self) -> CacheInfo | None:
+        """
+        Hits, misses and evictions of the cache of the writer, None without cache.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.cache_info()
+
+    def build_table(
+        self,
+        labels: Sequence[Sequence[str] | str],
+        max_size: int | None = MAX_TABLE_SIZE,
+    ):
+        """
+        Render the text of every label, label choice and variant combination in
+        advance, so that rendering is a lookup in the table. The table is not built
+        if it would have more than max_size texts, or if a label cannot be rendered.
+        Args:
+            labels: label, or list of possible labels, of each label index.
+            max_size: maximal number of texts of the table. No table if None or 0.
+        """
+        label_sizes = np.array([num_texts(label) for label in labels], dtype=np.int64)
+        num_combinations = math.prod(self.table_variant_sizes.tolist())
+        if not max_size or label_sizes.sum() * num_combinations > max_size:
+            return
+        keys = list(self.variants)
+        combinations = [
+            dict(zip(keys, selected, strict=True))
+            for selected in itertools.product(
+                *(range(size) for size in self.table_variant_sizes.tolist())
+            )
+        ]
+        table: list[str] = []
+        try:
+            for label in labels:
+                for text in [label] if isinstance(label, str) else label:
+                    table.extend(
+                        self.format(text, combination) for combination in combinations
+                    )
+        except (KeyError, IndexError, ValueError):
+            return
+        self.table = table
+        self.table_label_sizes = label_sizes
+        self.table_single_text = np.array(
+            [isinstance(label, str) for label in labels], dtype=bool
+        )
+        self.table_offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(label_sizes, out=self.table_offsets[1:])
+
+    def table_position(self, label: tuple[int, int], choices: ChoicesT) -> int | None:
+        """
+        Position in the table of the text of label (label index and label choice)
+        with the selected variants, None if a choice is out of the table.
+        """
+        index, alternative = label
+        if not 0 <= alternative < self.table_label_sizes[index]:
+            return None
+        position = int(self.table_offsets[index]) + alternative
+        variant_sizes = self.table_variant_sizes.tolist()
+        for k, size in zip(self.variants, variant_sizes, strict=True):
+            if not 0 <= choices[k] < size:
+                return None
+            position = position * size + choices[k]
+        return position
+
+    def get_label_index(self, *val: Any) -> int:
+        """
+        Label index of the value, for the writers with a table.
+        """
+        raise NotImplementedError
+
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Label index of each value of a batch, for the writers with a table.
+        Subclasses override it with a vectorized version; this one calls
+        get_label_index on each value.
+        Args:
+            values: array of shape (N,) of scalar values, or (N, D) of values with D
+                components.
+        """
+        values = np.asarray(values)
+        rows = values.tolist() if values.ndim > 1 else values[:, None].tolist()
+        return np.array([self.get_label_index(*row) for row in rows], dtype=np.int64)
+
+    def frozen_texts(self, choices: ChoicesT) -> list[str | None] | None:
+        """
+        Text of each label index with complete choices, None for the label indices
+        where the choices are out of the table. None if the writer has no table.
+        Raises ValueError if the choices are incomplete.
+        """
+        missing = [k for k in self.choice_keys if k not in choices]
+        if len(missing):
+            raise ValueError(f"Incomplete writer choices, {missing} are missing.")
+        if self.table is None:
+            return None
+        texts: list[str | None] = []
+        for index, single_text in enumerate(self.table_single_text.tolist()):
+            alternative = 0
+            if self.label_choice_key is not None and not single_text:
+                alternative = choices[self.label_choice_key]
+            position = self.table_position((index, alternative), choices)
+            texts.append(None if position is None else self.table[position])
+        return texts
+
+    def freeze(self, choices: ChoicesT) -> Callable[..., str]:
+        """
+        Specialize the writer to complete choices.
+        Args:
+            choices: choices of the writer, with every key of choice_keys.
+
+        Returns: A function writing a value with these choices.
+        """
+        texts = self.frozen_texts(choices)
+
+        def write_value(*val: Any) -> str:
+            return self(*val, choices=dict(choices))[0]
+
+        if texts is None:
+            return write_value
+
+        def write_label(*val: Any) -> str:
+            text = texts[self.get_label_index(*val)]
+            if text is None:
+                return write_value(*val)
+            return text
+
+        return write_label
+
+    def choose_variants(self, choices: ChoicesT, rng: Sampler | None = None):
+        """
+        Select the missing variant choices. The choices are updated in place.
+        """
+        for k, possible_variants in self.variants.items():
+            if k not in choices:
+                if rng is None:
+                    choices[k] = random.randint(0, len(possible_variants) - 1)
+                else:
+                    choices[k] = rng.randint(k, len(possible_variants))
+
+    def format(self, val: Any, choices: ChoicesT) -> str:
+        """
+        Render the caption of the writer with the selected variants.
+        """
+        variants = {
+            k: possible_variants[choices[k]]
+            for k, possible_variants in self.variants.items()
+        }
+        val = str(val).format(**variants)
+        return self.caption.format(val=val, **variants)
 
     def add_variants(
-        self, val: str, choices: ChoicesT | None = None
+        self,
+        val: str,
+        choices: ChoicesT | None = None,
+        rng: Sampler | None = None,
+        label: tuple[int, int] | None = None,
     ) -> tuple[str, ChoicesT]:
-        variants = dict()
+        """
+        Args:
+            val: text of the value.
+            choices: (possibly partial) choices. Missing variants are selected.
+            rng: source of the random choices.
+            label: label index and label choice of val, used to look the text up in
+                the table or in the cache of the writer.
+
+        Returns: The rendered text and the choices.
+        """
         if choices is None:
             choices = dict()
-        for k, possible_variants in self.variants.items():
-            if k not in choices:
-                choices[k] = random.randint(0, len(possible_variants) - 1)
-            variants[k] = possible_variants[choices[k]]
+        self.choose_variants(choices, rng)
+        if label is None:
+            return self.format(val, choices), choices
+        if self.table is not None:
+            position = self.table_position(label, choices)
+            if position is not None:
+                return self.table[position], choices
+        if self.cache is None:
+            return self.format(val, choices), choices
 
-        val = str(val).format(**variants)
-        text = self.caption.format(val=val, **variants)
+        cache_key = (*label, *(choices[k] for k in self.variants))
+        text = self.cache.get(cache_key)
+        if text is None:
+            text = self.format(val, choices)
+            self.cache.put(cache_key, text)
         return text, choices
 
+    def add_variants_batch(
+        self,
+        vals: Sequence[str],
+        choices: BatchChoicesT,
+        rng: Sampler | None = None,
+        labels: tuple[np.ndarray, np.ndarray] | None = None,
+    ) -> list[str]:
+        """
+        Batched version of add_variants. The choices are updated in place.
+        Args:
+            labels: label indices and label choices of vals, to look the texts up
+                in the table of the writer.
+        """
+        rng = get_sampler(rng)
+        for k, possible_variants in self.variants.items():
+            selected = get_choice_array(choices, k, len(vals))
+            unset = selected == UNSET
+            if unset.any():
+                selected[unset] = rng.integers(k, len(possible_variants), len(vals))[
+                    unset
+                ]
+            choices[k] = selected
+
+        if self.table is not None and labels is not None:
+            indices, alternatives = labels
+            positions = self.table_offsets[indices] + alternatives
+            is_valid = (alternatives >= 0) & (
+                alternatives < self.table_label_sizes[indices]
+            )
+            for k, size in zip(
+                self.variants, self.table_variant_sizes.tolist(), strict=True
+            ):
+                positions = positions * size + choices[k]
+                is_valid &= (choices[k] >= 0) & (choices[k] < size)
+            if is_valid.all():
+                return [self.table[position] for position in positions.tolist()]
+
+        variant_values = {
+            k: [possible_variants[i] for i in choices[k].tolist()]
+            for k, possible_variants in self.variants.items()
+        }
+
+        texts: list[str] = []
+        for row, val in enumerate(vals):
+            variants = {k: values[row] for k, values in variant_values.items()}
+            val = str(val).format(**variants)
+            texts.append(self.caption.format(val=val, **variants))
+        return texts
+
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
         raise NotImplementedError
 
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        """
+        Write a batch of values. This default implementation calls the writer on each
+        value; subclasses provide vectorized versions.
+        Args:
+            values: array of shape (N, D), or (N,) for writers of a single value.
+            choices: dict of arrays of shape (N,) with the choices of each value.
+                UNSET entries are randomly selected.
+
+        Returns: The texts, label indices (UNSET if the writer has no labels) and
+            choices of the batch.
+        """
+        texts: list[str] = []
+        rows_choices: list[ChoicesT] = []
+        for row, value in enumerate(values):
+            row_choices: ChoicesT = {
+                k: int(v[row]) for k, v in (choices or {}).items() if v[row] != UNSET
+            }
+            if not isinstance(value, list | tuple | np.ndarray):
+                value = (value,)
+            text, row_choices = self(
+                *value, choices=row_choices, rng=None if rng is None else rng.row(row)
+            )
+            texts.append(text)
+            rows_choices.append(row_choices)
+        batch_choices: BatchChoicesT = dict()
+        for row, value_choices in enumerate(rows_choices):
+            for k, v in value_choices.items():
+                if k not in batch_choices:
+                    batch_choices[k] = np.full(len(texts), UNSET, dtype=np.int64)
+                batch_choices[k][row] = v
+        return WriterBatch(
+            texts, np.full(len(texts), UNSET, dtype=np.int64), batch_choices
+        )
+
 
 class OptionsWriter(Writer):
+    label_choice_key = "name"
+
     def __init__(
         self,
         choices: Mapping[Any, Sequence[str]],
         caption: str | None = None,
         variants: VariantsT | None = None,
+        cache_size: int | None = None,
+        max_table_size: int | None = MAX_TABLE_SIZE,
     ):
-        super().__init__(caption, variants)
+        super().__init__(caption, variants, cache_size)
         self.choices = choices
+        self.option_index = {name: k for k, name in enumerate(self.choices)}
+        self.build_table(
+            [list(option) for option in self.choices.values()], max_table_size
+        )
+
+    @property
+    def choice_keys(self) -> list[str]:
+        return ["name", *self.variants]
+
+    def choice_cardinalities(self, *val: Any) -> dict[str, int]:
+        assert len(val) == 1
+        return {"name": len(self.choices[val[0]]), **super().choice_cardinalities()}
+
+    def get_label_index(self, *val: Any) -> int:
+        assert len(val) == 1
+        return self.option_index[val[0]]
 
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
         assert len(val) == 1
         name = val[0]
-        assert (
-            name in self.choices
-        ), f"{self.choices} does not contain options for {name}"
+        assert name in self.choices, (
+            f"{self.choices} does not contain options for {name}"
+        )
         if choices is None:
             choices = dict()
         if "name" not in choices:
-            choices["name"] = random.randint(0, len(self.choices[name]) - 1)
+            if rng is None:
+                choices["name"] = random.randint(0, len(self.choices[name]) - 1)
+            else:
+                choices["name"] = rng.randint("name", len(self.choices[name]))
         selected_option = self.choices[name][choices["name"]]
-        text, variant_choices = self.add_variants(selected_option, choices)
+        text, variant_choices = self.add_variants(
+            selected_option,
+            choices,
+            rng,
+            label=(self.option_index[name], choices["name"]),
+        )
         return text, {**choices, **variant_choices}
 
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Factorize an array of option keys into the index of each key in choices.
+        """
+        uniques, inverse = np.unique(
+            np.asarray(values).reshape(-1), return_inverse=True
+        )
+        codes = []
+        for name in uniques.tolist():
+            assert name in self.option_index, (
+                f"{self.choices} does not contain options for {name}"
+            )
+            codes.append(self.option_index[name])
+        return np.array(codes, dtype=np.intp)[inverse.reshape(-1)]
+
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        indices = self.quantize(values)
+        options = list(self.choices.values())
+        batch_choices: BatchChoicesT = dict(choices or {})
+        selected = get_choice_array(batch_choices, "name", len(indices))
+        unset = selected == UNSET
+        if unset.any():
+            num_options = np.array([len(option) for option in options])
+            selected[unset] = get_sampler(rng).integers(
+                "name", num_options[indices], len(indices)
+            )[unset]
+        batch_choices["name"] = selected
+        texts = [
+            options[index][k]
+            for index, k in zip(indices.tolist(), selected.tolist(), strict=True)
+        ]
+        texts = self.add_variants_batch(
+            texts, batch_choices, rng, labels=(indices, selected)
+        )
+        return WriterBatch(texts, indices, batch_choices)
+
 
 class QuantizedWriter(Writer):
+    label_choice_key = "val"
+
     def __init__(
         self,
         quantized_values: np.ndarray,
@@ -85,52 +542,219 @@ class QuantizedWriter(Writer):
         variants: VariantsT | None = None,
         labels: Sequence[Sequence[str]] | Sequence[str] | None = None,
         norm: Literal["1", "2"] = "2",
+        use_index: bool = False,
+        index_bounds: tuple[Sequence[float], Sequence[float]] | None = None,
+        lut_bits: int | None = None,
+        lut_cache_dir: str | Path | None = None,
+        cache_size: int | None = None,
+        max_table_size: int | None = MAX_TABLE_SIZE,
     ):
-        super().__init__(caption, variants)
+        """
+        Args:
+            quantized_values: values of shape (D, K), or (K,) for scalar values.
+            caption: caption of the writer, where "{val}" is replaced by the label.
+            variants: variants of the caption.
+            labels: label, or list of possible labels, of each quantized value.
+            norm: "1" or "2" norm used to find the closest quantized value.
+            use_index: build a VoxelGridIndex over the quantized values to avoid
+                computing the distance to every value. Useful for large sets of
+                values such as COLORS_XKCD.
+            index_bounds: lower and upper corners of the index grid. Defaults to the
+                bounding box of the quantized values. Values outside of the grid
+                are brute forced.
+            lut_bits: for RGB palettes of shape (3, K), look up uint8 colors in a
+                dense table with this number of bits per channel instead of
+                computing distances. With 8 bits the result is exact, fewer bits
+                give a smaller but approximate table. The table is built once and
+                memory-mapped from a cache file (see lut.load_rgb_lut).
+            lut_cache_dir: folder of the cached tables. Defaults to
+                lut.get_cache_dir().
+            cache_size: size of the cache of rendered texts (see Writer).
+            max_table_size: maximal size of the table of rendered texts (see
+                Writer.build_table).
+        """
+        super().__init__(caption, variants, cache_size)
 
         self.quantized_values = quantized_values
         self.labels = labels or []
         self.norm: Literal["1", "2"] = norm
+        self.index: VoxelGridIndex | None = None
+        if use_index:
+            self.index = VoxelGridIndex(quantized_values, norm, bounds=index_bounds)
+        self.lut_bits = lut_bits
+        self.lut_cache_dir = lut_cache_dir
+        self._lut: np.ndarray | None = None
+        self.build_table(self.labels, max_table_size)
+
+    @property
+    def choice_keys(self) -> list[str]:
+        return ["val", *self.variants]
+
+    @property
+    def lut(self) -> np.ndarray:
+        """
+        RGB lookup table, loaded on first use.
+        """
+        assert self.lut_bits is not None
+        if self._lut is None:
+            self._lut = load_rgb_lut(
+                self.quantized_values, self.norm, self.lut_bits, self.lut_cache_dir
+            )
+        return self._lut
+
+    def get_label_index(self, *val: Any) -> int:
+        """
+        Index of the closest quantized value.
+        """
+        if self.lut_bits is not None and is_uint8_color(val):
+            shift = 8 - self.lut_bits
+            return int(self.lut[val[0] >> shift, val[1] >> shift, val[2] >> shift])
+        if self.index is not None:
+            return self.index.query(val)
+        return get_closest_key(self.quantized_values, val, self.norm).item()
+
+    def label_at(self, index: int) -> Sequence[str] | str:
+        return self.labels[index]
+
+    def get_label(self, *val: Any) -> Sequence[str] | str:
+        """
+        Label, or list of possible labels, of the closest quantized value.
+        """
+        return self.label_at(self.get_label_index(*val))
+
+    def choice_cardinalities(self, *val: Any) -> dict[str, int]:
+        return {
+            "val": num_texts(self.get_label(*val)),
+            **super().choice_cardinalities(),
+        }
 
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
         if choices is None:
             choices = dict()
-        quantized_val = get_closest_key(self.quantized_values, val, self.norm).item()
-        text = self.labels[quantized_val]
-        text = choose_text(text, choices)
-        text, variant_choices = self.add_variants(text, choices)
+        index = self.get_label_index(*val)
+        text = choose_text(self.label_at(index), choices, rng)
+        text, variant_choices = self.add_variants(
+            text, choices, rng, label=(index, choices["val"])
+        )
         return text, {**choices, **variant_choices}
 
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Index of the closest quantized value for each row of values.
+        Args:
+            values: array of shape (N, D), or (N,) when the quantized values are
+                scalars.
+        """
+        values = np.asarray(values)
+        if (
+            self.lut_bits is not None
+            and values.dtype.kind in "iu"
+            and values.ndim == 2
+            and values.shape[1] == 3
+            and (not values.size or (values.min() >= 0 and values.max() <= 255))
+        ):
+            colors = values.astype(np.intp) >> (8 - self.lut_bits)
+            return self.lut[colors[:, 0], colors[:, 1], colors[:, 2]].astype(np.intp)
+        if self.index is not None:
+            return self.index.query_batch(values)
+        return get_closest_keys(self.quantized_values, values, self.norm)
+
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        indices = self.quantize(values)
+        batch_choices: BatchChoicesT = dict(choices or {})
+        texts = choose_text_batch(self.labels, indices, batch_choices, rng)
+        texts = self.add_variants_batch(
+            texts, batch_choices, rng, labels=(indices, batch_choices["val"])
+        )
+        return WriterBatch(texts, indices, batch_choices)
+
 
 class BinsWriter(Writer):
+    label_choice_key = "val"
+
     def __init__(
         self,
         bins: np.ndarray,
         caption: str | None = None,
         variants: VariantsT | None = None,
         labels: Sequence[Sequence[str]] | Sequence[str] | None = None,
+        cache_size: int | None = None,
+        max_table_size: int | None = MAX_TABLE_SIZE,
     ):
-        super().__init__(caption, variants)
+        super().__init__(caption, variants, cache_size)
         self.bins = bins
         self.labels = labels or []
+        self.build_table(self.labels, max_table_size)
+
+    @property
+    def choice_keys(self) -> list[str]:
+        return ["val", *self.variants]
+
+    def get_label_index(self, *val: Any) -> int:
+        """
+        Index of the bin of the value.
+        """
+        assert len(val) == 1
+        return np.digitize([val[0]], self.bins).item()
+
+    def label_at(self, index: int) -> Sequence[str] | str:
+        return self.labels[index]
+
+    def get_label(self, *val: Any) -> Sequence[str] | str:
+        """
+        Label, or list of possible labels, of the bin of the value.
+        """
+        return self.label_at(self.get_label_index(*val))
+
+    def choice_cardinalities(self, *val: Any) -> dict[str, int]:
+        return {
+            "val": num_texts(self.get_label(*val)),
+            **super().choice_cardinalities(),
+        }
 
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
-        assert len(val) == 1
-        item = val[0]
         if choices is None:
             choices = dict()
-        index = np.digitize([item], self.bins).item()
-        text = self.labels[index]
-        text = choose_text(text, choices)
-        text, variant_choices = self.add_variants(text, choices)
+        index = self.get_label_index(*val)
+        text = choose_text(self.label_at(index), choices, rng)
+        text, variant_choices = self.add_variants(
+            text, choices, rng, label=(index, choices["val"])
+        )
         return text, {**choices, **variant_choices}
 
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Bin index of each value of the 1-D array values.
+        """
+        return digitize(np.asarray(values).reshape(-1), self.bins)
+
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        indices = self.quantize(values)
+        batch_choices: BatchChoicesT = dict(choices or {})
+        texts = choose_text_batch(self.labels, indices, batch_choices, rng)
+        texts = self.add_variants_batch(
+            texts, batch_choices, rng, labels=(indices, batch_choices["val"])
+        )
+        return WriterBatch(texts, indices, batch_choices)
+
 
 class Bins2dWriter(Writer):
+    label_choice_key = "val"
+
     def __init__(
         self,
         bins,
@@ -139,24 +763,90 @@ class Bins2dWriter(Writer):
         labels: Sequence[Sequence[Sequence[str]]]
         | Sequence[Sequence[str]]
         | None = None,
+        cache_size: int | None = None,
+        max_table_size: int | None = MAX_TABLE_SIZE,
     ):
-        super().__init__(caption, variants)
+        super().__init__(caption, variants, cache_size)
         self.bins = bins
         self.labels = labels or [[]]
+        # the flat label indices need the same number of labels per row
+        width = len(self.bins[1]) + 1
+        if all(len(row) == width for row in self.labels):
+            self.build_table(
+                [label for row in self.labels for label in row], max_table_size
+            )
+
+    @property
+    def choice_keys(self) -> list[str]:
+        return ["val", *self.variants]
+
+    def get_label_index(self, *val: Any) -> int:
+        """
+        Flat index index_0 * (len(bins[1]) + 1) + index_1 of the 2d bin of the value.
+        """
+        assert self.bins.shape[0] == 2
+        index_0 = np.digitize([val[0]], self.bins[0]).item()
+        index_1 = np.digitize([val[1]], self.bins[1]).item()
+        return index_0 * (len(self.bins[1]) + 1) + index_1
+
+    def label_at(self, index: int) -> Sequence[str] | str:
+        index_0, index_1 = divmod(index, len(self.bins[1]) + 1)
+        return self.labels[index_0][index_1]
+
+    def get_label(self, *val: Any) -> Sequence[str] | str:
+        """
+        Label, or list of possible labels, of the 2d bin of the value.
+        """
+        return self.label_at(self.get_label_index(*val))
+
+    def choice_cardinalities(self, *val: Any) -> dict[str, int]:
+        return {
+            "val": num_texts(self.get_label(*val)),
+            **super().choice_cardinalities(),
+        }
 
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
         if choices is None:
             choices = dict()
-        assert self.bins.shape[0] == 2
-        index_0 = np.digitize([val[0]], self.bins[0]).item()
-        index_1 = np.digitize([val[1]], self.bins[1]).item()
-        label = self.labels[index_0][index_1]
-        text = choose_text(label, choices)
-        text, variant_choices = self.add_variants(text, choices)
+        index = self.get_label_index(*val)
+        text = choose_text(self.label_at(index), choices, rng)
+        text, variant_choices = self.add_variants(
+            text, choices, rng, label=(index, choices["val"])
+        )
         return text, {**choices, **variant_choices}
 
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Flat bin index index_0 * (len(bins[1]) + 1) + index_1 of each row of the
+        (N, 2) array values.
+        """
+        assert self.bins.shape[0] == 2
+        values = np.asarray(values)
+        index_0 = digitize(values[:, 0], self.bins[0])
+        index_1 = digitize(values[:, 1], self.bins[1])
+        return index_0 * (len(self.bins[1]) + 1) + index_1
+
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        indices = self.quantize(values)
+        width = len(self.bins[1]) + 1
+        assert all(len(row) == width for row in self.labels), (
+            f"Bins2dWriter.batch expects {width} labels per row"
+        )
+        labels = [label for row in self.labels for label in row]
+        batch_choices: BatchChoicesT = dict(choices or {})
+        texts = choose_text_batch(labels, indices, batch_choices, rng)
+        texts = self.add_variants_batch(
+            texts, batch_choices, rng, labels=(indices, batch_choices["val"])
+        )
+        return WriterBatch(texts, indices, batch_choices)
+
 
 class ContinuousAngleWriter(Writer):
     def __init__(
@@ -164,23 +854,79 @@ class ContinuousAngleWriter(Writer):
         caption: str | None = None,
         variants: VariantsT | None = None,
         sampling: int = 5,
+        cache_size: int | None = None,
+        max_table_size: int | None = MAX_TABLE_SIZE,
     ):
-        super().__init__(caption, variants)
+        super().__init__(caption, variants, cache_size)
         self.sampling = sampling
+        # text of each possible degree, indexed by degree // degree_step
+        self.degrees = np.array(
+            [str(deg) for deg in range(0, 360, self.degree_step)], dtype=str
+        )
+        self.build_table(self.degrees.tolist(), max_table_size)
 
     def __call__(
-        self, *val: Any, choices: ChoicesT | None = None
+        self, *val: Any, choices: ChoicesT | None = None, rng: Sampler | None = None
     ) -> tuple[str, ChoicesT]:
         """
         Args:
             angle: Angle of the object in radians
         """
+        deg = self.get_degree(*val)
+        return self.add_variants(
+            str(deg), choices, rng, label=(deg // self.degree_step, 0)
+        )
+
+    def get_degree(self, *val: Any) -> int:
+        """
+        Angle (in radians) rounded to the sampling, in degrees.
+        """
         assert len(val) == 1
         angle = val[0]
         if angle < 0:
             angle = 2 * np.pi + angle
         # round to every 5 degrees and set in degrees
-        deg = (
+        return (
             int(self.sampling * round(angle * 360 / (2 * np.pi) / self.sampling)) % 360
         )
-        return self.add_variants(str(deg), choices)
+
+    def get_label_index(self, *val: Any) -> int:
+        return self.get_degree(*val) // self.degree_step
+
+    @property
+    def degree_step(self) -> int:
+        """
+        Step between the possible degrees: every degree is a multiple of it.
+        """
+        if isinstance(self.sampling, int):
+            return math.gcd(self.sampling, 360)
+        return 1
+
+    def quantize(self, values: Any) -> np.ndarray:
+        """
+        Rounded degrees of each angle (in radians) of the 1-D array values, divided
+        by degree_step.
+        """
+        angle = np.asarray(values).reshape(-1)
+        angle = np.where(angle < 0, 2 * np.pi + angle, angle)
+        # round to every 5 degrees and set in degrees
+        deg = (
+            self.sampling * np.round(angle * 360 / (2 * np.pi) / self.sampling)
+        ).astype(np.int64) % 360
+        return deg // self.degree_step
+
+    def batch(
+        self,
+        values: Any,
+        choices: Mapping[str, np.ndarray] | None = None,
+        rng: Sampler | None = None,
+    ) -> WriterBatch:
+        indices = self.quantize(values)
+        batch_choices: BatchChoicesT = dict(choices or {})
+        texts = self.add_variants_batch(
+            np.take(self.degrees, indices).tolist(),
+            batch_choices,
+            rng,
+            labels=(indices, np.zeros_like(indices)),
+        )
+        return WriterBatch(texts, indices, batch_choices)
@@ -0,0 +1,88 @@
+from collections.abc import Callable, Mapping
+
+import numpy as np
+from writers import location_writer_bins, writers
+
+from attributes_to_language import artifact
+from attributes_to_language.types import AttributeT, VariantsT
+
+
+# registered so that composers using it can be saved (see Composer.save)
+@artifact.register_factory("simple_shapes/a_has_n")
+def a_has_n(sentence: str) -> Callable[[Mapping[str, str]], str]:
+    """
+    This replaces {n?} in the sentence with either "n" if the following letter is a
+    vowel, or nothing otherwise.
+    """
+
+    def aux(
+        attributes: Mapping[str, str],
+    ):  # the variant callable must receive an "attributes" parameter.
+        vowels = ["a", "e", "i", "o", "u"]
+        # the "_next" represent the name of the next token if it is an attribute token
+        # and if it exists.
+        # similarly, "_prev" represent the name of the previous token.
+        if attributes[attributes["_next"]][0] in vowels:
+            return sentence.replace("{n?}", "n")
+        return sentence.replace("{n?}", "")
+
+    return aux
+
+
+# Templates for the overall text. The items in {} can come from the associated key
+# in the "variants" dict attributes
+# or from a kwargs given to the composer method.
+script_structures: list[str] = [
+    # The < and > delimit groups. Groups are then randomly permuted.
+    # For example "<hello> <world>" will yield either "hello world" or "world hello".
+    # Groups can contain variant or attribute tokens.
+    "{start} {size} {colorBefore} {shape}, <{located}{in_the} {location}>{link} <{rotation}>.",
+    "{start} {color} {size} {shape}, {located} {in_the} {location}{link} {rotation}.",
+    "{start} {size} {shape} in {color} color, {located} {in_the} {location}{link} {rotation}.",
+    "{start} {size} {shape} in {color} color{link} {located} {in_the} {location} and {is?}{rotation}.",
+    "{start} {size} {color} {shape}{link} {located} {in_the} {location} and {is?}{rotation}.",
+    "{start} {color} {size} {shape}{link} {located} {in_the} {location} and {is?}{rotation}.",
+]
+
+start_variant = [
+    "A",
+    "It is a",
+    "This is a",
+    "There is a",
+    "The image is a",
+    "The image represents a",
+    "The image contains a",
+]
+# Variants can be callable functions. In this case, the called function will receive a dictionary with the attributes
+# formatted by the writers.
+start_variant = [a_has_n(x + "{n?}") for x in start_variant] + ["A kind of"]
+
+# Elements in the list of each variant is randomly chosen.
+variants: VariantsT = {
+    "start": start_variant,
+    "colorBefore": ["{color}", "{color} colored"],
+    "located": ["", "located "],
+    "in_the": ["in the", "at the"],
+    "link": [". It is", ", and is"],
+    "is?": ["", "is "],
+}
+
+# All the writers of the example with the attribute they write, including the ones
+# that are not used by the composer.
+benchmark_writers = {
+    **writers,
+    "location": [*writers["location"], location_writer_bins],
+}
+
+
+def random_attributes(rng: np.random.Generator) -> AttributeT:
+    """
+    Random attributes of a shape, as given to the composer.
+    """
+    return {
+        "shape": int(rng.integers(3)),
+        "rotation": float(rng.uniform(0, 2 * np.pi)),
+        "color": tuple(int(c) for c in rng.integers(256, size=3)),
+        "size": int(rng.integers(7, 15)),
+        "location": tuple(float(x) for x in rng.uniform(7, 25, size=2)),
+    }
@@ -0,0 +1,163 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from attributes_to_language.composer import Composer
+from attributes_to_language.types import AttributeT, VariantsT
+from attributes_to_language.writers import (
+    Bins2dWriter,
+    BinsWriter,
+    ContinuousAngleWriter,
+    OptionsWriter,
+    QuantizedWriter,
+    Writer,
+)
+
+SCRIPT_STRUCTURES = [
+    "{start} {size} {color} {shape}, <{located} {in_the} {location}>{link} "
+    "<{rotation}>.",
+    "{start} {color} {shape} of {size} size{link} {located} {in_the} {location}.",
+    "{start} {shape} in {color}, {rotation}.",
+]
+
+VARIANTS: VariantsT = {
+    "start": ["A", "There is a", "The image contains a"],
+    "located": ["", "located"],
+    "in_the": ["in the", "at the"],
+    "link": [". It is", ", and is"],
+}
+
+COLORS = np.array(
+    [[255, 0, 0, 0, 255, 128], [0, 255, 0, 0, 255, 128], [0, 0, 255, 0, 255, 128]]
+)
+COLOR_LABELS = [
+    ["red", "crimson"],
+    "green",
+    ["blue", "navy"],
+    "black",
+    "white",
+    ["gray", "grey"],
+]
+
+
+def make_writers(**kwargs: Any) -> dict[str, list[Writer]]:
+    """
+    Writers of the test composer, one of each type.
+    Args:
+        kwargs: arguments given to every writer, e.g. cache_size.
+    """
+    return {
+        "shape": [
+            OptionsWriter(
+                choices={
+                    0: ["square", "diamond"],
+                    1: ["egg", "oval", "water droplet"],
+                    2: ["triangle"],
+                },
+                **kwargs,
+            )
+        ],
+        "color": [
+            QuantizedWriter(
+                quantized_values=COLORS,
+                labels=COLOR_LABELS,
+                variants={"colored": ["", " colored"]},
+                caption="{val}{colored}",
+                **kwargs,
+            )
+        ],
+        "size": [
+            BinsWriter(
+                bins=np.array([9, 11, 13]),
+                labels=["tiny", ["small", "little"], "medium", ["big", "large"]],
+                **kwargs,
+            )
+        ],
+        "location": [
+            QuantizedWriter(
+                quantized_values=np.array([[10, 16, 22, 10, 22], [10, 10, 10, 22, 22]]),
+                labels=[
+                    ["bottom left", "lower left"],
+                    "bottom",
+                    "bottom right",
+                    "top left",
+                    ["top right", "upper right"],
+                ],
+                variants={"corner": ["", " corner"]},
+                caption="{val}{corner}",
+                **kwargs,
+            ),
+            Bins2dWriter(
+                bins=np.array([[13, 19], [13, 19]]),
+                labels=[
+                    [["bottom left", "lower left"], "bottom", "bottom right"],
+                    ["left", "middle", "right"],
+                    ["top left", "top", "top right"],
+                ],
+                **kwargs,
+            ),
+        ],
+        "rotation": [
+            QuantizedWriter(
+                quantized_values=np.array([0, np.pi / 2, np.pi, 3 * np.pi / 2]),
+                labels=["north", "west", "south", "east"],
+                caption="pointing {val}",
+                **kwargs,
+            ),
+            ContinuousAngleWriter(
+                caption="rotated {val} degrees{anti_clock}",
+                variants={"anti_clock": ["", " anti clockwise"]},
+                **kwargs,
+            ),
+        ],
+    }
+
+
+def random_attributes(rng: np.random.Generator) -> AttributeT:
+    return {
+        "shape": int(rng.integers(3)),
+        "color": tuple(int(c) for c in rng.integers(256, size=3)),
+        "size": int(rng.integers(7, 15)),
+        "location": tuple(float(x) for x in rng.uniform(7, 25, size=2)),
+        "rotation": float(rng.uniform(0, 2 * np.pi)),
+    }
+
+
+def random_columns(rng: np.random.Generator, size: int) -> dict[str, np.ndarray]:
+    """
+    Attribute columns of size random samples.
+    """
+    return {
+        "shape": rng.integers(3, size=size),
+        "color": rng.integers(256, size=(size, 3)),
+        "size": rng.integers(7, 15, size=size),
+        "location": rng.uniform(7, 25, size=(size, 2)),
+        "rotation": rng.uniform(0, 2 * np.pi, size=size),
+    }
+
+
+def make_seeded_composer(seed: int | None = 7) -> Composer:
+    return Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS, rng=seed)
+
+
+@pytest.fixture
+def composer() -> Composer:
+    """
+    Composer drawing from the global random states.
+    """
+    return Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS)
+
+
+@pytest.fixture
+def attributes() -> list[AttributeT]:
+    rng = np.random.default_rng(0)
+    return [random_attributes(rng) for _ in range(200)]
+
+
+@pytest.fixture
+def seeded_composer() -> Composer:
+    """
+    Composer whose choices of sample k only depend on the seed and on k.
+    """
+    return make_seeded_composer()
@@ -0,0 +1,64 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from attributes_to_language import AsyncComposer
+
+from .conftest import make_seeded_composer
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys\n"
+        "import attributes_to_language as a2l\n"
+        "assert 'attributes_to_language.aio' not in sys.modules\n"
+        "assert 'asyncio' not in sys.modules\n"
+        "assert 'AsyncComposer' in dir(a2l)\n"
+        "from attributes_to_language.aio import AsyncComposer\n"
+        "assert a2l.AsyncComposer is AsyncComposer\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_concurrent_requests_match_composer(attributes):
+    composer = make_seeded_composer()
+    reference = make_seeded_composer()
+
+    async def compose_all():
+        async with AsyncComposer(composer, max_batch_size=16) as async_composer:
+            return await asyncio.gather(
+                *(
+                    async_composer.compose(sample, index=index)
+                    for index, sample in enumerate(attributes)
+                )
+            )
+
+    results = asyncio.run(compose_all())
+    assert results == [
+        reference(sample, index=index) for index, sample in enumerate(attributes)
+    ]
+
+
+def test_failing_request_only_fails_itself(attributes):
+    composer = make_seeded_composer()
+
+    async def compose_all():
+        async with AsyncComposer(composer, max_batch_size=8) as async_composer:
+            return await asyncio.gather(
+                async_composer.compose(attributes[0], index=0),
+                async_composer.compose({"shape": 10}, index=1),
+                return_exceptions=True,
+            )
+
+    good, bad = asyncio.run(compose_all())
+    assert good == make_seeded_composer()(attributes[0], index=0)
+    assert isinstance(bad, Exception)
+
+
+def test_unknown_attribute():
+    import attributes_to_language
+
+    with pytest.raises(AttributeError):
+        attributes_to_language.UnknownComposer  # noqa: B018
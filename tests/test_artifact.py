@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from attributes_to_language.artifact import (
+    load_composer_state,
+    register,
+    register_factory,
+)
+from attributes_to_language.composer import Composer
+from attributes_to_language.types import ComputedAttributeT
+from attributes_to_language.writers import QuantizedWriter
+
+from .conftest import COLORS, SCRIPT_STRUCTURES, VARIANTS, make_writers
+
+
+@register("tests.shape_article")
+def shape_article(attributes: ComputedAttributeT | None) -> str:
+    if attributes is not None and attributes.get("_next", "")[:1] in "aeiou":
+        return "An"
+    return "A"
+
+
+@register_factory("tests.suffix")
+def suffix(text: str):
+    def modifier(structure: str) -> str:
+        return structure + text
+
+    return modifier
+
+
+def make_composer(seed: int | None = 5) -> Composer:
+    variants = {**VARIANTS, "start": [*VARIANTS["start"], shape_article]}
+    return Composer(
+        SCRIPT_STRUCTURES, make_writers(), variants, [suffix(" Done.")], rng=seed
+    )
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, attributes, mmap):
+    composer = make_composer()
+    path = tmp_path / "composer.a2l"
+    composer.save(path)
+    loaded = Composer.load(path, mmap=mmap)
+    assert loaded.seed == composer.seed
+    assert loaded.variants["start"][-1] is shape_article
+    for index, sample in enumerate(attributes):
+        assert loaded(sample, index=index) == composer(sample, index=index)
+    # the loaded writers are the same classes, with the same tables
+    for name, writers in composer.writers.items():
+        for writer, loaded_writer in zip(writers, loaded.writers[name], strict=True):
+            assert type(loaded_writer) is type(writer)
+            assert loaded_writer.table == writer.table
+
+
+def test_round_trip_arrays(tmp_path):
+    writer = QuantizedWriter(quantized_values=COLORS, labels=[str(k) for k in range(6)])
+    composer = Composer(["{color}."], {"color": [writer]})
+    path = tmp_path / "composer.a2l"
+    composer.save(path)
+    state = load_composer_state(path)
+    loaded_writer = state.writers["color"][0]
+    assert isinstance(loaded_writer, QuantizedWriter)
+    assert isinstance(loaded_writer.quantized_values, np.memmap)
+    assert not loaded_writer.quantized_values.flags.writeable
+    np.testing.assert_array_equal(loaded_writer.quantized_values, COLORS)
+    assert state.seed is None
+
+
+def test_load_with_rng(tmp_path, attributes):
+    composer = make_composer()
+    path = tmp_path / "composer.a2l"
+    composer.save(path)
+    loaded = Composer.load(path, rng=11)
+    reference = make_composer(11)
+    assert loaded(attributes[0], index=3) == reference(attributes[0], index=3)
+
+
+def test_unregistered_callable(tmp_path):
+    variants = {**VARIANTS, "start": [lambda attributes: "A"]}
+    composer = Composer(SCRIPT_STRUCTURES, make_writers(), variants)
+    with pytest.raises(ValueError):
+        composer.save(tmp_path / "composer.a2l")
+
+
+def test_not_an_artifact(tmp_path):
+    path = tmp_path / "composer.a2l"
+    path.write_bytes(b"not an artifact of a composer")
+    with pytest.raises(ValueError):
+        Composer.load(path)
@@ -0,0 +1,71 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from attributes_to_language.batch import (
+    CaptionBatch,
+    decode_captions,
+    encode_captions,
+)
+
+from .conftest import random_columns
+
+CAPTIONS = ["A red square.", "", "Un carré bleu à gauche.", "日本語", "A green egg."]
+
+
+def make_batch(captions: list[str]) -> CaptionBatch:
+    choices = np.arange(len(captions) * 2, dtype=np.int16).reshape(-1, 2)
+    return CaptionBatch.from_captions(captions, choices)
+
+
+@pytest.mark.parametrize("captions", [CAPTIONS, CAPTIONS[:1] + CAPTIONS[4:], []])
+def test_encode_decode(captions):
+    offsets, data = encode_captions(captions)
+    assert offsets.dtype == np.int64 and data.dtype == np.uint8
+    assert len(offsets) == len(captions) + 1
+    assert data.tobytes() == "".join(captions).encode()
+    assert decode_captions(offsets, data) == captions
+
+
+def test_batch_access():
+    batch = make_batch(CAPTIONS)
+    assert len(batch) == len(CAPTIONS)
+    assert list(batch) == CAPTIONS
+    assert [batch[k] for k in range(len(batch))] == CAPTIONS
+    assert batch[-1] == CAPTIONS[-1]
+    with pytest.raises(IndexError):
+        batch[len(CAPTIONS)]
+    assert batch.nbytes == (
+        batch.offsets.nbytes + batch.data.nbytes + batch.choices.nbytes
+    )
+
+
+def test_concatenate():
+    parts = [CAPTIONS[:2], [], CAPTIONS[2:]]
+    batch = CaptionBatch.concatenate(
+        [make_batch(part) for part in parts], 2, np.dtype(np.int16)
+    )
+    assert batch.captions() == CAPTIONS
+    np.testing.assert_array_equal(
+        batch.choices,
+        np.concatenate([make_batch(part).choices for part in parts]),
+    )
+    empty = CaptionBatch.concatenate([], 3, np.dtype(np.int8))
+    assert len(empty) == 0
+    assert empty.choices.shape == (0, 3) and empty.choices.dtype == np.int8
+
+
+def test_pickle():
+    batch = make_batch(CAPTIONS)
+    copy = pickle.loads(pickle.dumps(batch))
+    assert copy.captions() == CAPTIONS
+    np.testing.assert_array_equal(copy.choices, batch.choices)
+
+
+def test_composer_caption_batch(seeded_composer):
+    columns = random_columns(np.random.default_rng(0), 60)
+    batch = seeded_composer.compose_caption_batch(columns, indices=np.arange(60))
+    captions, choices = seeded_composer.compose_batch(columns, indices=np.arange(60))
+    assert batch.captions() == captions
+    assert seeded_composer.codec.decode_batch(batch.choices) == choices
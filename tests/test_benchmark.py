@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from attributes_to_language.benchmark import MIN_BATCH_CALLS, main
+
+EXAMPLE = Path(__file__).parents[1] / "examples" / "simple_shapes"
+
+
+def test_config_is_required():
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_batch_benchmarks_minimal_calls(tmp_path, capsys):
+    path = tmp_path / "results.json"
+    status = main(
+        [
+            "--config",
+            str(EXAMPLE),
+            "--calls",
+            "20",
+            "--batch-size",
+            "4",
+            "--only",
+            "composer/",
+            "--save",
+            str(path),
+        ]
+    )
+    assert status == 0
+    with open(path) as f:
+        results = json.load(f)["results"]
+    assert "composer/batch" in results
+    assert results["composer/batch"]["calls"] == MIN_BATCH_CALLS
+    capsys.readouterr()
+    # compare to the saved results, without failing on timing noise
+    argv = ["--config", str(EXAMPLE), "--calls", "20", "--only", "composer/fixed"]
+    assert main([*argv, "--baseline", str(path), "--threshold", "1"]) == 0
+    assert "composer/fixed" in capsys.readouterr().out
@@ -0,0 +1,84 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from attributes_to_language.cache import CacheInfo, LRUCache
+from attributes_to_language.composer import Composer
+from attributes_to_language.sampling import GeneratorSampler
+
+from .conftest import SCRIPT_STRUCTURES, VARIANTS, make_writers, random_attributes
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.cache_info() == CacheInfo(
+        hits=1, misses=1, evictions=1, maxsize=2, currsize=2
+    )
+    cache.clear()
+    assert cache.cache_info() == CacheInfo(0, 0, 0, 2, 0)
+
+
+def test_lru_cache_pickle_drops_values():
+    cache: LRUCache[str, int] = LRUCache(3)
+    cache.put("a", 1)
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.maxsize == 3
+    assert len(copy) == 0
+
+
+@pytest.mark.parametrize("cache_size", [1, 4, 1000])
+def test_cached_writers_match_uncached(cache_size):
+    # without tables, so that the texts are read from the cache
+    tabled_writers = make_writers()
+    writers = make_writers(max_table_size=None)
+    cached_writers = make_writers(max_table_size=None, cache_size=cache_size)
+    rng = np.random.default_rng(0)
+    values = [random_attributes(rng) for _ in range(300)]
+    for name, possible_writers in writers.items():
+        for tabled_writer, writer, cached_writer in zip(
+            tabled_writers[name], possible_writers, cached_writers[name], strict=True
+        ):
+            assert writer.table is None and cached_writer.table is None
+            assert writer.cache_info() is None
+            samplers = [GeneratorSampler(np.random.default_rng(1)) for _ in range(3)]
+            for attributes in values:
+                value = attributes[name]
+                if not isinstance(value, tuple):
+                    value = (value,)
+                text = cached_writer(*value, choices={}, rng=samplers[0])
+                assert text == writer(*value, choices={}, rng=samplers[1])
+                assert text == tabled_writer(*value, choices={}, rng=samplers[2])
+            info = cached_writer.cache_info()
+            assert info is not None
+            assert info.hits + info.misses == len(values)
+            assert info.currsize <= cache_size
+            if cache_size == 1000:
+                assert info.hits > 0 and info.evictions == 0
+
+
+def test_table_takes_precedence_over_cache(attributes):
+    writer = make_writers(cache_size=64)["size"][0]
+    assert writer.table is not None
+    for sample in attributes:
+        writer(sample["size"])
+    assert writer.cache_info() == CacheInfo(0, 0, 0, 64, 0)
+
+
+def test_composer_with_cache(attributes):
+    writers = make_writers(max_table_size=None, cache_size=64)
+    composer = Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS, rng=3)
+    cached_composer = Composer(SCRIPT_STRUCTURES, writers, VARIANTS, rng=3)
+    for index, sample in enumerate(attributes):
+        assert composer(sample, index=index) == cached_composer(sample, index=index)
+    for possible_writers in writers.values():
+        for writer in possible_writers:
+            info = writer.cache_info()
+            assert info is not None and info.hits > 0
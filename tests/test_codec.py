@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from attributes_to_language.cli import load_composer
+from attributes_to_language.codec import UNSET_CHOICE, ChoicesCodec
+from attributes_to_language.composer import Composer
+from attributes_to_language.types import Choices
+
+EXAMPLE = Path(__file__).parents[1] / "examples" / "simple_shapes"
+
+
+def test_round_trip(seeded_composer: Composer, attributes):
+    captions, choices = seeded_composer.compose_batch(
+        attributes, indices=np.arange(len(attributes))
+    )
+    codec = seeded_composer.codec
+    matrix = codec.encode_batch(choices)
+    assert matrix.shape == (len(attributes), len(codec))
+    assert matrix.dtype == np.int16
+    assert codec.decode_batch(matrix) == choices
+    # the encoded choices give the same captions
+    assert seeded_composer.compose_batch(attributes, matrix)[0] == captions
+
+
+def test_partial_choices(seeded_composer: Composer, attributes):
+    codec = seeded_composer.codec
+    partial: Choices = {"structure": 1, "writers": {"color": {"val": 1}}}
+    row = codec.encode(partial)
+    assert row[codec.slots["structure"]] == 1
+    assert row[codec.slots["writers/color/val"]] == 1
+    assert (row == UNSET_CHOICE).sum() == len(codec) - 2
+    decoded = codec.decode(row)
+    # the second structure has no groups, so its permutation is known
+    assert decoded == {
+        "structure": 1,
+        "groups": [],
+        "writers": {"color": {"val": 1}},
+        "variants": {},
+    }
+    # the unset choices are drawn by the composer
+    _, choices = seeded_composer(attributes[0], decoded, index=0)
+    assert choices["structure"] == 1 and choices["writers"]["color"]["val"] == 1
+
+
+def test_keys(seeded_composer: Composer):
+    keys = seeded_composer.codec.keys
+    assert keys[0] == "structure"
+    assert "groups/1" in keys and "groups/2" not in keys
+    assert "writers/location/_writer" in keys
+    assert "writers/color/colored" in keys
+    assert keys[-1] == "variants/link"
+
+
+def test_invalid_choices(seeded_composer: Composer):
+    codec = ChoicesCodec(seeded_composer, dtype=np.int8)
+    with pytest.raises(ValueError):
+        codec.encode({"writers": {"unknown": {"val": 0}}})
+    with pytest.raises(ValueError):
+        codec.encode({"structure": 200})
+    with pytest.raises(ValueError):
+        codec.encode({"structure": -2})
+
+
+def test_ignored_writer_choices(seeded_composer: Composer):
+    # choices that no writer draws do not change the caption, and are not encoded
+    codec = seeded_composer.codec
+    row = codec.encode({"writers": {"color": {"val": 1, "unknown": 0}}})
+    assert codec.decode(row)["writers"] == {"color": {"val": 1}}
+
+
+def test_example_choices():
+    # the choices of examples/simple_shapes/main.py give a "val" choice to the
+    # shape writer, which draws a "name" instead
+    composer = load_composer(EXAMPLE / "config.py", 0)
+    choices: Choices = {
+        "structure": 0,
+        "groups": [0, 1],
+        "writers": {
+            "shape": {"_writer": 0, "val": 1},
+            "rotation": {"_writer": 2, "anti_clock": 0},
+            "color": {"_writer": 0},
+            "size": {"_writer": 0, "val": 0},
+            "location": {"_writer": 0, "val": 1, "located": 1, "prefix": 1},
+        },
+        "variants": {"start": 0, "colorBefore": 1, "located": 1},
+    }
+    attributes = {
+        "shape": 2,
+        "rotation": np.pi / 6,
+        "color": (129, 76, 200),
+        "size": 20,
+        "location": (29, 8),
+    }
+    caption, choices = composer(attributes, choices, index=0)
+    codec = composer.codec
+    decoded = codec.decode(codec.encode(choices))
+    assert "val" not in decoded["writers"]["shape"]
+    assert composer(attributes, decoded, index=1)[0] == caption
@@ -0,0 +1,119 @@
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from attributes_to_language.composer import Composer, num_column_rows, rows_as_columns
+from attributes_to_language.types import Choices
+
+from .conftest import random_columns
+
+
+def seed_global(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def test_batch_with_fixed_choices_matches_call(composer: Composer, attributes):
+    seed_global(0)
+    captions, choices = composer.compose_batch(attributes)
+    for sample, caption, sample_choices in zip(
+        attributes, captions, choices, strict=True
+    ):
+        assert composer(sample, copy.deepcopy(sample_choices)) == (
+            caption,
+            sample_choices,
+        )
+
+
+def test_call_choices_reproduce_batch(composer: Composer, attributes):
+    seed_global(1)
+    expected = [composer(sample) for sample in attributes]
+    captions, choices = composer.compose_batch(
+        attributes, [copy.deepcopy(sample_choices) for _, sample_choices in expected]
+    )
+    assert captions == [caption for caption, _ in expected]
+    assert choices == [sample_choices for _, sample_choices in expected]
+
+
+def test_batch_choices_are_complete(composer: Composer, attributes):
+    seed_global(2)
+    _, choices = composer.compose_batch(attributes)
+    for sample, sample_choices in zip(attributes, choices, strict=True):
+        assert set(sample_choices) == {"structure", "groups", "writers", "variants"}
+        assert set(sample_choices["writers"]) == set(sample)
+        assert all("_writer" in c for c in sample_choices["writers"].values())
+
+
+def test_partial_choices_are_kept(composer: Composer, attributes):
+    seed_global(3)
+    partial: list[Choices | None] = [Choices(structure=1) for _ in attributes]
+    captions, choices = composer.compose_batch(attributes, partial)
+    assert all(sample_choices["structure"] == 1 for sample_choices in choices)
+    assert all(" of " in caption for caption in captions)
+
+
+def test_empty_batch(composer: Composer):
+    assert composer.compose_batch([]) == ([], [])
+
+
+def column_rows(columns: dict[str, np.ndarray]) -> list[dict]:
+    """
+    One dict of attributes per row of the columns, as given to the composer.
+    """
+    return [
+        {
+            name: tuple(column[k].tolist()) if column.ndim > 1 else column[k].item()
+            for name, column in columns.items()
+        }
+        for k in range(num_column_rows(columns))
+    ]
+
+
+def test_columns_match_rows(seeded_composer: Composer):
+    columns = random_columns(np.random.default_rng(2), 150)
+    indices = np.arange(5, 155)
+    expected = seeded_composer.compose_batch(column_rows(columns), indices=indices)
+    assert seeded_composer.compose_batch(columns, indices=indices) == expected
+    structured = np.zeros(
+        150,
+        dtype=[
+            (name, column.dtype, column.shape[1:]) for name, column in columns.items()
+        ],
+    )
+    for name, column in columns.items():
+        structured[name] = column
+    assert seeded_composer.compose_batch(structured, indices=indices) == expected
+
+
+def test_num_column_rows():
+    assert num_column_rows({}) == 0
+    assert num_column_rows({"a": np.zeros(3), "b": np.zeros((3, 2))}) == 3
+    with pytest.raises(AssertionError):
+        num_column_rows({"a": np.zeros(3), "b": np.zeros(4)})
+
+
+def test_rows_as_columns(attributes):
+    columns = rows_as_columns(attributes)
+    assert columns is not None
+    assert num_column_rows(columns) == len(attributes)
+    assert columns["color"].shape == (len(attributes), 3)
+    assert rows_as_columns([]) is None
+    # values of different types or attributes are not converted
+    assert rows_as_columns([{"size": 1}, {"size": 1.5}]) is None
+    assert rows_as_columns([{"size": 1}, {"shape": 1}]) is None
+    assert rows_as_columns([{"color": (1, 2, 3)}, {"color": (1, 2)}]) is None
+
+
+def test_mixed_rows_match_calls(seeded_composer: Composer, attributes):
+    # a float size among int sizes, so that the rows are not converted to columns
+    rows = [dict(sample) for sample in attributes[:50]]
+    rows[3]["size"] = 10.5
+    assert rows_as_columns(rows) is None
+    captions, choices = seeded_composer.compose_batch(rows, indices=range(50))
+    for k, sample in enumerate(rows):
+        assert seeded_composer(sample, copy.deepcopy(choices[k])) == (
+            captions[k],
+            choices[k],
+        )
@@ -0,0 +1,190 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from attributes_to_language.cli import import_config, main, resolve_seed
+from attributes_to_language.dataset import (
+    BinaryWriter,
+    JsonlWriter,
+    generate_file,
+    read_binary,
+    read_columns,
+)
+
+from .conftest import make_seeded_composer, random_columns
+
+CONFIG = """
+from tests.conftest import SCRIPT_STRUCTURES as script_structures
+from tests.conftest import VARIANTS as variants
+from tests.conftest import make_writers
+
+writers = make_writers()
+"""
+
+METADATA = {"seed": 7, "num_samples": 95}
+
+
+class InterruptedWriter(BinaryWriter):
+    """
+    Binary output interrupted after some chunks.
+    """
+
+    def __init__(self, *args, num_chunks: int, **kwargs):
+        self.num_chunks = num_chunks
+        super().__init__(*args, **kwargs)
+
+    def add_chunk(self, start, batch):
+        if self.num_chunks == 0:
+            raise KeyboardInterrupt
+        self.num_chunks -= 1
+        super().add_chunk(start, batch)
+
+
+@pytest.fixture
+def columns():
+    return random_columns(np.random.default_rng(0), 95)
+
+
+def generate_binary(path, columns, resume=False, metadata=METADATA, **kwargs):
+    codec = make_seeded_composer().codec
+    with BinaryWriter(path, codec, resume, metadata) as writer:
+        generate_file(
+            make_seeded_composer,
+            columns,
+            writer,
+            num_workers=0,
+            progress=False,
+            **kwargs,
+        )
+    return read_binary(path)[0]
+
+
+def test_generate_binary(tmp_path, columns):
+    batch = generate_binary(tmp_path / "out", columns, chunk_size=20)
+    expected = make_seeded_composer().compose_caption_batch(
+        columns, indices=np.arange(95)
+    )
+    assert batch.captions() == expected.captions()
+    np.testing.assert_array_equal(batch.choices, expected.choices)
+
+
+def test_resume(tmp_path, columns):
+    path = tmp_path / "out"
+    codec = make_seeded_composer().codec
+    with (
+        pytest.raises(KeyboardInterrupt),
+        InterruptedWriter(path, codec, False, METADATA, num_chunks=2) as writer,
+    ):
+        generate_file(
+            make_seeded_composer,
+            columns,
+            writer,
+            num_workers=0,
+            chunk_size=20,
+            progress=False,
+        )
+    first_chunks = {name: column[:40] for name, column in columns.items()}
+    expected = make_seeded_composer().compose_caption_batch(
+        first_chunks, indices=np.arange(40)
+    )
+    assert read_binary(path)[0].captions() == expected.captions()
+    # bytes of an unfinished chunk are dropped when resuming
+    with open(path / "captions.bin", "ab") as f:
+        f.write(b"unfinished")
+    batch = generate_binary(path, columns, resume=True, chunk_size=30)
+    expected = generate_binary(tmp_path / "expected", columns, chunk_size=95)
+    assert batch.captions() == expected.captions()
+    np.testing.assert_array_equal(batch.choices, expected.choices)
+
+
+def test_resume_with_other_metadata(tmp_path, columns):
+    path = tmp_path / "out.jsonl"
+    codec = make_seeded_composer().codec
+    JsonlWriter(path, codec, False, METADATA).close()
+    with pytest.raises(ValueError):
+        JsonlWriter(path, codec, True, {**METADATA, "seed": 8})
+    JsonlWriter(path, codec, True, METADATA).close()
+
+
+def test_read_columns(tmp_path, columns):
+    np.savez(tmp_path / "columns.npz", **columns)
+    np.save(tmp_path / "extra.npy", np.arange(95))
+    loaded = read_columns([tmp_path / "columns.npz", tmp_path / "extra.npy"])
+    assert list(loaded) == [*columns, "extra"]
+    for name, column in columns.items():
+        np.testing.assert_array_equal(loaded[name], column)
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config.py"
+    path.write_text(CONFIG)
+    return path
+
+
+def test_resolve_seed():
+    assert resolve_seed(make_seeded_composer(None), 3) == 3
+    assert resolve_seed(make_seeded_composer(None), None) == 0
+    assert resolve_seed(make_seeded_composer(11), None) == 11
+    assert resolve_seed(make_seeded_composer(11), 3) == 3
+
+
+def test_import_config_namespaces(tmp_path):
+    modules = []
+    for k in range(2):
+        directory = tmp_path / f"config{k}"
+        directory.mkdir()
+        (directory / "writers.py").write_text(f"writers = {k}\n")
+        (directory / "config.py").write_text("from writers import writers\n")
+        module = import_config(directory)
+        assert module.__name__.startswith("attributes_to_language._config_")
+        modules.append(module)
+    # each folder imports its own neighbours, which are not global modules
+    assert [module.writers for module in modules] == [0, 1]
+    assert "writers" not in sys.modules and "config" not in sys.modules
+    assert import_config(tmp_path / "config0" / "config.py") is modules[0]
+
+
+def test_cli_generate_uses_artifact_seed(tmp_path, columns):
+    np.savez(tmp_path / "columns.npz", **columns)
+    artifact = tmp_path / "composer.a2l"
+    make_seeded_composer(11).save(artifact)
+    output = tmp_path / "out.jsonl"
+    argv = ["generate", str(artifact), str(tmp_path / "columns.npz")]
+    assert main([*argv, "-o", str(output), "--workers", "0", "--quiet"]) == 0
+    with open(output) as f:
+        captions = [json.loads(line)["caption"] for line in f]
+    assert captions == [
+        make_seeded_composer(11)(
+            {name: _value(column[k]) for name, column in columns.items()}, index=k
+        )[0]
+        for k in range(95)
+    ]
+    with open(tmp_path / "out.jsonl.progress.json") as f:
+        assert json.load(f)["metadata"] == {"seed": 11, "num_samples": 95}
+    # resuming with the default seed resolves the same seed
+    resume_argv = [*argv, "-o", str(output), "--workers", "0", "--quiet", "--resume"]
+    assert main(resume_argv) == 0
+    # another seed does not match the output
+    with pytest.raises(ValueError):
+        main([*resume_argv, "--seed", "0"])
+
+
+def test_cli_generate_default_seed(tmp_path, config, columns):
+    np.savez(tmp_path / "columns.npz", **columns)
+    output = tmp_path / "out"
+    argv = ["generate", str(config), str(tmp_path / "columns.npz"), "-o", str(output)]
+    assert main([*argv, "--workers", "0", "--quiet", "--chunk-size", "40"]) == 0
+    batch = read_binary(output)[0]
+    expected = make_seeded_composer(0).compose_caption_batch(
+        columns, indices=np.arange(95)
+    )
+    assert batch.captions() == expected.captions()
+    with open(output / "progress.json") as f:
+        assert json.load(f)["metadata"]["seed"] == 0
+
+
+def _value(value: np.ndarray):
+    return tuple(value.tolist()) if value.ndim else value.item()
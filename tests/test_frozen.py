@@ -0,0 +1,41 @@
+import copy
+
+import numpy as np
+import pytest
+
+from attributes_to_language.writers import Writer
+
+from .conftest import make_writers, random_columns
+
+
+def test_frozen_matches_composer(composer, attributes):
+    for _ in range(30):
+        _, choices = composer(attributes[0])
+        frozen = composer.freeze(choices)
+        expected = [
+            composer(sample, copy.deepcopy(choices))[0] for sample in attributes
+        ]
+        assert [frozen(sample) for sample in attributes] == expected
+        assert frozen.batch(attributes) == expected
+
+
+def test_frozen_incomplete_choices(composer, attributes):
+    _, choices = composer(attributes[0])
+    del choices["variants"]["start"]
+    with pytest.raises(ValueError):
+        composer.freeze(choices)
+    _, choices = composer(attributes[0])
+    frozen = composer.freeze(choices)
+    with pytest.raises(ValueError):
+        frozen({"shape": 0})
+
+
+def test_quantize_fallback_matches_writers():
+    columns = random_columns(np.random.default_rng(0), 200)
+    for name, writers in make_writers().items():
+        for writer in writers:
+            values = columns[name]
+            assert (
+                Writer.quantize(writer, values).tolist()
+                == writer.quantize(values).tolist()
+            )
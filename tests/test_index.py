@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from attributes_to_language.index import VoxelGridIndex
+from attributes_to_language.utils import COLORS_XKCD, get_closest_key
+from attributes_to_language.writers import QuantizedWriter
+
+
+def closest_keys(values: np.ndarray, points: np.ndarray, norm) -> list[int]:
+    return [int(get_closest_key(values, point.tolist(), norm)) for point in points]
+
+
+@pytest.mark.parametrize("norm", ["1", "2"])
+def test_index_matches_brute_force_on_palette(norm):
+    rng = np.random.default_rng(0)
+    values = COLORS_XKCD["rgb"]
+    index = VoxelGridIndex(values, norm, bounds=((0, 0, 0), (255, 255, 255)))
+    colors = rng.integers(0, 256, size=(2000, 3))
+    expected = closest_keys(values, colors, norm)
+    assert index.query_batch(colors).tolist() == expected
+    assert [index.query(color.tolist()) for color in colors[:200]] == expected[:200]
+
+
+@pytest.mark.parametrize("norm", ["1", "2"])
+def test_index_outside_of_the_grid(norm):
+    rng = np.random.default_rng(1)
+    values = rng.uniform(0, 10, size=(2, 50))
+    index = VoxelGridIndex(values, norm)
+    points = rng.uniform(-20, 30, size=(500, 2))
+    assert index.query_batch(points).tolist() == closest_keys(values, points, norm)
+
+
+def test_index_ties_pick_lowest_index():
+    # duplicated values and points at the same distance of several values
+    values = np.array([[0, 4, 4, 8], [0, 0, 0, 0]])
+    index = VoxelGridIndex(values, resolution=8)
+    points = np.array([[2, 0], [4, 0], [6, 0], [4, 3]])
+    assert index.query_batch(points).tolist() == closest_keys(values, points, "2")
+
+
+def test_index_scalar_values():
+    values = np.array([0.0, 0.5, 2.0, 7.0])
+    index = VoxelGridIndex(values)
+    points = np.linspace(-2, 9, 200)
+    expected = [int(get_closest_key(values, [point])) for point in points]
+    assert index.query_batch(points).tolist() == expected
+
+
+def test_writer_with_index_matches_writer_without():
+    rng = np.random.default_rng(2)
+    colors = rng.integers(0, 256, size=(500, 3))
+    kwargs = dict(quantized_values=COLORS_XKCD["rgb"], labels=COLORS_XKCD["labels"])
+    plain = QuantizedWriter(**kwargs)
+    indexed = QuantizedWriter(
+        **kwargs, use_index=True, index_bounds=((0, 0, 0), (255, 255, 255))
+    )
+    assert indexed.quantize(colors).tolist() == plain.quantize(colors).tolist()
+    assert [indexed.get_label_index(*color.tolist()) for color in colors[:50]] == [
+        plain.get_label_index(*color.tolist()) for color in colors[:50]
+    ]
+
+
+def test_index_batch_entirely_outside_of_the_grid():
+    values = np.array([[10, 16, 22], [10, 10, 10]])
+    writer = QuantizedWriter(values, labels=["a", "b", "c"], use_index=True)
+    points = np.array([[0.0, 0.0], [30.0, 30.0]])
+    assert writer.quantize(points).tolist() == closest_keys(values, points, "2")
+    assert writer.batch(points).texts == ["a", "c"]
+
+
+def test_index_empty_batch():
+    writer = QuantizedWriter(
+        np.array([[10, 16, 22], [10, 10, 10]]), labels=["a", "b", "c"], use_index=True
+    )
+    assert writer.quantize(np.zeros((0, 2))).tolist() == []
+    assert writer.batch(np.zeros((0, 2))).texts == []
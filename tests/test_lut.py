@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from attributes_to_language.lut import build_rgb_lut, load_rgb_lut
+from attributes_to_language.utils import (
+    COLORS_SPARSE,
+    get_closest_key,
+    get_closest_keys,
+)
+from attributes_to_language.writers import QuantizedWriter
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    """
+    Cache of the lookup tables shared by the tests, so that the full table is only
+    built once.
+    """
+    return tmp_path_factory.mktemp("luts")
+
+
+def test_full_lut_is_exact(cache_dir):
+    rng = np.random.default_rng(0)
+    values = COLORS_SPARSE["rgb"]
+    lut = load_rgb_lut(values, "2", bits=8, cache_dir=cache_dir)
+    assert lut.shape == (256, 256, 256)
+    colors = np.concatenate(
+        [
+            rng.integers(0, 256, size=(5000, 3)),
+            np.array([[r, g, b] for r in (0, 255) for g in (0, 255) for b in (0, 255)]),
+        ]
+    )
+    expected = [int(get_closest_key(values, color.tolist())) for color in colors]
+    assert lut[colors[:, 0], colors[:, 1], colors[:, 2]].tolist() == expected
+
+
+@pytest.mark.parametrize("norm", ["1", "2"])
+def test_reduced_lut_uses_level_centers(norm):
+    values = COLORS_SPARSE["rgb"]
+    bits = 4
+    lut = build_rgb_lut(values, norm, bits=bits)
+    step = 2 ** (8 - bits)
+    levels = np.arange(2**bits) * step + (step - 1) / 2
+    centers = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+    expected = get_closest_keys(values, centers.reshape(-1, 3), norm)
+    assert lut.reshape(-1).tolist() == expected.tolist()
+
+
+def test_lut_is_cached(tmp_path):
+    values = COLORS_SPARSE["rgb"]
+    lut = load_rgb_lut(values, "2", bits=5, cache_dir=tmp_path)
+    files = list(tmp_path.glob("rgb_lut_*.npy"))
+    assert len(files) == 1
+    assert isinstance(lut, np.memmap)
+    # the second load maps the cached file
+    mtime = files[0].stat().st_mtime_ns
+    again = load_rgb_lut(values, "2", bits=5, cache_dir=tmp_path)
+    assert files[0].stat().st_mtime_ns == mtime
+    assert np.array_equal(lut, again)
+    # another palette gets another table
+    load_rgb_lut(values[:, :-1], "2", bits=5, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("rgb_lut_*.npy"))) == 2
+
+
+def test_writer_with_lut_matches_writer_without(cache_dir):
+    rng = np.random.default_rng(1)
+    colors = rng.integers(0, 256, size=(1000, 3))
+    kwargs = dict(quantized_values=COLORS_SPARSE["rgb"], labels=COLORS_SPARSE["labels"])
+    plain = QuantizedWriter(**kwargs)
+    with_lut = QuantizedWriter(**kwargs, lut_bits=8, lut_cache_dir=cache_dir)
+    assert with_lut.quantize(colors).tolist() == plain.quantize(colors).tolist()
+    assert [with_lut.get_label_index(*color.tolist()) for color in colors[:50]] == [
+        plain.get_label_index(*color.tolist()) for color in colors[:50]
+    ]
+    # float colors are not looked up in the table
+    floats = colors[:50] + 0.4
+    assert with_lut.quantize(floats).tolist() == plain.quantize(floats).tolist()
@@ -0,0 +1,83 @@
+import functools
+
+import numpy as np
+import pytest
+
+from attributes_to_language.parallel import generate, generate_shards, iter_shards
+
+from .conftest import make_seeded_composer, random_columns
+
+
+class TrackedColumn(np.ndarray):
+    """
+    Column recording the start of the slices taken by iter_shards.
+    """
+
+    starts: list[int] = []
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            TrackedColumn.starts.append(item.start)
+        return super().__getitem__(item)
+
+
+@pytest.fixture
+def columns() -> dict[str, np.ndarray]:
+    return random_columns(np.random.default_rng(0), 500)
+
+
+def test_iter_shards(columns):
+    shards = list(iter_shards(columns, 200, start_index=10))
+    assert [start for start, _ in shards] == [10, 210, 410]
+    assert [len(shard["shape"]) for _, shard in shards] == [200, 200, 100]
+
+
+def test_generate_matches_indexed_batch(columns):
+    composer = make_seeded_composer()
+    captions, choices = generate(make_seeded_composer, columns, num_workers=0)
+    expected = composer.compose_batch(columns, indices=np.arange(500))
+    assert captions == expected[0]
+    assert np.array_equal(choices, composer.codec.encode_batch(expected[1]))
+
+
+@pytest.mark.parametrize(
+    ("num_workers", "shard_size"), [(0, 500), (1, 64), (2, 100), (2, 333)]
+)
+def test_generate_does_not_depend_on_workers(columns, num_workers, shard_size):
+    expected = generate(make_seeded_composer, columns, num_workers=0, shard_size=37)
+    captions, choices = generate(
+        make_seeded_composer, columns, num_workers=num_workers, shard_size=shard_size
+    )
+    assert captions == expected[0]
+    assert np.array_equal(choices, expected[1])
+
+
+def test_generate_start_index(columns):
+    first = generate(make_seeded_composer, columns, num_workers=0)
+    shifted = generate(
+        make_seeded_composer,
+        {name: column[100:] for name, column in columns.items()},
+        num_workers=0,
+        start_index=100,
+    )
+    assert shifted[0] == first[0][100:]
+
+
+def test_generate_needs_a_seed(columns):
+    factory = functools.partial(make_seeded_composer, None)
+    with pytest.raises(ValueError):
+        generate(factory, columns, num_workers=0)
+
+
+def test_generate_shards_bounds_the_pending_shards(columns):
+    tracked = {name: column.view(TrackedColumn) for name, column in columns.items()}
+    TrackedColumn.starts = []
+    shards = generate_shards(
+        make_seeded_composer, tracked, num_workers=1, shard_size=10, max_pending=2
+    )
+    start, batch = next(shards)
+    assert start == 0 and len(batch) == 10
+    # two shards were submitted, and a third one was read before the first was
+    # yielded
+    assert set(TrackedColumn.starts) == {0, 10, 20}
+    shards.close()
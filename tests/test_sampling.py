@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from attributes_to_language.composer import Composer
+from attributes_to_language.sampling import CounterSampler
+
+from .conftest import SCRIPT_STRUCTURES, VARIANTS, make_writers
+
+
+def test_counter_sampler_batch_matches_single_draws():
+    indices = np.array([0, 5, 3, 1000, 2**40])
+    batch = CounterSampler(3, indices).child("writers/")
+    draws = batch.integers("val", 7, len(indices)).tolist()
+    assert draws == [
+        CounterSampler(3, int(index)).child("writers/").randint("val", 7)
+        for index in indices
+    ]
+    assert batch.subset([1, 3]).integers("val", 7, 2).tolist() == [draws[1], draws[3]]
+    assert batch.row(2).randint("val", 7) == draws[2]
+
+
+def test_counter_sampler_keys_and_seeds_are_independent():
+    indices = np.arange(1000)
+    sampler = CounterSampler(3, indices)
+    first = sampler.integers("a", 1000, len(indices))
+    assert not np.array_equal(first, sampler.integers("b", 1000, len(indices)))
+    other_seed = CounterSampler(4, indices).integers("a", 1000, len(indices))
+    assert not np.array_equal(first, other_seed)
+    # roughly uniform
+    assert abs(first.mean() - 500) < 50
+
+
+def test_counter_sampler_permutations():
+    indices = np.arange(50)
+    permutations = CounterSampler(0, indices).permutations("groups", 4, 50)
+    assert all(sorted(p) == [0, 1, 2, 3] for p in permutations.tolist())
+    assert permutations.tolist()[7] == CounterSampler(0, 7).permutation("groups", 4)
+
+
+def test_indexed_batch_matches_indexed_calls(seeded_composer: Composer, attributes):
+    indices = np.arange(100, 100 + len(attributes))
+    captions, choices = seeded_composer.compose_batch(attributes, indices=indices)
+    for k in range(0, len(attributes), 7):
+        assert seeded_composer(attributes[k], index=int(indices[k])) == (
+            captions[k],
+            choices[k],
+        )
+
+
+def test_indexed_batch_does_not_depend_on_the_batches(
+    seeded_composer: Composer, attributes
+):
+    indices = np.arange(len(attributes))
+    expected = seeded_composer.compose_batch(attributes, indices=indices)
+    order = np.random.default_rng(0).permutation(len(attributes))
+    for part in np.array_split(order, 3):
+        captions, choices = seeded_composer.compose_batch(
+            [attributes[k] for k in part], indices=indices[part]
+        )
+        assert captions == [expected[0][k] for k in part]
+        assert choices == [expected[1][k] for k in part]
+
+
+def test_same_seed_same_captions(attributes):
+    def compose(seed):
+        composer = Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS, rng=seed)
+        return [composer(sample)[0] for sample in attributes]
+
+    assert compose(1) == compose(1)
+    assert compose(1) != compose(2)
+
+
+def test_generator_rng(attributes):
+    def compose():
+        rng = np.random.default_rng(0)
+        composer = Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS, rng=rng)
+        return composer.compose_batch(attributes)
+
+    assert compose() == compose()
+
+
+def test_index_needs_a_seed(composer: Composer, attributes):
+    with pytest.raises(ValueError):
+        composer(attributes[0], index=0)
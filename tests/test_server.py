@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from attributes_to_language import parallel
+from attributes_to_language.composer import Composer
+from attributes_to_language.server import (
+    CaptionClient,
+    CaptionServer,
+    decode_message,
+    encode_message,
+)
+
+from .conftest import (
+    SCRIPT_STRUCTURES,
+    VARIANTS,
+    make_seeded_composer,
+    make_writers,
+    random_columns,
+)
+
+
+def make_composer() -> Composer:
+    return Composer(SCRIPT_STRUCTURES, make_writers(), VARIANTS)
+
+
+@pytest.fixture
+def run_server(tmp_path):
+    """
+    Start a server in a thread, and return the path of its socket.
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    tasks = []
+
+    def start(caption_server: CaptionServer):
+        path = tmp_path / "server.sock"
+
+        def run():
+            task = loop.create_task(
+                caption_server.serve(path, ready=lambda _: ready.set())
+            )
+            tasks.append(task)
+            loop.run_until_complete(asyncio.wait([task]))
+
+        threading.Thread(target=run, daemon=True).start()
+        assert ready.wait(30)
+        return path
+
+    yield start
+    for task in tasks:
+        loop.call_soon_threadsafe(task.cancel)
+
+
+def test_message_round_trip():
+    arrays: dict[str, np.ndarray] = {
+        "a": np.arange(6).reshape(2, 3),
+        "b": np.array([1.5], dtype=np.float32),
+    }
+    header, decoded = decode_message(encode_message({"type": "x"}, arrays))
+    assert header == {"type": "x"}
+    for name, array in arrays.items():
+        np.testing.assert_array_equal(decoded[name], array)
+        assert decoded[name].dtype == array.dtype
+
+
+def test_seeded_requests(run_server):
+    path = run_server(CaptionServer(make_seeded_composer, num_workers=0))
+    columns = random_columns(np.random.default_rng(0), 50)
+    expected = make_seeded_composer().compose_caption_batch(
+        columns, indices=np.arange(10, 60)
+    )
+    with CaptionClient(path) as client:
+        captions, choices = client.compose(columns, seed=7, start_index=10)
+        assert captions == expected.captions()
+        np.testing.assert_array_equal(choices, expected.choices)
+        with pytest.raises(RuntimeError):
+            client.compose({"shape": np.array([10])})
+        assert client.stats()["errors"] == 1
+
+
+def _worker_draws() -> tuple[list[list[float]], int]:
+    """
+    Draws of np.random after initializing workers, run in a child process since
+    the initializer reseeds the global random states.
+    """
+    counter = multiprocessing.Value("q", 0)
+    draws = []
+    for _ in range(2):
+        parallel._init_worker(make_composer, 1234, counter)
+        assert parallel._worker_composer is not None
+        draws.append(np.random.random(4).tolist())
+    # the same entropy and worker number give the same stream
+    parallel._init_worker(make_composer, 1234, multiprocessing.Value("q", 0))
+    draws.append(np.random.random(4).tolist())
+    return draws, counter.value
+
+
+def test_workers_have_their_own_stream():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        draws, num_workers = executor.submit(_worker_draws).result()
+    assert draws[0] != draws[1]
+    assert draws[2] == draws[0]
+    assert num_workers == 2
+
+
+def test_concurrent_unseeded_requests_differ(run_server):
+    # every worker builds its composer with the same seed, and the requests without
+    # a seed draw from the generator of the composer
+    path = run_server(CaptionServer(make_seeded_composer, num_workers=2))
+    columns = random_columns(np.random.default_rng(0), 1)
+    # large requests, so that both workers compose some of them
+    columns = {
+        name: np.repeat(column, 2000, axis=0) for name, column in columns.items()
+    }
+
+    def request(_) -> bytes:
+        with CaptionClient(path) as client:
+            return client.compose(columns)[1].tobytes()
+
+    with ThreadPoolExecutor(8) as executor:
+        choices = list(executor.map(request, range(8)))
+    assert len(set(choices)) == len(choices)
@@ -0,0 +1,113 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from attributes_to_language.composer import Composer
+from attributes_to_language.space import (
+    index_to_permutation,
+    permutation_to_index,
+    randbelow,
+)
+from attributes_to_language.writers import OptionsWriter
+
+
+@pytest.fixture
+def space(composer, attributes):
+    return composer.choice_space(attributes[0])
+
+
+def test_permutation_index_round_trip():
+    for n in range(5):
+        permutations = list(itertools.permutations(range(n)))
+        assert len(permutations) == math.factorial(n)
+        for index, permutation in enumerate(permutations):
+            assert permutation_to_index(permutation) == index
+            assert index_to_permutation(index, n) == list(permutation)
+
+
+def test_index_choices_bijection(space):
+    rng = np.random.default_rng(0)
+    indices = [0, space.size - 1] + [randbelow(rng, space.size) for _ in range(300)]
+    for index in indices:
+        assert space.index(space.choices(index)) == index
+
+
+def test_distinct_choices(space):
+    struct_size = space.structure_sizes[2]
+    start = sum(space.structure_sizes[:2])
+    all_choices = [space.choices(start + k) for k in range(min(struct_size, 2000))]
+    keys = {repr(choices) for choices in all_choices}
+    assert len(keys) == len(all_choices)
+
+
+def test_choices_are_complete(composer, attributes, space):
+    for index in range(0, space.size, max(space.size // 50, 1)):
+        choices = space.choices(index)
+        _, used_choices = composer(attributes[0], choices)
+        assert space.index(used_choices) == index
+
+
+def test_out_of_range(space):
+    with pytest.raises(IndexError):
+        space.choices(space.size)
+    with pytest.raises(IndexError):
+        space.choices(-1)
+
+
+def test_invalid_choices(space):
+    choices = space.choices(0)
+    choices["structure"] = len(space.structure_sizes)
+    with pytest.raises(ValueError):
+        space.index(choices)
+    choices = space.choices(0)
+    del choices["writers"]["shape"]
+    with pytest.raises(ValueError):
+        space.index(choices)
+
+
+def test_sample_seed(space):
+    assert space.sample(3) == space.sample(3)
+    assert space.sample(np.random.default_rng(3)) == space.sample(3)
+    rng = np.random.default_rng(0)
+    samples = [space.index(space.sample(rng)) for _ in range(20)]
+    assert len(set(samples)) > 1
+    assert all(0 <= index < space.size for index in samples)
+
+
+def test_randbelow_large():
+    rng = np.random.default_rng(0)
+    n = 3 * 2**100 + 1
+    values = [randbelow(rng, n) for _ in range(200)]
+    assert all(0 <= value < n for value in values)
+    # the draws cover the range, not only its low bits
+    assert max(values) > 2**100
+    assert randbelow(np.random.default_rng(1), n) == randbelow(
+        np.random.default_rng(1), n
+    )
+
+
+def test_iter_captions(composer, attributes):
+    space = composer.choice_space(attributes[0])
+    captions = list(itertools.islice(space.iter_captions(), 500))
+    texts = [caption for caption, _ in captions]
+    assert len(set(texts)) == len(texts)
+    for caption, choices in captions[::10]:
+        assert composer(attributes[0], choices)[0] == caption
+
+
+def test_iter_captions_max_unique():
+    composer = Composer(
+        ["{start} {shape}."],
+        {"shape": [OptionsWriter(choices={0: ["square", "box"]})]},
+        {"start": ["A", "The", "A"]},
+    )
+    space = composer.choice_space({"shape": 0})
+    unique = sorted(caption for caption, _ in space.iter_captions())
+    assert unique == ["A box.", "A square.", "The box.", "The square."]
+    bounded = [caption for caption, _ in space.iter_captions(max_unique=1)]
+    assert sorted(set(bounded)) == unique
+    every = [caption for caption, _ in space.iter_captions(unique=False)]
+    assert len(every) >= len(bounded) >= len(unique)
+    assert sorted(set(every)) == unique
@@ -0,0 +1,49 @@
+import time
+
+from attributes_to_language.stats import ComposerStats, StageStats
+
+from .conftest import make_seeded_composer
+
+
+def test_record_accumulates():
+    stats = ComposerStats()
+    start = time.perf_counter_ns()
+    now = stats.record("a", start)
+    assert now >= start
+    stats.record("a", now)
+    stats.record("b", now)
+    snapshot = stats.snapshot()
+    assert snapshot["a"].calls == 2 and snapshot["b"].calls == 1
+    assert snapshot["a"].total >= 0
+    assert StageStats(0, 0.0).mean == 0.0
+    assert "a" in str(stats)
+    stats.reset()
+    assert stats.snapshot() == {}
+
+
+def test_composer_stats(attributes):
+    composer = make_seeded_composer()
+    reference = make_seeded_composer()
+    stats = composer.enable_stats()
+    assert composer.enable_stats() is stats
+    for index, sample in enumerate(attributes):
+        # collecting stats does not change the captions
+        assert composer(sample, index=index) == reference(sample, index=index)
+    snapshot = stats.snapshot()
+    for stage in ["structure", "modifiers", "groups", "variants", "cleanup", "total"]:
+        assert snapshot[stage].calls == len(attributes)
+    writer_calls = sum(
+        stage_stats.calls
+        for stage, stage_stats in snapshot.items()
+        if stage.startswith("writers/shape/")
+    )
+    assert writer_calls == len(attributes)
+
+    composer.compose_batch(attributes, indices=range(len(attributes)))
+    assert stats.snapshot()["structure"].calls > len(attributes)
+
+    snapshot = stats.snapshot()
+    composer.disable_stats()
+    assert composer.stats is None
+    composer(attributes[0], index=0)
+    assert stats.snapshot() == snapshot
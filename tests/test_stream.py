@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+import pytest
+
+from attributes_to_language.stream import load_columns, stream
+
+from .conftest import make_seeded_composer, random_columns
+
+
+@pytest.fixture
+def columns() -> dict[str, np.ndarray]:
+    return random_columns(np.random.default_rng(0), 300)
+
+
+def expected_output(columns, start_index: int = 0):
+    captions, choices = make_seeded_composer().compose_batch(
+        columns, indices=np.arange(start_index, start_index + len(columns["shape"]))
+    )
+    return list(zip(captions, choices, strict=True))
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_stream_matches_batch(columns, prefetch):
+    output = list(
+        stream(make_seeded_composer(), columns, chunk_size=64, prefetch=prefetch)
+    )
+    assert output == expected_output(columns)
+
+
+def test_stream_of_chunks(columns):
+    chunks = [
+        {name: column[start : start + 70] for name, column in columns.items()}
+        for start in range(0, 300, 70)
+    ]
+    output = list(stream(make_seeded_composer(), iter(chunks), chunk_size=32))
+    assert output == expected_output(columns)
+
+
+def test_stream_start_index(columns):
+    output = list(stream(make_seeded_composer(), columns, start_index=50))
+    assert output == expected_output(columns, start_index=50)
+
+
+def test_stream_of_memory_mapped_columns(columns, tmp_path):
+    for name, column in columns.items():
+        np.save(tmp_path / f"{name}.npy", column)
+    mapped = load_columns({name: tmp_path / f"{name}.npy" for name in columns})
+    assert all(isinstance(column, np.memmap) for column in mapped.values())
+    output = list(stream(make_seeded_composer(), mapped, chunk_size=100))
+    assert output == expected_output(columns)
+
+
+def test_stream_errors_are_raised(columns):
+    columns = dict(columns, shape=np.full(300, 5))
+    with pytest.raises(AssertionError):
+        list(stream(make_seeded_composer(), columns))
+
+
+def test_stream_stops_when_closed(columns):
+    threads = threading.active_count()
+    output = stream(make_seeded_composer(), columns, chunk_size=10, prefetch=1)
+    next(output)
+    output.close()
+    assert threading.active_count() == threads
@@ -0,0 +1,53 @@
+import copy
+import random
+
+import numpy as np
+
+from attributes_to_language.composer import (
+    Composer,
+    parse_tokens,
+    remove_extra_spaces,
+)
+from attributes_to_language.template import as_template, compile_template
+
+
+def format_variants(composer: Composer, attributes, caption: str, choices) -> str:
+    """
+    Substitution of the tokens with str.format until none is left, as before the
+    templates were compiled.
+    """
+    tokens = parse_tokens(caption)
+    if not len(tokens):
+        return caption
+    updates = {
+        token: attributes[token]
+        if token in attributes
+        else composer.variants[token][choices[token]]
+        for token in tokens
+    }
+    return format_variants(composer, attributes, caption.format(**updates), choices)
+
+
+def test_compile_template():
+    assert compile_template("{start} big  {shape} .") == (
+        "",
+        "start",
+        " big ",
+        "shape",
+        ".",
+    )
+    assert compile_template("no token") == ("no token",)
+    assert as_template("red") == ("red",)
+    assert as_template("{color} colored") == ("", "color", " colored")
+
+
+def test_compiled_captions_match_format(composer: Composer, attributes):
+    random.seed(0)
+    np.random.seed(0)
+    for sample in attributes:
+        caption, choices = composer(sample)
+        choices = copy.deepcopy(choices)
+        structure = composer.get_structure(choices["structure"], choices["groups"])
+        texts = composer.get_attributes(sample, choices)
+        expected = format_variants(composer, texts, structure, choices["variants"])
+        assert caption == remove_extra_spaces(expected).replace(" .", ".")
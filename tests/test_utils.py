@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from attributes_to_language import utils
+
+
+@pytest.mark.parametrize("name", ["COLORS_LARGE_SET", "COLORS_SPARSE", "COLORS_XKCD"])
+def test_palettes(name):
+    palette = getattr(utils, name)
+    assert getattr(utils, name) is palette
+    assert name in dir(utils)
+    rgb = palette["rgb"]
+    assert rgb.dtype == np.int64
+    assert rgb.shape == (3, len(palette["labels"]))
+    assert rgb.min() >= 0 and rgb.max() <= 255
+    assert all(isinstance(label, str) for label in palette["labels"])
+
+
+def test_palette_values():
+    large_set = utils.COLORS_LARGE_SET
+    assert large_set["labels"][0] == "alice blue"
+    assert large_set["rgb"][:, 0].tolist() == [240, 248, 255]
+    assert utils.COLORS_XKCD["labels"][:2] == ["acid green", "adobe"]
+    assert utils.COLORS_XKCD["rgb"][:, 1].tolist() == [189, 108, 72]
+    # the sparse palette is a subset of the large set
+    sparse = utils.COLORS_SPARSE
+    for label, rgb in zip(sparse["labels"], sparse["rgb"].T, strict=True):
+        index = large_set["labels"].index(label)
+        assert large_set["rgb"][:, index].tolist() == rgb.tolist()
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        utils.COLORS_UNKNOWN  # noqa: B018
+
+
+def test_palettes_are_loaded_lazily():
+    code = (
+        "import attributes_to_language.utils as utils\n"
+        "assert 'COLORS_XKCD' not in vars(utils)\n"
+        "utils.COLORS_XKCD\n"
+        "assert 'COLORS_XKCD' in vars(utils)\n"
+        "assert 'COLORS_SPARSE' not in vars(utils)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
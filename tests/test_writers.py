@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from attributes_to_language.types import ChoicesT
+from attributes_to_language.utils import digitize, get_closest_key, get_closest_keys
+from attributes_to_language.writers import (
+    UNSET,
+    ContinuousAngleWriter,
+    QuantizedWriter,
+    Writer,
+)
+
+from .conftest import COLOR_LABELS, COLORS, make_writers
+
+
+def call_writer(writer: Writer, value, choices: dict[str, int]) -> tuple[str, ChoicesT]:
+    if not isinstance(value, list | tuple):
+        value = (value,)
+    return writer(*value, choices=dict(choices))
+
+
+def check_batch_matches_calls(writer: Writer, values: list):
+    """
+    The batch of a writer, with its drawn choices given back to the writer, gives
+    the same texts as calling the writer on each value.
+    """
+    result = writer.batch(np.asarray(values))
+    assert len(result.texts) == len(values)
+    for row, (value, text) in enumerate(zip(values, result.texts, strict=True)):
+        choices = {k: int(v[row]) for k, v in result.choices.items() if v[row] != UNSET}
+        assert call_writer(writer, value, choices)[0] == text
+    # the same choices given to the batch give the same texts
+    assert writer.batch(np.asarray(values), result.choices).texts == result.texts
+
+
+@pytest.mark.parametrize("norm", ["1", "2"])
+@pytest.mark.parametrize("dtype", [np.int64, np.float64])
+def test_get_closest_keys_matches_get_closest_key(norm, dtype):
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 256, size=(1000, 3)).astype(dtype)
+    expected = [get_closest_key(COLORS, value.tolist(), norm) for value in values]
+    assert get_closest_keys(COLORS, values, norm, max_chunk_bytes=1024).tolist() == [
+        int(index) for index in expected
+    ]
+
+
+def test_get_closest_keys_scalar_values():
+    quantized = np.array([0.0, 1.5, 3.0])
+    values = np.linspace(-1, 4, 101)
+    expected = [int(get_closest_key(quantized, [value])) for value in values]
+    assert get_closest_keys(quantized, values).tolist() == expected
+
+
+def test_get_closest_keys_ties_pick_lowest_index():
+    quantized = np.array([[0, 2]])
+    assert get_closest_keys(quantized, np.array([[1]])).tolist() == [0]
+
+
+def test_quantized_writer_batch_matches_calls():
+    rng = np.random.default_rng(1)
+    writer = QuantizedWriter(
+        quantized_values=COLORS,
+        labels=COLOR_LABELS,
+        variants={"colored": ["", " colored"]},
+        caption="{val}{colored}",
+    )
+    colors = [
+        tuple(int(c) for c in color) for color in rng.integers(256, size=(300, 3))
+    ]
+    check_batch_matches_calls(writer, colors)
+
+
+def test_quantized_writer_location_batch_matches_calls():
+    rng = np.random.default_rng(2)
+    writer = make_writers()["location"][0]
+    locations = [tuple(float(x) for x in xy) for xy in rng.uniform(7, 25, (300, 2))]
+    check_batch_matches_calls(writer, locations)
+
+
+def test_bins_writer_batch_matches_calls():
+    rng = np.random.default_rng(3)
+    writer = make_writers()["size"][0]
+    # values on the bin edges go to the upper bin, as with np.digitize
+    sizes = [int(size) for size in rng.integers(5, 16, size=300)] + [9, 11, 13]
+    check_batch_matches_calls(writer, sizes)
+    assert writer.quantize(np.array([8, 9, 10.5, 13])).tolist() == [0, 1, 1, 3]
+
+
+def test_decreasing_bins_match_digitize():
+    bins = np.array([13, 11, 9])
+    values = np.arange(5, 16)
+    assert digitize(values, bins).tolist() == np.digitize(values, bins).tolist()
+
+
+def test_bins_2d_writer_batch_matches_calls():
+    rng = np.random.default_rng(4)
+    writer = make_writers()["location"][1]
+    locations = [tuple(float(x) for x in xy) for xy in rng.uniform(7, 25, (300, 2))]
+    check_batch_matches_calls(writer, locations)
+
+
+def test_options_writer_batch_matches_calls():
+    rng = np.random.default_rng(5)
+    writer = make_writers()["shape"][0]
+    check_batch_matches_calls(
+        writer, [int(shape) for shape in rng.integers(3, size=300)]
+    )
+
+
+def test_options_writer_unknown_option():
+    writer = make_writers()["shape"][0]
+    with pytest.raises(AssertionError):
+        writer.batch(np.array([0, 5]))
+
+
+def test_continuous_angle_writer_batch_matches_calls():
+    rng = np.random.default_rng(6)
+    writer = make_writers()["rotation"][1]
+    # negative angles and angles rounded to 360 degrees
+    angles = [float(angle) for angle in rng.uniform(-2 * np.pi, 2 * np.pi, 300)]
+    angles += [0.0, 2 * np.pi - 0.01, -0.01]
+    check_batch_matches_calls(writer, angles)
+    assert writer.batch(np.array([2 * np.pi - 0.01])).indices.tolist() == [0]
+
+
+@pytest.mark.parametrize("sampling", [1, 5, 7, 45])
+def test_continuous_angle_writer_degrees(sampling):
+    writer = ContinuousAngleWriter(sampling=sampling, max_table_size=None)
+    step = writer.degree_step
+    assert writer.degrees.tolist() == [str(deg) for deg in range(0, 360, step)]
+    angles = np.random.default_rng(7).uniform(-np.pi, np.pi, 500)
+    texts = writer.batch(angles).texts
+    assert texts == [writer(float(angle))[0] for angle in angles]
+    # without table, the texts are taken from the degrees
+    assert all(int(text) % step == 0 for text in texts)